@@ -1,10 +1,65 @@
 from django.contrib import admin
 
+from .bulk import delete_in_chunks, update_in_chunks
 from .models import Post, Category, Location, Comment
 
 
+class CachedChoicesMixin:
+    """
+    Mixin, вычисляющий варианты выбора для внешних ключей один раз.
+
+    Без него каждая строка list_editable заново запрашивает
+    из базы все варианты для своего select.
+    """
+
+    cached_choice_fields = ()
+
+    def formfield_for_foreignkey(self, db_field, request, **kwargs):
+        """Заменяет итератор по queryset готовым списком вариантов."""
+        formfield = super().formfield_for_foreignkey(
+            db_field, request, **kwargs)
+        if formfield is not None and (
+                db_field.name in self.cached_choice_fields):
+            formfield.choices = list(formfield.choices)
+        return formfield
+
+
+class BulkModerationMixin:
+    """
+    Mixin с действиями модерации, работающими пакетными запросами.
+
+    Публикация, снятие с публикации и удаление выполняются порциями
+    UPDATE/DELETE по первичным ключам, а не поштучным save().
+    """
+
+    actions = ('publish_selected', 'unpublish_selected')
+
+    @admin.action(description='Опубликовать выбранные',
+                  permissions=('change',))
+    def publish_selected(self, request, queryset):
+        """Публикует выбранные объекты."""
+        self._set_published(request, queryset, True)
+
+    @admin.action(description='Снять с публикации выбранные',
+                  permissions=('change',))
+    def unpublish_selected(self, request, queryset):
+        """Снимает выбранные объекты с публикации."""
+        self._set_published(request, queryset, False)
+
+    def _set_published(self, request, queryset, is_published):
+        changed = update_in_chunks(
+            queryset.exclude(is_published=is_published),
+            is_published=is_published,
+        )
+        self.message_user(request, f'Изменено объектов: {len(changed)}.')
+
+    def delete_queryset(self, request, queryset):
+        """Удаляет выбранные объекты пакетными запросами."""
+        delete_in_chunks(queryset)
+
+
 @admin.register(Post)
-class PostAdmin(admin.ModelAdmin):
+class PostAdmin(BulkModerationMixin, CachedChoicesMixin, admin.ModelAdmin):
     search_fields = ('text', )
     list_display = (
         'id', 'title', 'author', 'text', 'category',
@@ -12,7 +67,11 @@ class PostAdmin(admin.ModelAdmin):
     )
     list_display_links = ('title',)
     list_editable = ('category', 'is_published', 'location')
-    list_filter = ('created_at', )
+    date_hierarchy = 'pub_date'
+    list_select_related = ('author', 'category', 'location')
+    cached_choice_fields = ('category', 'location')
+    raw_id_fields = ('author',)
+    show_full_result_count = False
     empty_value_display = 'Тут точно ничего нет'
 
 
@@ -25,7 +84,7 @@ class CategoryAdmin(admin.ModelAdmin):
     )
     list_display_links = ('title',)
     list_editable = ('is_published',)
-    list_filter = ('created_at', )
+    date_hierarchy = 'created_at'
     empty_value_display = 'Тут точно ничего нет'
 
 
@@ -37,18 +96,20 @@ class LocationAdmin(admin.ModelAdmin):
     )
     list_display_links = ('name',)
     list_editable = ('is_published',)
-    list_filter = ('created_at',)
+    date_hierarchy = 'created_at'
     empty_value_display = 'Тут точно ничего нет'
 
 
 @admin.register(Comment)
-class CommentAdmin(admin.ModelAdmin):
+class CommentAdmin(BulkModerationMixin, admin.ModelAdmin):
     search_fields = ('author',)
     list_display = (
         'id', 'author', 'post', 'text', 'is_published',
     )
     list_display_links = ('author',)
-    list_editable = ('is_published',
-                     'post', 'text',)
-    list_filter = ('created_at',)
+    list_editable = ('is_published', 'text',)
+    date_hierarchy = 'created_at'
+    list_select_related = ('author', 'post')
+    raw_id_fields = ('author', 'post')
+    show_full_result_count = False
     empty_value_display = 'Тут точно ничего нет'
@@ -0,0 +1,334 @@
+import json
+from datetime import datetime
+
+from blogicum.constants import API_BATCH_MAX_IDS, PAGINATE_BY
+from django.contrib.auth.mixins import LoginRequiredMixin
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Count
+from django.http import Http404, HttpResponse
+from django.shortcuts import get_object_or_404
+from django.views.generic import View
+
+from . import post_cache
+from .conditional import ConditionalGetMixin
+from .models import Category, Comment, User
+from .pagination import KeysetPaginator
+from .views import (get_feed_validators, get_post_validators,
+                    get_published_posts, get_visible_posts, is_post_visible)
+from .watermarks import POSTS, author_key, category_key
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def dumps(data):
+    """Сериализует ответ в JSON, через orjson, если он установлен."""
+    if orjson is not None:
+        return orjson.dumps(data)
+    return json.dumps(
+        data, cls=DjangoJSONEncoder, ensure_ascii=False).encode('utf-8')
+
+
+class ApiResponse(HttpResponse):
+    """Ответ API, сериализованный функцией dumps()."""
+
+    def __init__(self, data, **kwargs):
+        kwargs.setdefault('content_type', 'application/json')
+        super().__init__(dumps(data), **kwargs)
+
+
+class BadRequest(Exception):
+    """Некорректные параметры запроса к API."""
+
+
+def _image_url(post):
+    return post.image.url if post.image else None
+
+
+# Поле ответа: (поля модели для only(), функция получения значения).
+POST_FIELDS = {
+    'id': (('id',), lambda post: post.pk),
+    'title': (('title',), lambda post: post.title),
+    'excerpt': (('excerpt',), lambda post: post.excerpt),
+    'text': (('text',), lambda post: post.text),
+    'pub_date': (('pub_date',), lambda post: post.pub_date),
+    'image': (('image',), _image_url),
+    'author': (('author__username',), lambda post: post.author.username),
+    'category': (('category__slug',),
+                 lambda post: post.category and post.category.slug),
+    'location': (('location__name',),
+                 lambda post: post.location and post.location.name),
+    'comment_count': ((), lambda post: post.comment_count),
+}
+
+# По умолчанию текст поста не загружается: в лентах хватает анонса.
+DEFAULT_POST_FIELDS = tuple(name for name in POST_FIELDS if name != 'text')
+
+COMMENT_FIELDS = {
+    'id': lambda comment: comment.pk,
+    'text': lambda comment: comment.text,
+    'author': lambda comment: comment.author.username,
+    'created_at': lambda comment: comment.created_at,
+}
+
+
+def parse_fields(request, available, default):
+    """Разбирает параметр ?fields= со списком нужных полей."""
+    raw = request.GET.get('fields')
+    if not raw:
+        return default
+    fields = tuple(dict.fromkeys(
+        name.strip() for name in raw.split(',') if name.strip()))
+    unknown = set(fields) - set(available)
+    if unknown:
+        raise BadRequest(
+            f'Неизвестные поля: {", ".join(sorted(unknown))}')
+    return fields
+
+
+def select_post_fields(posts, fields):
+    """
+    Ограничивает выборку постов колонками запрошенных полей.
+
+    Связанные модели присоединяются, только если нужны их поля,
+    а комментарии считаются, только если запрошен comment_count.
+    """
+    model_fields = {
+        model_field
+        for name in fields for model_field in POST_FIELDS[name][0]
+    }
+    relations = {
+        model_field.split('__')[0]
+        for model_field in model_fields if '__' in model_field
+    }
+    posts = posts.select_related(None).select_related(
+        *relations).only(*model_fields)
+    if 'comment_count' in fields:
+        posts = posts.annotate(comment_count=Count('comments'))
+    return posts
+
+
+def serialize_post(post, fields):
+    return {name: POST_FIELDS[name][1](post) for name in fields}
+
+
+def serialize_profile(user):
+    return {
+        'username': user.username,
+        'first_name': user.first_name,
+        'last_name': user.last_name,
+        'date_joined': user.date_joined,
+    }
+
+
+def serialize_category(category):
+    return {
+        'slug': category.slug,
+        'title': category.title,
+        'description': category.description,
+    }
+
+
+class JsonView(View):
+    """Представление, отдающее результат get_data() в формате API."""
+
+    def get(self, request, *args, **kwargs):
+        return ApiResponse(self.get_data())
+
+    def get_data(self):
+        raise NotImplementedError('Переопределите get_data() в наследнике')
+
+
+class ApiView(ConditionalGetMixin, JsonView):
+    """
+    Базовое представление API только для чтения.
+
+    Валидаторы и наборы постов те же, что у HTML-страниц,
+    поэтому 304 Not Modified и видимость постов работают одинаково.
+    """
+
+    def get(self, request, *args, **kwargs):
+        try:
+            return super().get(request, *args, **kwargs)
+        except BadRequest as error:
+            return ApiResponse({'error': str(error)}, status=400)
+        except Http404:
+            return ApiResponse({'error': 'Не найдено'}, status=404)
+
+    def next_url(self, cursor):
+        """Возвращает адрес следующей страницы с теми же параметрами."""
+        if cursor is None:
+            return None
+        params = self.request.GET.copy()
+        params['after'] = cursor
+        return f'{self.request.path}?{params.urlencode()}'
+
+    def paginate_posts(self, posts):
+        """Загружает страницу постов только с запрошенными полями."""
+        fields = parse_fields(
+            self.request, POST_FIELDS, DEFAULT_POST_FIELDS)
+        page = KeysetPaginator(
+            select_post_fields(posts, fields), 'pub_date', PAGINATE_BY,
+            parse=datetime.fromisoformat,
+        ).get_page(self.request.GET.get('after'))
+        return {
+            'results': [serialize_post(post, fields) for post in page],
+            'next': self.next_url(page.next_cursor),
+        }
+
+
+class PostListApiView(ApiView):
+    """Лента опубликованных постов, как на главной странице."""
+
+    def get_validators(self):
+        return get_feed_validators(POSTS)
+
+    def get_data(self):
+        return self.paginate_posts(get_published_posts())
+
+
+class CategoryApiView(ApiView):
+    """Категория и лента её опубликованных постов."""
+
+    def get_validators(self):
+        category_id = Category.objects.filter(
+            slug=self.kwargs['category_slug'], is_published=True
+        ).values_list('pk', flat=True).first()
+        if category_id is None:
+            return None
+        return get_feed_validators(category_key(category_id))
+
+    def get_data(self):
+        category = get_object_or_404(
+            Category, slug=self.kwargs['category_slug'], is_published=True)
+        return {
+            'category': serialize_category(category),
+            **self.paginate_posts(
+                get_published_posts().filter(category=category)),
+        }
+
+
+class ProfileApiView(ApiView):
+    """
+    Профиль пользователя и лента его постов.
+
+    Автор видит и свои неопубликованные посты, остальные — только
+    опубликованные.
+    """
+
+    def get_validators(self):
+        author_id = User.objects.filter(
+            username=self.kwargs['username']
+        ).values_list('pk', flat=True).first()
+        if author_id is None:
+            return None
+        return get_feed_validators(author_key(author_id))
+
+    def get_data(self):
+        profile = get_object_or_404(User, username=self.kwargs['username'])
+        return {
+            'profile': serialize_profile(profile),
+            **self.paginate_posts(
+                get_visible_posts(self.request.user).filter(author=profile)),
+        }
+
+
+class ApiLoginRequiredMixin(LoginRequiredMixin):
+    """Mixin, отвечающий анонимному пользователю 401 в формате API."""
+
+    def handle_no_permission(self):
+        return ApiResponse({'error': 'Требуется авторизация'}, status=401)
+
+
+class PostApiView(ApiLoginRequiredMixin, ApiView):
+    """Пост целиком, с теми же правами доступа, что и страница поста."""
+
+    def get_validators(self):
+        return get_post_validators(
+            self.kwargs['post_id'], self.request.user)
+
+    def get_data(self):
+        fields = parse_fields(self.request, POST_FIELDS, tuple(POST_FIELDS))
+        post = get_object_or_404(
+            select_post_fields(
+                get_visible_posts(self.request.user), fields),
+            pk=self.kwargs['post_id'],
+        )
+        return serialize_post(post, fields)
+
+
+def parse_ids(request):
+    """Разбирает параметр ?ids= со списком первичных ключей постов."""
+    try:
+        ids = list(dict.fromkeys(
+            int(pk) for pk in request.GET.get('ids', '').split(',')
+            if pk.strip()
+        ))
+    except ValueError:
+        raise BadRequest('Параметр ids должен быть списком чисел')
+    if not ids:
+        raise BadRequest('Укажите посты в параметре ids')
+    if len(ids) > API_BATCH_MAX_IDS:
+        raise BadRequest(
+            f'Можно запросить не больше {API_BATCH_MAX_IDS} постов')
+    return ids
+
+
+class PostBatchApiView(ApiLoginRequiredMixin, ApiView):
+    """
+    Несколько постов по списку ?ids= за один запрос.
+
+    Посты берутся из кэша, а недостающие выбираются одним
+    запросом pk IN (...). Видимость проверяется по тем же правилам,
+    что и на странице поста; скрытые и удалённые посты пропускаются.
+    """
+
+    def get_validators(self):
+        return None
+
+    def get_data(self):
+        ids = parse_ids(self.request)
+        fields = parse_fields(self.request, POST_FIELDS, tuple(POST_FIELDS))
+        entries = post_cache.get_posts(
+            ids, lambda post: serialize_post(post, POST_FIELDS))
+        user = self.request.user
+        return {
+            'results': [
+                {name: entry['data'][name] for name in fields}
+                for entry in (entries.get(pk) for pk in ids)
+                if entry is not None and is_post_visible(
+                    user, entry['author_id'], entry['is_live'],
+                    entry['category_is_published'],
+                )
+            ],
+        }
+
+
+class CommentListApiView(ApiLoginRequiredMixin, ApiView):
+    """Комментарии к посту, от новых к старым, с курсором ?after=."""
+
+    def get_validators(self):
+        return get_post_validators(
+            self.kwargs['post_id'], self.request.user)
+
+    def get_data(self):
+        post_id = self.kwargs['post_id']
+        if not get_visible_posts(self.request.user).filter(
+                pk=post_id).exists():
+            raise Http404
+        comments = Comment.objects.filter(
+            post_id=post_id).select_related('author')
+        page = KeysetPaginator(
+            comments, 'created_at', PAGINATE_BY,
+            parse=datetime.fromisoformat,
+        ).get_page(self.request.GET.get('after'))
+        return {
+            'results': [
+                {name: value(comment)
+                 for name, value in COMMENT_FIELDS.items()}
+                for comment in page
+            ],
+            'next': self.next_url(page.next_cursor),
+        }
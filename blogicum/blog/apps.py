@@ -5,3 +5,8 @@ class BlogConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'blog'
     verbose_name = 'Блог'
+
+    def ready(self):
+        from . import (database, date_counts, metrics,  # noqa: F401
+                       post_cache, rankings, sitemaps, slow_queries,
+                       timelines, watermarks)
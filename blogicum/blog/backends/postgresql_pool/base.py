@@ -0,0 +1,71 @@
+"""
+PostgreSQL с пулом соединений внутри процесса.
+
+Подключается как ENGINE = 'blog.backends.postgresql_pool'; размер пула
+задаётся ключом POOL_SIZE в настройках базы. Вместо нового соединения
+(TCP и аутентификация на каждый запрос) Django получает свободное
+из пула psycopg2, а при закрытии возвращает его обратно, сбросив
+состояние сеанса. Пул общий для потоков процесса, поэтому POOL_SIZE
+должен быть не меньше числа потоков рабочего процесса; если все
+соединения заняты, поток ждёт до POOL_TIMEOUT секунд (см. pool.py).
+"""
+import threading
+
+import psycopg2
+import psycopg2.extras
+from django.db.backends.postgresql import base
+from psycopg2 import pool
+
+from .pool import BlockingPool
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def get_pool(alias, size, timeout, conn_params):
+    """Возвращает пул соединений базы alias, создавая его при первом вызове."""
+    with _pools_lock:
+        connection_pool = _pools.get(alias)
+        if connection_pool is None:
+            connection_pool = _pools[alias] = BlockingPool(
+                pool.ThreadedConnectionPool(1, size, **conn_params),
+                size, timeout,
+            )
+        return connection_pool
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+
+    @property
+    def pool(self):
+        return get_pool(
+            self.alias, self.settings_dict['POOL_SIZE'],
+            self.settings_dict.get('POOL_TIMEOUT', 5),
+            self.get_connection_params(),
+        )
+
+    def get_new_connection(self, conn_params):
+        connection = self.pool.getconn()
+        options = self.settings_dict['OPTIONS']
+        self.isolation_level = options.get(
+            'isolation_level', connection.isolation_level)
+        if self.isolation_level != connection.isolation_level:
+            connection.set_session(isolation_level=self.isolation_level)
+        psycopg2.extras.register_default_jsonb(
+            conn_or_curs=connection, loads=lambda x: x)
+        return connection
+
+    def _close(self):
+        if self.connection is None:
+            return
+        broken = bool(self.connection.closed)
+        if not broken:
+            try:
+                # Откатывает транзакцию и сбрасывает SET, сделанные
+                # в этом сеансе, чтобы следующий владелец получил
+                # соединение в исходном состоянии.
+                self.connection.reset()
+            except psycopg2.Error:
+                broken = True
+        with self.wrap_database_errors:
+            self.pool.putconn(self.connection, close=broken)
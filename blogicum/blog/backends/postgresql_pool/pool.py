@@ -0,0 +1,43 @@
+import threading
+
+from django.db.utils import OperationalError
+
+
+class PoolExhausted(OperationalError):
+    """Свободное соединение не освободилось за POOL_TIMEOUT секунд."""
+
+
+class BlockingPool:
+    """
+    Обёртка пула, которая при исчерпании ждёт свободное соединение.
+
+    ThreadedConnectionPool из psycopg2 при исчерпании сразу
+    выбрасывает PoolError. Здесь поток ждёт до timeout секунд,
+    пока другой поток не вернёт соединение, и только потом
+    получает PoolExhausted с понятным сообщением.
+    """
+
+    def __init__(self, pool, size, timeout):
+        self._pool = pool
+        self._slots = threading.BoundedSemaphore(size)
+        self.size = size
+        self.timeout = timeout
+
+    def getconn(self):
+        if not self._slots.acquire(timeout=self.timeout):
+            raise PoolExhausted(
+                f'Все {self.size} соединений пула заняты дольше '
+                f'{self.timeout} с; увеличьте POSTGRES_POOL_SIZE '
+                f'до числа потоков рабочего процесса.'
+            )
+        try:
+            return self._pool.getconn()
+        except BaseException:
+            self._slots.release()
+            raise
+
+    def putconn(self, connection, close=False):
+        try:
+            self._pool.putconn(connection, close=close)
+        finally:
+            self._slots.release()
@@ -0,0 +1,69 @@
+from blogicum.constants import BULK_CHUNK_SIZE
+from django.db import transaction
+
+from .signals import bulk_changed, bulk_operation
+
+
+def iter_pk_chunks(queryset, chunk_size=BULK_CHUNK_SIZE):
+    """
+    Отдаёт первичные ключи queryset порциями по chunk_size.
+
+    Каждая порция выбирается отдельным запросом по pk > последнего,
+    поэтому обход корректен, даже если объекты выпадают из выборки
+    после обновления.
+    """
+    pks = queryset.order_by('pk').values_list('pk', flat=True)
+    last_pk = None
+    while True:
+        page = pks if last_pk is None else pks.filter(pk__gt=last_pk)
+        chunk = list(page[:chunk_size])
+        if not chunk:
+            return
+        yield chunk
+        last_pk = chunk[-1]
+
+
+def update_in_chunks(queryset, **values):
+    """
+    Обновляет объекты queryset пакетными UPDATE по порциям.
+
+    Возвращает список первичных ключей изменённых объектов;
+    сигнал bulk_changed отправляется один раз на всю операцию.
+    """
+    model = queryset.model
+    changed = []
+    for chunk in iter_pk_chunks(queryset):
+        with transaction.atomic():
+            model._default_manager.filter(pk__in=chunk).update(**values)
+        changed.extend(chunk)
+    if changed:
+        bulk_changed.send(
+            sender=model, pks=changed, deleted=False, deferred={})
+    return changed
+
+
+def delete_in_chunks(queryset):
+    """
+    Удаляет объекты queryset по порциям.
+
+    Поштучные обработчики удаления не выполняют работу сами,
+    а ждут одного сигнала bulk_changed в конце операции. Каждая
+    порция удаляется в своей транзакции; если порция не удалилась,
+    сигнал всё равно отправляется для уже удалённых порций вместе
+    с их отложенной работой, а исключение пробрасывается дальше.
+    """
+    model = queryset.model
+    deleted = []
+    deferred = {}
+    try:
+        for chunk in iter_pk_chunks(queryset):
+            with bulk_operation() as chunk_deferred, transaction.atomic():
+                model._default_manager.filter(pk__in=chunk).delete()
+            for key, values in chunk_deferred.items():
+                deferred.setdefault(key, []).extend(values)
+            deleted.extend(chunk)
+    finally:
+        if deleted:
+            bulk_changed.send(
+                sender=model, pks=deleted, deleted=True, deferred=deferred)
+    return deleted
@@ -0,0 +1,61 @@
+import hashlib
+
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date, quote_etag
+
+
+def make_etag(*parts):
+    """Собирает ETag из значений, от которых зависит страница."""
+    return quote_etag(hashlib.md5(repr(parts).encode()).hexdigest())
+
+
+def conditional_response(request, etag, last_modified, render):
+    """
+    Отвечает 304 Not Modified или вызывает render() для полного ответа.
+
+    render выполняется, только если валидаторы клиента устарели;
+    к полному ответу добавляются ETag и Last-Modified.
+    """
+    timestamp = int(last_modified.timestamp()) if last_modified else None
+    response = get_conditional_response(
+        request, etag=etag, last_modified=timestamp)
+    if response is None:
+        response = render()
+        response['ETag'] = etag
+        if timestamp is not None:
+            response['Last-Modified'] = http_date(timestamp)
+    patch_cache_control(response, no_cache=True)
+    return response
+
+
+class ConditionalGetMixin:
+    """
+    Mixin, отвечающий 304 Not Modified до основных запросов и шаблонов.
+
+    Представление переопределяет get_validators() и возвращает
+    (версию, момент последнего изменения) или None, если валидаторы
+    построить нельзя. В ETag дополнительно попадают текущий
+    пользователь и параметры запроса, поэтому разные страницы
+    ленты и разные посетители не делят один валидатор.
+    """
+
+    def get_validators(self):
+        raise NotImplementedError(
+            'Переопределите get_validators() в наследнике')
+
+    def get(self, request, *args, **kwargs):
+        validators = self.get_validators()
+        if validators is None:
+            return super().get(request, *args, **kwargs)
+        version, last_modified = validators
+        etag = make_etag(
+            version, last_modified, request.user.pk,
+            request.GET.urlencode(),
+        )
+        response = conditional_response(
+            request, etag, last_modified,
+            lambda: super(ConditionalGetMixin, self).get(
+                request, *args, **kwargs),
+        )
+        patch_cache_control(response, private=True)
+        return response
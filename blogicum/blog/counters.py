@@ -0,0 +1,137 @@
+import atexit
+import logging
+import threading
+import time
+from collections import Counter
+
+from blogicum.constants import BULK_CHUNK_SIZE
+from django.conf import settings
+from django.db import DatabaseError, connections
+from django.db.models import Case, F, IntegerField, Value, When
+
+from .models import Post
+from .signals import views_flushed
+
+logger = logging.getLogger(__name__)
+
+
+class ViewCounter:
+    """
+    Буфер просмотров постов в памяти процесса.
+
+    Просмотры копятся в Counter и записываются пакетными
+    UPDATE ... CASE не чаще раза в flush_interval секунд
+    или когда в буфере набирается max_pending разных постов.
+    Пока буфер не пуст, фоновый поток сбрасывает его по истечении
+    flush_interval, даже если новых просмотров нет.
+    """
+
+    def __init__(self, flush_interval=None, max_pending=None):
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self._pending = Counter()
+        self._lock = threading.Lock()
+        self._last_flush = time.monotonic()
+        self._timer = None
+
+    def _get_flush_interval(self):
+        if self.flush_interval is not None:
+            return self.flush_interval
+        return settings.VIEW_COUNT_FLUSH_INTERVAL
+
+    def _get_max_pending(self):
+        if self.max_pending is not None:
+            return self.max_pending
+        return settings.VIEW_COUNT_MAX_PENDING
+
+    def record(self, post_id):
+        """Учитывает просмотр поста и при необходимости сбрасывает буфер."""
+        with self._lock:
+            self._pending[post_id] += 1
+            due = (
+                len(self._pending) >= self._get_max_pending()
+                or time.monotonic() - self._last_flush
+                >= self._get_flush_interval()
+            )
+            if not due and self._timer is None:
+                self._timer = threading.Thread(
+                    target=self._flush_periodically,
+                    name='view-counter-flush', daemon=True,
+                )
+                self._timer.start()
+        if due:
+            self.flush()
+
+    def _flush_periodically(self):
+        """
+        Сбрасывает буфер раз в flush_interval, пока в нём есть просмотры.
+
+        Поток завершается на пустом буфере; record() запустит новый.
+        """
+        while True:
+            with self._lock:
+                if not self._pending:
+                    self._timer = None
+                    return
+                wait = (self._last_flush + self._get_flush_interval()
+                        - time.monotonic())
+            if wait > 0:
+                time.sleep(wait)
+                continue
+            try:
+                self.flush()
+            finally:
+                connections.close_all()
+
+    def pending_count(self):
+        """Возвращает число просмотров, ещё не записанных в базу."""
+        with self._lock:
+            return sum(self._pending.values())
+
+    def flush(self):
+        """
+        Записывает накопленные просмотры в базу.
+
+        При ошибке базы просмотры возвращаются в буфер
+        и будут записаны при следующем сбросе.
+        """
+        with self._lock:
+            pending, self._pending = self._pending, Counter()
+            self._last_flush = time.monotonic()
+        if not pending:
+            return pending
+        try:
+            self._write(pending)
+        except DatabaseError:
+            logger.exception('Не удалось записать просмотры постов')
+            with self._lock:
+                self._pending.update(pending)
+            return Counter()
+        views_flushed.send(sender=Post, counts=pending)
+        return pending
+
+    @staticmethod
+    def _write(pending):
+        items = list(pending.items())
+        for start in range(0, len(items), BULK_CHUNK_SIZE):
+            chunk = items[start:start + BULK_CHUNK_SIZE]
+            increment = Case(
+                *(When(pk=pk, then=Value(count)) for pk, count in chunk),
+                default=Value(0),
+                output_field=IntegerField(),
+            )
+            Post.objects.filter(
+                pk__in=[pk for pk, _ in chunk]
+            ).update_silently(view_count=F('view_count') + increment)
+
+
+view_counter = ViewCounter()
+
+
+@atexit.register
+def _flush_at_exit():
+    """Сбрасывает буфер при штатном завершении процесса."""
+    try:
+        view_counter.flush()
+    except Exception:
+        logger.exception('Просмотры постов потеряны при завершении')
@@ -0,0 +1,99 @@
+import logging
+import random
+import time
+
+from blogicum.constants import DB_RETRY_DELAY, DB_WRITE_ATTEMPTS
+from django.conf import settings
+from django.core.signals import request_started
+from django.db import OperationalError, connections, transaction
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+from django.http import HttpResponseRedirect
+
+logger = logging.getLogger(__name__)
+
+
+@receiver(request_started)
+def check_connections(**kwargs):
+    """
+    Закрывает постоянные соединения, которые сервер уже разорвал.
+
+    Django 3.2 проверяет соединение только после ошибки в прошлом
+    запросе, поэтому соединение, закрытое сервером по таймауту
+    или при перезапуске, уронило бы первый запрос. Здесь каждое
+    открытое соединение с CONN_MAX_AGE != 0 проверяется один раз
+    в начале запроса; закрытое откроется заново при первом обращении.
+    """
+    if not settings.DB_HEALTH_CHECKS:
+        return
+    for connection in connections.all():
+        if (connection.connection is None
+                or connection.in_atomic_block
+                or connection.settings_dict['CONN_MAX_AGE'] == 0):
+            continue
+        if not connection.is_usable():
+            connection.close()
+
+
+@receiver(connection_created)
+def configure_sqlite(sender, connection, **kwargs):
+    """Применяет SQLITE_PRAGMAS к новому соединению с SQLite."""
+    if connection.vendor != 'sqlite':
+        return
+    for name, value in settings.SQLITE_PRAGMAS.items():
+        connection.connection.execute(f'PRAGMA {name} = {value}')
+
+
+def is_locked(error):
+    return 'locked' in str(error)
+
+
+def retry_on_locked(func):
+    """
+    Выполняет func() в транзакции, повторяя её при блокировке базы.
+
+    SQLite не ждёт по busy_timeout, если транзакция уже читала
+    и теперь пытается писать, а базу пишет другое соединение:
+    такая транзакция сразу получает «database is locked». Её можно
+    только откатить и начать заново, что здесь и делается
+    до DB_WRITE_ATTEMPTS раз с растущей случайной паузой.
+    """
+    for attempt in range(1, DB_WRITE_ATTEMPTS + 1):
+        try:
+            with transaction.atomic():
+                return func()
+        except OperationalError as error:
+            if not is_locked(error) or attempt == DB_WRITE_ATTEMPTS:
+                raise
+            logger.info('База заблокирована, попытка записи %s', attempt)
+            time.sleep(DB_RETRY_DELAY * 2 ** (attempt - 1) * random.random())
+
+
+def save_new_with_retry(form):
+    """
+    Сохраняет новую запись формы, повторяя при блокировке только save().
+
+    Перед каждой попыткой запись снова помечается новой: после отката
+    у неё мог остаться pk, и повтор стал бы обновлением, а сигналы
+    post_save получили бы created=False.
+    """
+    instance = form.instance
+
+    def save():
+        instance.pk = None
+        instance._state.adding = True
+        return form.save()
+
+    return retry_on_locked(save)
+
+
+class RetryOnLockedMixin:
+    """
+    Mixin для CreateView: сохраняет форму через save_new_with_retry().
+
+    Повторяется только запись, а не весь form_valid().
+    """
+
+    def form_valid(self, form):
+        self.object = save_new_with_retry(form)
+        return HttpResponseRedirect(self.get_success_url())
@@ -0,0 +1,282 @@
+from collections import Counter
+from datetime import date, datetime, time, timedelta
+
+from blogicum.constants import ARCHIVE_NAV_CACHE_TIMEOUT, BULK_CHUNK_SIZE
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Count, F, Q
+from django.db.models.functions import TruncMonth
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from django.utils import timezone
+
+from .instrumentation import record_cache
+from .models import Category, Comment, Location, MonthlyCount, Post
+from .signals import bulk_changed, defer, in_bulk_operation
+
+# Модели и поля дат, для которых ведутся помесячные счётчики.
+TRACKED_FIELDS = {
+    Post: 'pub_date',
+    Category: 'created_at',
+    Location: 'created_at',
+    Comment: 'created_at',
+}
+
+
+def get_scope(model, field_name):
+    """Возвращает ключ счётчиков для поля даты модели."""
+    return f'{model._meta.label_lower}.{field_name}'
+
+
+def month_key(scope, value):
+    """Возвращает ключ (scope, год, месяц) в локальной временной зоне."""
+    if timezone.is_aware(value):
+        value = timezone.localtime(value)
+    return scope, value.year, value.month
+
+
+# Посты, видимые в лентах и в архиве: в ленте и в опубликованной категории.
+ARCHIVE_SCOPE = 'blog.post.archive'
+
+ARCHIVE_NAV_KEY = 'archive:navigation'
+
+ARCHIVED = Q(is_live=True, category__is_published=True)
+
+
+def invalidate_navigation():
+    """
+    Сбрасывает кэш навигации архива после фиксации транзакции.
+
+    Если сбросить кэш до фиксации, параллельный запрос успеет
+    положить в него навигацию по старым счётчикам.
+    """
+    transaction.on_commit(lambda: cache.delete(ARCHIVE_NAV_KEY))
+
+
+def apply_deltas(deltas):
+    """Применяет накопленные изменения к таблице счётчиков."""
+    with transaction.atomic():
+        for (scope, year, month), delta in deltas.items():
+            if not delta:
+                continue
+            updated = MonthlyCount.objects.filter(
+                scope=scope, year=year, month=month,
+            ).update(count=F('count') + delta)
+            if not updated:
+                MonthlyCount.objects.create(
+                    scope=scope, year=year, month=month, count=delta)
+        if any(scope == ARCHIVE_SCOPE for scope, _, _ in deltas):
+            invalidate_navigation()
+
+
+def rebuild(model, field_name, scope=None, condition=Q()):
+    """
+    Полностью пересчитывает счётчики одного поля одним GROUP BY.
+
+    С condition считаются только подходящие записи.
+    """
+    scope = scope or get_scope(model, field_name)
+    rows = (
+        model._default_manager.filter(condition).order_by()
+        .annotate(month=TruncMonth(field_name))
+        .values('month')
+        .annotate(total=Count('pk'))
+    )
+    with transaction.atomic():
+        MonthlyCount.objects.filter(scope=scope).delete()
+        MonthlyCount.objects.bulk_create(
+            MonthlyCount(
+                scope=scope,
+                year=row['month'].year,
+                month=row['month'].month,
+                count=row['total'],
+            )
+            for row in rows
+        )
+
+
+def rebuild_archive():
+    """Пересчитывает счётчики архива с нуля."""
+    with transaction.atomic():
+        rebuild(Post, 'pub_date', ARCHIVE_SCOPE, ARCHIVED)
+        invalidate_navigation()
+
+
+def period_range(year, month=None, day=None):
+    """
+    Возвращает границы года, месяца или дня в локальной временной зоне.
+
+    Для несуществующей даты выбрасывает ValueError.
+    """
+    if day is not None:
+        start = date(year, month, day)
+        end = start + timedelta(days=1)
+    elif month is not None:
+        start = date(year, month, 1)
+        end = date(year + month // 12, month % 12 + 1, 1)
+    else:
+        start = date(year, 1, 1)
+        end = date(year + 1, 1, 1)
+    return tuple(
+        timezone.make_aware(datetime.combine(moment, time.min))
+        for moment in (start, end)
+    )
+
+
+def recount_archive_months(post_ids):
+    """
+    Пересчитывает счётчики архива за месяцы, где лежат посты post_ids.
+
+    Нужен после пакетных изменений, когда неизвестно, какие посты
+    были видны до них: каждый месяц считается заново одним COUNT
+    по индексу pub_date.
+    """
+    post_ids = list(post_ids)
+    months = set()
+    for start in range(0, len(post_ids), BULK_CHUNK_SIZE):
+        months.update(
+            (moment.year, moment.month)
+            for moment in Post.objects.filter(
+                pk__in=post_ids[start:start + BULK_CHUNK_SIZE]
+            ).datetimes('pub_date', 'month')
+        )
+    if not months:
+        return
+    with transaction.atomic():
+        for year, month in months:
+            start, end = period_range(year, month)
+            count = Post.objects.filter(
+                ARCHIVED, pub_date__gte=start, pub_date__lt=end).count()
+            MonthlyCount.objects.update_or_create(
+                scope=ARCHIVE_SCOPE, year=year, month=month,
+                defaults={'count': count},
+            )
+        invalidate_navigation()
+
+
+def archive_navigation():
+    """
+    Возвращает навигацию архива: годы и месяцы с числом постов.
+
+    Строится из счётчиков архива и хранится в кэше, пока они
+    не изменятся: [{'year', 'count', 'months': [{'date', 'count'}]}],
+    где date — первое число месяца.
+    """
+    navigation = cache.get(ARCHIVE_NAV_KEY)
+    record_cache(hits=navigation is not None,
+                 misses=navigation is None)
+    if navigation is None:
+        years = {}
+        for year, month, count in MonthlyCount.objects.filter(
+            scope=ARCHIVE_SCOPE, count__gt=0,
+        ).order_by('-year', '-month').values_list('year', 'month', 'count'):
+            entry = years.setdefault(
+                year, {'year': year, 'count': 0, 'months': []})
+            entry['count'] += count
+            entry['months'].append(
+                {'date': date(year, month, 1), 'count': count})
+        navigation = list(years.values())
+        cache.set(ARCHIVE_NAV_KEY, navigation, ARCHIVE_NAV_CACHE_TIMEOUT)
+    return navigation
+
+
+def _apply_or_defer(deltas):
+    if in_bulk_operation():
+        defer('date_counts', deltas.items())
+    else:
+        apply_deltas(deltas)
+
+
+def _track(sender, instance, delta):
+    field_name = TRACKED_FIELDS[sender]
+    value = getattr(instance, field_name)
+    if value is None:
+        return
+    _apply_or_defer({month_key(get_scope(sender, field_name), value): delta})
+
+
+def _archived(is_live, category_id):
+    return bool(is_live and category_id and Category.objects.filter(
+        pk=category_id, is_published=True).exists())
+
+
+@receiver(post_save)
+def count_saved(sender, instance, created, raw=False, **kwargs):
+    """Учитывает новую запись или перенос даты публикации."""
+    if sender not in TRACKED_FIELDS or raw:
+        return
+    if created:
+        _track(sender, instance, 1)
+        return
+    old_date = getattr(instance, '_loaded_values', {}).get('pub_date')
+    if sender is Post and old_date and old_date != instance.pub_date:
+        scope = get_scope(Post, 'pub_date')
+        deltas = Counter({month_key(scope, instance.pub_date): 1})
+        deltas[month_key(scope, old_date)] -= 1
+        apply_deltas(deltas)
+
+
+@receiver(post_save, sender=Post)
+def count_archived(sender, instance, created, raw=False, **kwargs):
+    """Учитывает в архиве публикацию, снятие с публикации и перенос даты."""
+    if raw:
+        return
+    deltas = Counter()
+    loaded = {} if created else getattr(instance, '_loaded_values', {})
+    if loaded.get('pub_date') and _archived(
+            loaded.get('is_live'), loaded.get('category_id')):
+        deltas[month_key(ARCHIVE_SCOPE, loaded['pub_date'])] -= 1
+    if _archived(instance.is_live, instance.category_id):
+        deltas[month_key(ARCHIVE_SCOPE, instance.pub_date)] += 1
+    _apply_or_defer(deltas)
+
+
+@receiver(post_delete)
+def count_deleted(sender, instance, **kwargs):
+    """Уменьшает счётчик месяца удалённой записи."""
+    if sender in TRACKED_FIELDS:
+        _track(sender, instance, -1)
+    if sender is Post and _archived(instance.is_live, instance.category_id):
+        _apply_or_defer({month_key(ARCHIVE_SCOPE, instance.pub_date): -1})
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+def rebuild_archive_for_category(sender, instance, raw=False, **kwargs):
+    """
+    Пересчитывает архив после изменения категории.
+
+    Скрытие или удаление категории меняет видимость всех её постов;
+    категории меняются редко, поэтому архив пересчитывается целиком.
+    """
+    if not raw:
+        transaction.on_commit(rebuild_archive)
+
+
+@receiver(bulk_changed, sender=Post)
+def recount_after_bulk(sender, pks, deleted, **kwargs):
+    """Пересчитывает архив за месяцы постов, изменённых пакетно."""
+    if not deleted:
+        recount_archive_months(pks)
+
+
+@receiver(bulk_changed)
+def apply_deferred(sender, deferred, **kwargs):
+    """Применяет изменения, накопленные за пакетную операцию, разом."""
+    deltas = Counter()
+    for key, delta in deferred.get('date_counts', ()):
+        deltas[key] += delta
+    apply_deltas(deltas)
+
+
+def archive_count(navigation, year, month=None):
+    """Возвращает число постов архива за год или месяц по навигации."""
+    for entry in navigation:
+        if entry['year'] != year:
+            continue
+        if month is None:
+            return entry['count']
+        for item in entry['months']:
+            if item['date'].month == month:
+                return item['count']
+    return 0
@@ -0,0 +1,168 @@
+from blogicum.constants import FEED_CACHE_TIMEOUT, FEED_ITEMS
+from django.contrib.sites.shortcuts import get_current_site
+from django.contrib.syndication.views import Feed, add_domain
+from django.core.cache import cache
+from django.http import Http404, HttpResponse
+from django.shortcuts import get_object_or_404
+from django.urls import reverse
+from django.utils.feedgenerator import Atom1Feed
+
+from .conditional import conditional_response, make_etag
+from .instrumentation import record_cache
+from .models import Category, User
+from .views import get_published_posts
+from .watermarks import POSTS, author_key, category_key, feed_last_modified
+
+
+class CachedFeed(Feed):
+    """
+    Лента RSS с кэшированным телом и HTTP-валидаторами.
+
+    Ключ кэша включает отметку изменений области ленты, поэтому
+    публикация или правка поста в этой области сама делает
+    старое тело недоступным, а не изменившуюся ленту агрегатор
+    получает как 304 Not Modified.
+    """
+
+    def get_watermark_key(self, **kwargs):
+        return POSTS
+
+    def __call__(self, request, *args, **kwargs):
+        watermark_key = self.get_watermark_key(**kwargs)
+        if watermark_key is None:
+            raise Http404
+        last_modified = feed_last_modified(watermark_key)
+        etag = make_etag(
+            type(self).__name__, request.build_absolute_uri('/'),
+            watermark_key, last_modified,
+        )
+        cache_key = f'feed:{etag}'
+
+        def render():
+            body = cache.get(cache_key)
+            record_cache(hits=body is not None, misses=body is None)
+            if body is None:
+                response = super(CachedFeed, self).__call__(
+                    request, *args, **kwargs)
+                body = response['Content-Type'], response.content
+                cache.set(cache_key, body, FEED_CACHE_TIMEOUT)
+            content_type, content = body
+            return HttpResponse(content, content_type=content_type)
+
+        return conditional_response(request, etag, last_modified, render)
+
+    def get_posts(self, obj):
+        return get_published_posts()
+
+    def items(self, obj):
+        return self.get_posts(obj).defer('text').order_by(
+            '-pub_date')[:FEED_ITEMS]
+
+    def item_title(self, item):
+        return item.title
+
+    def item_description(self, item):
+        return item.excerpt
+
+    def item_pubdate(self, item):
+        return item.pub_date
+
+    def item_updateddate(self, item):
+        return item.updated_at
+
+    def item_author_name(self, item):
+        return item.author.username
+
+    def item_author_link(self, item):
+        return reverse('blog:profile', args=(item.author.username,))
+
+    def get_feed(self, obj, request):
+        """
+        Делает ссылки на авторов абсолютными.
+
+        Feed дополняет доменом сайта только ссылки ленты и постов,
+        а author_link в RSS и Atom тоже должен быть абсолютным адресом.
+        """
+        feed = super().get_feed(obj, request)
+        domain = get_current_site(request).domain
+        for item in feed.items:
+            if item['author_link']:
+                item['author_link'] = add_domain(
+                    domain, item['author_link'], request.is_secure())
+        return feed
+
+
+class LatestPostsFeed(CachedFeed):
+    title = 'Блогикум: новые публикации'
+    description = 'Последние публикации всех авторов.'
+
+    def link(self):
+        return reverse('blog:index')
+
+
+class LatestPostsAtomFeed(LatestPostsFeed):
+    feed_type = Atom1Feed
+    subtitle = LatestPostsFeed.description
+
+
+class CategoryPostsFeed(CachedFeed):
+
+    def get_watermark_key(self, category_slug):
+        category_id = Category.objects.filter(
+            slug=category_slug, is_published=True
+        ).values_list('pk', flat=True).first()
+        return category_id and category_key(category_id)
+
+    def get_object(self, request, category_slug):
+        return get_object_or_404(
+            Category, slug=category_slug, is_published=True)
+
+    def get_posts(self, obj):
+        return get_published_posts().filter(category=obj)
+
+    def title(self, obj):
+        return f'Блогикум: {obj.title}'
+
+    def description(self, obj):
+        return obj.description
+
+    def link(self, obj):
+        return reverse('blog:category_posts', args=(obj.slug,))
+
+
+class CategoryPostsAtomFeed(CategoryPostsFeed):
+    feed_type = Atom1Feed
+
+    def subtitle(self, obj):
+        return obj.description
+
+
+class AuthorPostsFeed(CachedFeed):
+
+    def get_watermark_key(self, username):
+        author_id = User.objects.filter(
+            username=username
+        ).values_list('pk', flat=True).first()
+        return author_id and author_key(author_id)
+
+    def get_object(self, request, username):
+        return get_object_or_404(User, username=username)
+
+    def get_posts(self, obj):
+        return get_published_posts().filter(author=obj)
+
+    def title(self, obj):
+        return f'Блогикум: публикации {obj.username}'
+
+    def description(self, obj):
+        return f'Последние публикации пользователя {obj.username}.'
+
+    def link(self, obj):
+        return reverse('blog:profile', args=(obj.username,))
+
+
+class AuthorPostsAtomFeed(AuthorPostsFeed):
+    feed_type = Atom1Feed
+
+    def subtitle(self, obj):
+        return self.description(obj)
@@ -0,0 +1,353 @@
+import bisect
+import fcntl
+import glob
+import json
+import logging
+import os
+import threading
+import time
+from contextlib import ExitStack, contextmanager
+from contextvars import ContextVar
+from collections import Counter
+from dataclasses import dataclass
+
+from blogicum.constants import COUNT_BUCKETS, LATENCY_BUCKETS_MS
+from django.conf import settings
+from django.db import connections
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class RequestMetrics:
+    """Замеры одного запроса, которые копятся по ходу его обработки."""
+
+    db_ms: float = 0.0
+    queries: int = 0
+    template_ms: float = 0.0
+    cache_hits: int = 0
+    cache_misses: int = 0
+
+
+_current = ContextVar('request_metrics', default=None)
+
+
+class Histogram:
+    """
+    Гистограмма с фиксированными границами корзин, как в Prometheus.
+
+    Хранит только счётчики корзин, сумму и число наблюдений,
+    поэтому занимает постоянную память при любом трафике.
+    """
+
+    def __init__(self, buckets):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.total = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.total += value
+        self.count += 1
+
+    def snapshot(self):
+        return {
+            'buckets': list(self.buckets),
+            'counts': list(self.counts),
+            'sum': self.total,
+            'count': self.count,
+        }
+
+
+class Registry:
+    """
+    Метрики процесса: гистограммы по имени представления и метрике,
+    счётчики с метками и датчики, значение которых читается функцией.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._histograms = {}
+        self._counters = Counter()
+        self._gauges = {}
+        self._last_persist = 0.0
+        self._retired = False
+        # Отличает файл этого процесса от файла прежнего с тем же pid.
+        self._started = time.time()
+
+    def observe(self, view_name, values):
+        with self._lock:
+            for metric, value in values.items():
+                key = (view_name, metric)
+                histogram = self._histograms.get(key)
+                if histogram is None:
+                    histogram = self._histograms[key] = Histogram(
+                        LATENCY_BUCKETS_MS if metric.endswith('_ms')
+                        else COUNT_BUCKETS
+                    )
+                histogram.observe(value)
+
+    def snapshot(self):
+        """Возвращает копию гистограмм {(представление, метрика): данные}."""
+        with self._lock:
+            return {
+                key: histogram.snapshot()
+                for key, histogram in self._histograms.items()
+            }
+
+    def inc(self, name, amount=1, **labels):
+        """Увеличивает счётчик name с метками labels."""
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self._counters[key] += amount
+
+    def gauge(self, name, read):
+        """Регистрирует датчик: read() вызывается при сохранении метрик."""
+        self._gauges[name] = read
+
+    def clear(self):
+        with self._lock:
+            self._histograms.clear()
+            self._counters.clear()
+
+    def persist(self, directory):
+        """
+        Сохраняет метрики процесса в файл <pid>.json в directory.
+
+        Каждый процесс пишет только свой файл и заменяет его атомарно,
+        а экспорт складывает файлы всех процессов. При первом сохранении
+        файлы завершившихся процессов сворачиваются (retire_stale()).
+        """
+        if not self._retired:
+            self.retire_stale(directory)
+            self._retired = True
+        with self._lock:
+            data = {
+                'pid': os.getpid(),
+                'started': self._started,
+                'histograms': [
+                    [view_name, metric, histogram.snapshot()]
+                    for (view_name, metric), histogram
+                    in self._histograms.items()
+                ],
+                'counters': [
+                    [name, dict(labels), value]
+                    for (name, labels), value in self._counters.items()
+                ],
+            }
+            self._last_persist = time.monotonic()
+        data['gauges'] = {name: read() for name, read in self._gauges.items()}
+        os.makedirs(directory, exist_ok=True)
+        _write_json(os.path.join(directory, f'{os.getpid()}.json'), data)
+
+    def maybe_persist(self):
+        """Сохраняет метрики не чаще раза в METRICS_PERSIST_INTERVAL."""
+        directory = settings.METRICS_DIR
+        if directory is None or (
+            time.monotonic() - self._last_persist
+            < settings.METRICS_PERSIST_INTERVAL
+        ):
+            return
+        try:
+            self.persist(directory)
+        except OSError:
+            logger.exception('Не удалось сохранить метрики процесса')
+
+    def retire_stale(self, directory):
+        """
+        Сворачивает файлы завершившихся процессов в retired.json.
+
+        Вызывается при старте рабочего процесса (первом сохранении).
+        Сюда же уходит файл с pid этого процесса, записанный прежним
+        процессом с тем же pid (другое время запуска): новый процесс
+        не должен продолжать его счётчики. Счётчики в экспорте
+        при этом не убывают, а файлы не копятся.
+        """
+        retired_path = os.path.join(directory, RETIRED_NAME)
+        with metrics_lock(directory, exclusive=True):
+            histograms, counters, stale = {}, Counter(), []
+            for path, data in read_metrics(directory):
+                if path == retired_path:
+                    continue
+                if data['pid'] == os.getpid():
+                    if data.get('started') == self._started:
+                        continue
+                elif process_alive(data['pid']):
+                    continue
+                merge_metrics(histograms, counters, data)
+                stale.append(path)
+            if not stale:
+                return
+            try:
+                with open(retired_path, encoding='utf-8') as fh:
+                    merge_metrics(histograms, counters, json.load(fh))
+            except (OSError, ValueError):
+                pass
+            _write_json(retired_path, {
+                'pid': None,
+                'histograms': [
+                    [view_name, metric, snapshot]
+                    for (view_name, metric), snapshot in histograms.items()
+                ],
+                'counters': [
+                    [name, dict(labels), value]
+                    for (name, labels), value in counters.items()
+                ],
+                'gauges': {},
+            })
+            for path in stale:
+                os.remove(path)
+
+
+registry = Registry()
+
+# Сумма метрик завершившихся процессов.
+RETIRED_NAME = 'retired.json'
+
+
+def _write_json(path, data):
+    tmp_path = f'{path}.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as fh:
+        json.dump(data, fh)
+    os.replace(tmp_path, path)
+
+
+def process_alive(pid):
+    if pid is None:
+        return False
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+@contextmanager
+def metrics_lock(directory, exclusive=False):
+    """
+    Блокировка каталога метрик между процессами.
+
+    Экспорт читает файлы под общей блокировкой, а retire_stale()
+    переносит их под исключительной, чтобы метрики завершившегося
+    процесса не попали в экспорт дважды и не пропали из него.
+    """
+    os.makedirs(directory, exist_ok=True)
+    with open(os.path.join(directory, '.lock'), 'a') as fh:
+        fcntl.flock(fh, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+        try:
+            yield
+        finally:
+            fcntl.flock(fh, fcntl.LOCK_UN)
+
+
+def read_metrics(directory):
+    """Отдаёт пары (путь, данные) для файлов метрик в directory."""
+    for path in glob.glob(os.path.join(directory, '*.json')):
+        try:
+            with open(path, encoding='utf-8') as fh:
+                yield path, json.load(fh)
+        except (OSError, ValueError):
+            continue
+
+
+def merge_metrics(histograms, counters, data):
+    """Добавляет гистограммы и счётчики файла data к накопленным."""
+    for view_name, metric, snapshot in data['histograms']:
+        merged = histograms.get((view_name, metric))
+        if merged is None:
+            histograms[(view_name, metric)] = {
+                **snapshot, 'counts': list(snapshot['counts'])}
+            continue
+        merged['counts'] = [
+            a + b for a, b in zip(merged['counts'], snapshot['counts'])]
+        merged['sum'] += snapshot['sum']
+        merged['count'] += snapshot['count']
+    for name, labels, value in data['counters']:
+        counters[(name, tuple(sorted(labels.items())))] += value
+
+
+def record_cache(hits=0, misses=0):
+    """Учитывает обращения к кэшу в замерах текущего запроса."""
+    metrics = _current.get()
+    if metrics is not None:
+        metrics.cache_hits += hits
+        metrics.cache_misses += misses
+
+
+def _timed_query(metrics):
+    def wrapper(execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            metrics.db_ms += (time.perf_counter() - start) * 1000
+            metrics.queries += 1
+    return wrapper
+
+
+def server_timing(total_ms, metrics):
+    """Собирает значение заголовка Server-Timing."""
+    return ', '.join((
+        f'db;dur={metrics.db_ms:.1f};desc="{metrics.queries} queries"',
+        f'tpl;dur={metrics.template_ms:.1f}',
+        f'cache;desc="hit={metrics.cache_hits} miss={metrics.cache_misses}"',
+        f'total;dur={total_ms:.1f}',
+    ))
+
+
+class ServerTimingMiddleware:
+    """
+    Замеряет время запроса, работу с базой, шаблоны и кэш.
+
+    Время запросов к базе считается обёрткой execute_wrapper
+    на всех соединениях, время шаблона — от process_template_response
+    до окончания рендера. Замеры попадают в гистограммы по имени
+    представления (blog:index, blog:post_detail, …) и, если включён
+    SERVER_TIMING_HEADER, в заголовок Server-Timing ответа.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        metrics = RequestMetrics()
+        token = _current.set(metrics)
+        start = time.perf_counter()
+        try:
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(
+                        connection.execute_wrapper(_timed_query(metrics)))
+                response = self.get_response(request)
+        finally:
+            _current.reset(token)
+        total_ms = (time.perf_counter() - start) * 1000
+        match = request.resolver_match
+        view_name = match.view_name if match else 'unresolved'
+        registry.observe(view_name, {
+            'total_ms': total_ms,
+            'db_ms': metrics.db_ms,
+            'queries': metrics.queries,
+            'template_ms': metrics.template_ms,
+            'cache_hits': metrics.cache_hits,
+            'cache_misses': metrics.cache_misses,
+        })
+        registry.maybe_persist()
+        if settings.SERVER_TIMING_HEADER:
+            response['Server-Timing'] = server_timing(total_ms, metrics)
+        return response
+
+    def process_template_response(self, request, response):
+        metrics = _current.get()
+        if metrics is None:
+            return response
+        start = time.perf_counter()
+
+        def rendered(response):
+            metrics.template_ms += (time.perf_counter() - start) * 1000
+
+        response.add_post_render_callback(rendered)
+        return response
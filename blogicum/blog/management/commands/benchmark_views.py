@@ -0,0 +1,68 @@
+import asyncio
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.test import AsyncClient, Client, override_settings
+
+
+class Command(BaseCommand):
+    help = (
+        'Сравнивает пропускную способность страниц при параллельных '
+        'запросах через обработчики WSGI и ASGI. Запросы выполняются '
+        'в процессе, без сети, к настроенной базе данных. '
+        'Окружения сравниваются запуском с разными BLOGICUM_ENV.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'paths', nargs='*', default=['/'],
+            help='Адреса страниц, по умолчанию главная.',
+        )
+        parser.add_argument('--requests', type=int, default=200)
+        parser.add_argument('--concurrency', type=int, default=20)
+
+    def handle(self, *args, **options):
+        total = options['requests']
+        concurrency = options['concurrency']
+        # Тестовые клиенты обращаются к хосту testserver.
+        with override_settings(
+                ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, 'testserver']):
+            for path in options['paths']:
+                self.stdout.write(f'{path}:')
+                self.report(
+                    'WSGI', total, *self.run_wsgi(path, total, concurrency))
+                self.report('ASGI', total, *asyncio.run(
+                    self.run_asgi(path, total, concurrency)))
+
+    def report(self, name, total, elapsed, statuses):
+        self.stdout.write(
+            f'  {name}: {total / elapsed:.1f} запросов/с '
+            f'({elapsed * 1000 / total:.1f} мс на запрос), '
+            f'коды ответов: {dict(Counter(statuses))}'
+        )
+
+    @staticmethod
+    def run_wsgi(path, total, concurrency):
+        def fetch(_):
+            return Client().get(path).status_code
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(concurrency) as executor:
+            statuses = list(executor.map(fetch, range(total)))
+        return time.perf_counter() - start, statuses
+
+    @staticmethod
+    async def run_asgi(path, total, concurrency):
+        client = AsyncClient()
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def fetch():
+            async with semaphore:
+                return (await client.get(path)).status_code
+
+        start = time.perf_counter()
+        statuses = await asyncio.gather(*(fetch() for _ in range(total)))
+        return time.perf_counter() - start, statuses
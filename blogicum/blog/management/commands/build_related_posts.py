@@ -0,0 +1,25 @@
+from django.core.management.base import BaseCommand, CommandError
+
+
+class Command(BaseCommand):
+    help = (
+        'Строит списки похожих постов по сходству TF-IDF. '
+        'Запускается периодически, например раз в час; '
+        'пересчитывает посты, изменённые после прошлого запуска, '
+        'но каждый раз читает и разбирает тексты всех постов.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--all', action='store_true',
+            help='Пересчитать похожие посты для всех постов.',
+        )
+
+    def handle(self, *args, **options):
+        try:
+            from blog.related import build
+        except ImportError as error:
+            raise CommandError(
+                f'Для похожих постов нужны numpy и scipy: {error}')
+        count = build(full=options['all'])
+        self.stdout.write(f'Пересчитано постов: {count}')
@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand
+
+from blog.sitemaps import build
+
+
+class Command(BaseCommand):
+    help = (
+        'Обновляет карту сайта на диске: перестраивает только шарды '
+        'с изменившимися записями. Запускается периодически.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--full', action='store_true',
+            help='Перестроить все шарды, а не только изменившиеся.',
+        )
+
+    def handle(self, *args, **options):
+        rebuilt = build(full=options['full'])
+        self.stdout.write(f'Перестроено шардов: {rebuilt}')
@@ -0,0 +1,16 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from blog.profiling import make_token
+
+
+class Command(BaseCommand):
+    help = (
+        'Выдаёт значение заголовка X-Blogicum-Profile, с которым '
+        'запрос будет профилирован независимо от выборки.'
+    )
+
+    def handle(self, *args, **options):
+        self.stdout.write(make_token())
+        self.stderr.write(
+            f'Действует {settings.PROFILE_TOKEN_MAX_AGE} секунд.')
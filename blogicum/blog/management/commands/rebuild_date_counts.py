@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+
+from blog.date_counts import (ARCHIVE_SCOPE, TRACKED_FIELDS, get_scope,
+                              rebuild, rebuild_archive)
+
+
+class Command(BaseCommand):
+    help = 'Пересчитывает помесячные счётчики записей с нуля.'
+
+    def handle(self, *args, **options):
+        for model, field_name in TRACKED_FIELDS.items():
+            rebuild(model, field_name)
+            self.stdout.write(f'Пересчитано: {get_scope(model, field_name)}')
+        rebuild_archive()
+        self.stdout.write(f'Пересчитано: {ARCHIVE_SCOPE}')
@@ -0,0 +1,32 @@
+from datetime import timedelta
+
+from blogicum.constants import POPULAR_PERIOD_DAYS
+from django.core.management.base import BaseCommand
+from django.utils.timezone import now
+
+from blog.models import Post
+from blog.rankings import refresh, refresh_published_since
+
+
+class Command(BaseCommand):
+    help = (
+        'Пересчитывает рейтинг постов с учётом затухания. '
+        'Запускается периодически, например раз в час.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--days', type=int, default=POPULAR_PERIOD_DAYS,
+            help='Пересчитать посты, опубликованные за последние N дней.',
+        )
+        parser.add_argument(
+            '--all', action='store_true',
+            help='Пересчитать рейтинг всех постов.',
+        )
+
+    def handle(self, *args, **options):
+        if options['all']:
+            refresh(Post.objects.values_list('pk', flat=True).iterator())
+        else:
+            refresh_published_since(now() - timedelta(days=options['days']))
+        self.stdout.write('Рейтинг пересчитан.')
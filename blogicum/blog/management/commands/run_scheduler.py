@@ -0,0 +1,40 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+from django.utils.timezone import now
+
+from blog.scheduler import next_due, publish_due
+
+
+class Command(BaseCommand):
+    help = (
+        'Переводит отложенные посты в ленту, когда наступает их дата '
+        'публикации. Работает постоянно, одним процессом на сайт.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--once', action='store_true',
+            help='Перевести посты с наступившей датой и завершиться.',
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            published = publish_due()
+            if published:
+                self.stdout.write(f'В ленту переведено постов: '
+                                  f'{len(published)}')
+            if options['once']:
+                return
+            close_old_connections()
+            time.sleep(self.seconds_to_wait())
+
+    @staticmethod
+    def seconds_to_wait():
+        wait = settings.SCHEDULER_POLL_INTERVAL
+        due = next_due()
+        if due is not None:
+            wait = min(wait, max((due - now()).total_seconds(), 0))
+        return wait
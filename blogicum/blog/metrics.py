@@ -0,0 +1,171 @@
+import hmac
+from collections import Counter
+
+from django.conf import settings
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from django.http import HttpResponse
+from django.views.generic import View
+
+from .counters import view_counter
+from .instrumentation import (merge_metrics, metrics_lock, process_alive,
+                              read_metrics, registry)
+from .models import Comment, Post
+from .signals import bulk_changed
+
+# Метрика гистограммы -> (имя в экспорте, описание).
+HISTOGRAMS = {
+    'total_ms': ('blog_request_duration_milliseconds',
+                 'Время обработки запроса'),
+    'db_ms': ('blog_db_duration_milliseconds',
+              'Время запросов к базе за запрос'),
+    'queries': ('blog_db_queries', 'Число запросов к базе за запрос'),
+    'template_ms': ('blog_template_render_milliseconds',
+                    'Время рендера шаблона'),
+}
+
+# Суммы этих гистограмм экспортируются как счётчики:
+# доля попаданий считается в Prometheus как hits / (hits + misses).
+CACHE_COUNTERS = {
+    'cache_hits': ('blog_cache_hits_total', 'Попадания в кэш'),
+    'cache_misses': ('blog_cache_misses_total', 'Промахи кэша'),
+}
+
+COUNTERS = {
+    'blog_writes_total': 'Записи постов и комментариев',
+}
+
+GAUGES = {
+    'blog_view_buffer_pending': 'Просмотры в буфере, не записанные в базу',
+}
+
+registry.gauge('blog_view_buffer_pending', view_counter.pending_count)
+
+
+def collect(directory):
+    """
+    Складывает метрики всех процессов из файлов <pid>.json.
+
+    Гистограммы и счётчики суммируются по всем файлам, включая
+    retired.json с метриками завершившихся процессов, чтобы счётчики
+    не убывали; датчики — только по живым процессам.
+    """
+    histograms = {}
+    counters = Counter()
+    gauges = Counter()
+    with metrics_lock(directory):
+        for _, data in read_metrics(directory):
+            merge_metrics(histograms, counters, data)
+            if process_alive(data['pid']):
+                gauges.update(data['gauges'])
+    return histograms, counters, gauges
+
+
+def _labels(**labels):
+    return ','.join(
+        f'{name}="{value}"' for name, value in sorted(labels.items()))
+
+
+def _number(value):
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+def _header(name, help_text, kind):
+    return [f'# HELP {name} {help_text}', f'# TYPE {name} {kind}']
+
+
+def _histogram_lines(name, snapshot, view_name):
+    cumulative = 0
+    bounds = [*snapshot['buckets'], '+Inf']
+    for bound, count in zip(bounds, snapshot['counts']):
+        cumulative += count
+        labels = _labels(view=view_name, le=bound)
+        yield f'{name}_bucket{{{labels}}} {cumulative}'
+    labels = _labels(view=view_name)
+    yield f'{name}_sum{{{labels}}} {_number(snapshot["sum"])}'
+    yield f'{name}_count{{{labels}}} {snapshot["count"]}'
+
+
+def _by_metric(histograms, metric):
+    for (view_name, item), snapshot in sorted(histograms.items()):
+        if item == metric:
+            yield view_name, snapshot
+
+
+def render(histograms, counters, gauges):
+    """Выводит метрики в текстовом формате Prometheus."""
+    lines = []
+    for metric, (name, help_text) in HISTOGRAMS.items():
+        lines += _header(name, help_text, 'histogram')
+        for view_name, snapshot in _by_metric(histograms, metric):
+            lines += _histogram_lines(name, snapshot, view_name)
+    for metric, (name, help_text) in CACHE_COUNTERS.items():
+        lines += _header(name, help_text, 'counter')
+        lines += [
+            f'{name}{{{_labels(view=view_name)}}} '
+            f'{_number(snapshot["sum"])}'
+            for view_name, snapshot in _by_metric(histograms, metric)
+        ]
+    for name, help_text in COUNTERS.items():
+        lines += _header(name, help_text, 'counter')
+        lines += [
+            f'{name}{{{_labels(**dict(labels))}}} {value}'
+            for (item, labels), value in sorted(counters.items())
+            if item == name
+        ]
+    for name, help_text in GAUGES.items():
+        lines += _header(name, help_text, 'gauge')
+        lines.append(f'{name} {_number(gauges.get(name, 0))}')
+    return '\n'.join(lines) + '\n'
+
+
+class MetricsView(View):
+    """
+    Экспорт метрик всех процессов для Prometheus.
+
+    Доступен сотрудникам сайта и по заголовку
+    Authorization: Bearer <METRICS_TOKEN>. Адрес клиента не проверяется:
+    за обратным прокси REMOTE_ADDR — это адрес прокси.
+    """
+
+    def get(self, request):
+        if not (request.user.is_staff or self._token_valid(request)):
+            return HttpResponse(status=403)
+        registry.persist(settings.METRICS_DIR)
+        return HttpResponse(
+            render(*collect(settings.METRICS_DIR)),
+            content_type='text/plain; version=0.0.4; charset=utf-8',
+        )
+
+    @staticmethod
+    def _token_valid(request):
+        token = settings.METRICS_TOKEN
+        header = request.META.get('HTTP_AUTHORIZATION', '')
+        return bool(token) and hmac.compare_digest(
+            header.encode(), f'Bearer {token}'.encode())
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_save, sender=Comment)
+def count_write(sender, instance, created, raw=False, **kwargs):
+    """Считает создание и изменение постов и комментариев."""
+    if not raw:
+        registry.inc('blog_writes_total', model=sender._meta.model_name,
+                     action='create' if created else 'update')
+
+
+@receiver(post_delete, sender=Post)
+@receiver(post_delete, sender=Comment)
+def count_delete(sender, instance, **kwargs):
+    """Считает удаление постов и комментариев."""
+    registry.inc('blog_writes_total', model=sender._meta.model_name,
+                 action='delete')
+
+
+@receiver(bulk_changed, sender=Post)
+@receiver(bulk_changed, sender=Comment)
+def count_bulk_update(sender, pks, deleted, **kwargs):
+    """Считает пакетные изменения; пакетные удаления уже учтены поштучно."""
+    if not deleted:
+        registry.inc('blog_writes_total', len(pks),
+                     model=sender._meta.model_name, action='update')
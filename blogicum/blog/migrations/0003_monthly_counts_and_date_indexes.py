@@ -0,0 +1,89 @@
+# Generated by Django 3.2.16 on 2026-10-19 09:25
+
+from django.db import migrations, models
+from django.db.models import Count
+from django.db.models.functions import TruncMonth
+
+TRACKED_FIELDS = (
+    ('post', 'pub_date'),
+    ('category', 'created_at'),
+    ('location', 'created_at'),
+    ('comment', 'created_at'),
+)
+
+
+def fill_monthly_counts(apps, schema_editor):
+    MonthlyCount = apps.get_model('blog', 'MonthlyCount')
+    for model_name, field_name in TRACKED_FIELDS:
+        model = apps.get_model('blog', model_name)
+        rows = (
+            model.objects.order_by()
+            .annotate(month=TruncMonth(field_name))
+            .values('month')
+            .annotate(total=Count('pk'))
+        )
+        MonthlyCount.objects.bulk_create(
+            MonthlyCount(
+                scope=f'blog.{model_name}.{field_name}',
+                year=row['month'].year,
+                month=row['month'].month,
+                count=row['total'],
+            )
+            for row in rows
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0002_delete_profile'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MonthlyCount',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('scope', models.CharField(max_length=256, verbose_name='Область')),
+                ('year', models.PositiveSmallIntegerField(verbose_name='Год')),
+                ('month', models.PositiveSmallIntegerField(verbose_name='Месяц')),
+                ('count', models.IntegerField(default=0, verbose_name='Количество')),
+            ],
+            options={
+                'verbose_name': 'число записей за месяц',
+                'verbose_name_plural': 'Число записей по месяцам',
+                'ordering': ('scope', 'year', 'month'),
+            },
+        ),
+        migrations.AlterField(
+            model_name='category',
+            name='created_at',
+            field=models.DateTimeField(auto_now_add=True, db_index=True, verbose_name='Добавлено'),
+        ),
+        migrations.AlterField(
+            model_name='comment',
+            name='created_at',
+            field=models.DateTimeField(auto_now_add=True, db_index=True, verbose_name='Добавлено'),
+        ),
+        migrations.AlterField(
+            model_name='location',
+            name='created_at',
+            field=models.DateTimeField(auto_now_add=True, db_index=True, verbose_name='Добавлено'),
+        ),
+        migrations.AlterField(
+            model_name='post',
+            name='created_at',
+            field=models.DateTimeField(auto_now_add=True, db_index=True, verbose_name='Добавлено'),
+        ),
+        migrations.AlterField(
+            model_name='post',
+            name='pub_date',
+            field=models.DateTimeField(db_index=True, help_text='Если установить дату и время в будущем — можно делать отложенные публикации.', verbose_name='Дата и время публикации'),
+        ),
+        migrations.AddConstraint(
+            model_name='monthlycount',
+            constraint=models.UniqueConstraint(fields=('scope', 'year', 'month'), name='unique_monthly_count'),
+        ),
+        migrations.RunPython(
+            fill_monthly_counts, migrations.RunPython.noop),
+    ]
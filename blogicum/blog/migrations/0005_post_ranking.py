@@ -0,0 +1,54 @@
+# Generated by Django 3.2.16 on 2026-10-19 09:27
+
+from django.db import migrations, models
+from django.db.models import Count
+import django.db.models.deletion
+
+
+def fill_rankings(apps, schema_editor):
+    Post = apps.get_model('blog', 'Post')
+    PostRanking = apps.get_model('blog', 'PostRanking')
+    posts = Post.objects.order_by().annotate(
+        comments_total=Count('comments')
+    ).values_list('pk', 'comments_total', 'view_count')
+    PostRanking.objects.bulk_create(
+        (
+            PostRanking(post_id=pk, comment_count=comments,
+                        view_count=views)
+            for pk, comments, views in posts.iterator()
+        ),
+        batch_size=500,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0004_post_view_count'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PostRanking',
+            fields=[
+                ('post', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='ranking', serialize=False, to='blog.post', verbose_name='Публикация')),
+                ('comment_count', models.PositiveIntegerField(default=0, verbose_name='Комментарии')),
+                ('view_count', models.PositiveIntegerField(default=0, verbose_name='Просмотры')),
+                ('score', models.FloatField(default=0, verbose_name='Рейтинг')),
+                ('refreshed_at', models.DateTimeField(auto_now=True, verbose_name='Пересчитано')),
+            ],
+            options={
+                'verbose_name': 'рейтинг публикации',
+                'verbose_name_plural': 'Рейтинги публикаций',
+            },
+        ),
+        migrations.AddIndex(
+            model_name='postranking',
+            index=models.Index(fields=['-score', '-post'], name='ranking_score_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='postranking',
+            index=models.Index(fields=['-comment_count', '-post'], name='ranking_comments_idx'),
+        ),
+        migrations.RunPython(fill_rankings, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 3.2.16 on 2026-10-19 09:29
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0005_post_ranking'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Watermark',
+            fields=[
+                ('key', models.CharField(max_length=256, primary_key=True, serialize=False, verbose_name='Ключ')),
+                ('changed_at', models.DateTimeField(verbose_name='Изменено')),
+            ],
+            options={
+                'verbose_name': 'отметка изменений',
+                'verbose_name_plural': 'Отметки изменений',
+            },
+        ),
+        migrations.AddField(
+            model_name='post',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, db_index=True, verbose_name='Изменено'),
+        ),
+    ]
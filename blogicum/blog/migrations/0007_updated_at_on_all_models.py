@@ -0,0 +1,34 @@
+# Generated by Django 3.2.16 on 2026-10-19 09:32
+
+import blog.models
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0006_post_updated_at_watermark'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='category',
+            name='updated_at',
+            field=blog.models.ModificationDateTimeField(auto_now=True, db_index=True, verbose_name='Изменено'),
+        ),
+        migrations.AddField(
+            model_name='comment',
+            name='updated_at',
+            field=blog.models.ModificationDateTimeField(auto_now=True, db_index=True, verbose_name='Изменено'),
+        ),
+        migrations.AddField(
+            model_name='location',
+            name='updated_at',
+            field=blog.models.ModificationDateTimeField(auto_now=True, db_index=True, verbose_name='Изменено'),
+        ),
+        migrations.AlterField(
+            model_name='post',
+            name='updated_at',
+            field=blog.models.ModificationDateTimeField(auto_now=True, db_index=True, verbose_name='Изменено'),
+        ),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 3.2.16 on 2026-10-19 09:32
+
+from django.db import migrations, models
+from django.utils.text import Truncator
+
+EXCERPT_WORDS = 30
+
+
+def fill_excerpts(apps, schema_editor):
+    Post = apps.get_model('blog', 'Post')
+    batch = []
+    for post in Post.objects.only('pk', 'text').iterator():
+        post.excerpt = Truncator(post.text).words(EXCERPT_WORDS)
+        batch.append(post)
+        if len(batch) == 500:
+            Post.objects.bulk_update(batch, ['excerpt'])
+            batch = []
+    Post.objects.bulk_update(batch, ['excerpt'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0007_updated_at_on_all_models'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='excerpt',
+            field=models.TextField(blank=True, default='', editable=False, help_text='Заполняется автоматически из текста при сохранении.', verbose_name='Анонс'),
+        ),
+        migrations.RunPython(fill_excerpts, migrations.RunPython.noop),
+    ]
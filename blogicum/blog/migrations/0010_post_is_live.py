@@ -0,0 +1,40 @@
+# Generated by Django 3.2.16 on 2026-10-19 09:58
+
+from django.db import migrations, models
+from django.utils.timezone import now
+
+
+def fill_is_live(apps, schema_editor):
+    Post = apps.get_model('blog', 'Post')
+    Post.objects.filter(is_published=True, pub_date__lte=now()).update(
+        is_live=True)
+    Post.objects.filter(fanned_out=True).update(fanned_out_at=now())
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0009_follows_and_timelines'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='is_live',
+            field=models.BooleanField(default=False, editable=False, help_text='Опубликован и дата публикации наступила; отложенные посты переводит в ленту run_scheduler.', verbose_name='В ленте'),
+        ),
+        migrations.AddField(
+            model_name='post',
+            name='fanned_out_at',
+            field=models.DateTimeField(editable=False, help_text='Если пусто, пост попадает в ленты подписок при их показе.', null=True, verbose_name='Разослан в ленты подписчиков'),
+        ),
+        migrations.RunPython(fill_is_live, migrations.RunPython.noop),
+        migrations.RemoveField(
+            model_name='post',
+            name='fanned_out',
+        ),
+        migrations.AddIndex(
+            model_name='post',
+            index=models.Index(fields=['is_live', '-pub_date'], name='post_live_date_idx'),
+        ),
+    ]
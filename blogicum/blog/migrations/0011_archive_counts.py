@@ -0,0 +1,44 @@
+# Generated by Django 3.2.16 on 2026-10-19 10:02
+
+from django.db import migrations
+from django.db.models import Count
+from django.db.models.functions import TruncMonth
+
+ARCHIVE_SCOPE = 'blog.post.archive'
+
+
+def fill_archive_counts(apps, schema_editor):
+    MonthlyCount = apps.get_model('blog', 'MonthlyCount')
+    Post = apps.get_model('blog', 'Post')
+    rows = (
+        Post.objects.filter(is_live=True, category__is_published=True)
+        .order_by()
+        .annotate(month=TruncMonth('pub_date'))
+        .values('month')
+        .annotate(total=Count('pk'))
+    )
+    MonthlyCount.objects.bulk_create(
+        MonthlyCount(
+            scope=ARCHIVE_SCOPE,
+            year=row['month'].year,
+            month=row['month'].month,
+            count=row['total'],
+        )
+        for row in rows
+    )
+
+
+def clear_archive_counts(apps, schema_editor):
+    apps.get_model('blog', 'MonthlyCount').objects.filter(
+        scope=ARCHIVE_SCOPE).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0010_post_is_live'),
+    ]
+
+    operations = [
+        migrations.RunPython(fill_archive_counts, clear_archive_counts),
+    ]
@@ -0,0 +1,62 @@
+# Generated by Django 3.2.16 on 2026-10-19 10:22
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+from django.utils.timezone import now
+
+
+def fill_timeline_posts(apps, schema_editor):
+    Post = apps.get_model('blog', 'Post')
+    TimelinePost = apps.get_model('blog', 'TimelinePost')
+    visible = Post.objects.filter(
+        is_live=True, category__is_published=True,
+    ).values_list('pk', 'author_id', 'pub_date', 'fanned_out_at')
+    TimelinePost.objects.bulk_create(
+        (
+            TimelinePost(post_id=pk, author_id=author_id, pub_date=pub_date,
+                         fanned_out=fanned_out_at is not None)
+            for pk, author_id, pub_date, fanned_out_at in visible.iterator()
+        ),
+        batch_size=1000,
+    )
+
+
+def restore_fanned_out_at(apps, schema_editor):
+    Post = apps.get_model('blog', 'Post')
+    TimelinePost = apps.get_model('blog', 'TimelinePost')
+    Post.objects.filter(pk__in=TimelinePost.objects.filter(
+        fanned_out=True).values('post_id')).update(fanned_out_at=now())
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('blog', '0012_related_posts'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TimelinePost',
+            fields=[
+                ('post', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='timeline_state', serialize=False, to='blog.post', verbose_name='Публикация')),
+                ('pub_date', models.DateTimeField(verbose_name='Дата публикации')),
+                ('fanned_out', models.BooleanField(verbose_name='Разослан в ленты подписчиков')),
+                ('author', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to=settings.AUTH_USER_MODEL, verbose_name='Автор')),
+            ],
+            options={
+                'verbose_name': 'пост лент подписок',
+                'verbose_name_plural': 'Посты лент подписок',
+            },
+        ),
+        migrations.AddIndex(
+            model_name='timelinepost',
+            index=models.Index(fields=['author', 'fanned_out', '-pub_date'], name='timeline_post_author_idx'),
+        ),
+        migrations.RunPython(fill_timeline_posts, restore_fanned_out_at),
+        migrations.RemoveField(
+            model_name='post',
+            name='fanned_out_at',
+        ),
+    ]
@@ -0,0 +1,56 @@
+# Generated by Django 3.2.16 on 2026-10-19 11:40
+
+from django.db import migrations
+from django.db.models import Count
+
+# Значения TIMELINE_FANOUT_MAX_FOLLOWERS и BULK_CHUNK_SIZE на момент миграции.
+FANOUT_MAX_FOLLOWERS = 1000
+CHUNK_SIZE = 1000
+
+
+def fan_out_old_posts(apps, schema_editor):
+    """
+    Раскладывает по лентам посты, опубликованные до 0009.
+
+    Такие посты получили в 0013 fanned_out=False и подмешивались
+    в ленты при показе; у авторов с небольшим числом подписчиков
+    они раскладываются в TimelineEntry, как новые.
+    """
+    Follow = apps.get_model('blog', 'Follow')
+    TimelineEntry = apps.get_model('blog', 'TimelineEntry')
+    TimelinePost = apps.get_model('blog', 'TimelinePost')
+    authors = (
+        Follow.objects.order_by().values('author_id')
+        .annotate(followers=Count('pk'))
+        .filter(followers__lte=FANOUT_MAX_FOLLOWERS)
+        .values_list('author_id', flat=True)
+    )
+    for author_id in authors.iterator():
+        posts = TimelinePost.objects.filter(
+            author_id=author_id, fanned_out=False)
+        user_ids = list(Follow.objects.filter(
+            author_id=author_id).values_list('user_id', flat=True))
+        batch = []
+        for post_id, pub_date in posts.values_list('post_id', 'pub_date'):
+            batch.extend(
+                TimelineEntry(user_id=user_id, post_id=post_id,
+                              pub_date=pub_date)
+                for user_id in user_ids
+            )
+            if len(batch) >= CHUNK_SIZE:
+                TimelineEntry.objects.bulk_create(
+                    batch, ignore_conflicts=True)
+                batch = []
+        TimelineEntry.objects.bulk_create(batch, ignore_conflicts=True)
+        posts.update(fanned_out=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0013_timeline_posts'),
+    ]
+
+    operations = [
+        migrations.RunPython(fan_out_old_posts, migrations.RunPython.noop),
+    ]
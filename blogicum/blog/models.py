@@ -1,13 +1,119 @@
 from blogicum.constants import (TITLE_MAX_LENGTH,
                                 MAX_COMM_TEXT_LENGTH,
-                                CHARFIELD_MAX_LENGTH)
+                                CHARFIELD_MAX_LENGTH,
+                                EXCERPT_WORDS)
 from django.contrib.auth import get_user_model
 from django.db import models
+from django.db.models import Case, Max, Q, Value, When
 from django.urls import reverse
+from django.utils.text import Truncator
+from django.utils.timezone import now
 
 User = get_user_model()
 
 
+def make_excerpt(text):
+    """Возвращает анонс поста: первые EXCERPT_WORDS слов текста."""
+    return Truncator(text).words(EXCERPT_WORDS)
+
+
+class BlogQuerySet(models.QuerySet):
+    """QuerySet, поддерживающий updated_at при пакетных обновлениях."""
+
+    def update(self, **kwargs):
+        """Обновляет записи и сдвигает их updated_at, если он не задан."""
+        kwargs.setdefault('updated_at', now())
+        return super().update(**kwargs)
+
+    def update_silently(self, **kwargs):
+        """
+        Обновляет записи, не трогая updated_at.
+
+        Для служебных полей вроде счётчика просмотров, которые
+        не меняют то, что видит читатель.
+        """
+        return super().update(**kwargs)
+
+    def last_changed(self):
+        """Возвращает наибольший updated_at в выборке."""
+        return self.aggregate(last_changed=Max('updated_at'))['last_changed']
+
+
+class PostQuerySet(BlogQuerySet):
+    """
+    QuerySet постов, поддерживающий is_live при пакетных операциях.
+
+    update() и update_silently() пересчитывают is_live, если меняются
+    is_published или pub_date (значениями, а не выражениями),
+    bulk_create() — для каждого создаваемого поста.
+    """
+
+    @staticmethod
+    def _with_live(kwargs):
+        if 'is_live' not in kwargs and (
+                'is_published' in kwargs or 'pub_date' in kwargs):
+            kwargs['is_live'] = live_expression(
+                kwargs.get('is_published'), kwargs.get('pub_date'))
+        return kwargs
+
+    def update(self, **kwargs):
+        return super().update(**self._with_live(kwargs))
+
+    def update_silently(self, **kwargs):
+        return super().update_silently(**self._with_live(kwargs))
+
+    def bulk_create(self, objs, *args, **kwargs):
+        objs = list(objs)
+        for post in objs:
+            post.is_live = live_now(post.is_published, post.pub_date)
+        return super().bulk_create(objs, *args, **kwargs)
+
+
+def live_now(is_published, pub_date):
+    """
+    Проверяет, в ленте ли пост: опубликован и дата публикации прошла.
+
+    Момент публикации ещё не в ленте, как и в прежнем фильтре
+    pub_date__lt=now().
+    """
+    return bool(is_published) and pub_date < now()
+
+
+def live_expression(is_published=None, pub_date=None):
+    """
+    Возвращает значение is_live для UPDATE.
+
+    Заданные is_published и pub_date подставляются как новые
+    значения, незаданные берутся из строки.
+    """
+    moment = now()
+    if is_published is False or (
+            pub_date is not None and pub_date >= moment):
+        return Value(False)
+    condition = Q()
+    if is_published is None:
+        condition &= Q(is_published=True)
+    if pub_date is None:
+        condition &= Q(pub_date__lt=moment)
+    if not condition:
+        return Value(True)
+    return Case(When(condition, then=Value(True)), default=Value(False))
+
+
+class ModificationDateTimeField(models.DateTimeField):
+    """
+    Индексированная дата последнего изменения записи.
+
+    Обновляется при save(), а благодаря BlogQuerySet — и при
+    пакетных update().
+    """
+
+    def __init__(self, *args, **kwargs):
+        kwargs.setdefault('auto_now', True)
+        kwargs.setdefault('db_index', True)
+        super().__init__(*args, **kwargs)
+
+
 class BaseBlogModel(models.Model):
     is_published = models.BooleanField(
         'Опубликовано',
@@ -15,7 +121,11 @@ class BaseBlogModel(models.Model):
         help_text='Снимите галочку, чтобы скрыть публикацию.'
     )
     created_at = models.DateTimeField('Добавлено',
-                                      auto_now_add=True)
+                                      auto_now_add=True,
+                                      db_index=True)
+    updated_at = ModificationDateTimeField('Изменено')
+
+    objects = BlogQuerySet.as_manager()
 
     class Meta:
         abstract = True
@@ -59,8 +169,16 @@ class Post(BaseBlogModel):
     title = models.CharField('Заголовок',
                              max_length=CHARFIELD_MAX_LENGTH)
     text = models.TextField('Текст')
+    excerpt = models.TextField(
+        'Анонс',
+        blank=True,
+        default='',
+        editable=False,
+        help_text='Заполняется автоматически из текста при сохранении.',
+    )
     pub_date = models.DateTimeField(
         'Дата и время публикации',
+        db_index=True,
         help_text='Если установить дату и время в будущем — '
                   'можно делать отложенные публикации.'
     )
@@ -81,16 +199,50 @@ class Post(BaseBlogModel):
         on_delete=models.SET_NULL,
         verbose_name='Местоположение',
     )
+    view_count = models.PositiveIntegerField(
+        'Просмотры',
+        default=0,
+        editable=False,
+    )
+    is_live = models.BooleanField(
+        'В ленте',
+        default=False,
+        editable=False,
+        help_text='Опубликован и дата публикации наступила; '
+                  'отложенные посты переводит в ленту run_scheduler.',
+    )
+
+    objects = PostQuerySet.as_manager()
 
     class Meta(BaseBlogModel.Meta):
         default_related_name = 'posts'
         verbose_name = 'публикация'
         verbose_name_plural = 'Публикации'
         ordering = ('-pub_date',)
+        indexes = (
+            models.Index(fields=('is_live', '-pub_date'),
+                         name='post_live_date_idx'),
+        )
 
     def __str__(self) -> str:
         return self.title[:TITLE_MAX_LENGTH]
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        """Запоминает загруженные значения, чтобы видеть их изменение."""
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_values = dict(zip(field_names, values))
+        return instance
+
+    def save(self, *args, **kwargs):
+        self.excerpt = make_excerpt(self.text)
+        self.is_live = live_now(self.is_published, self.pub_date)
+        super().save(*args, **kwargs)
+        self._loaded_values = {
+            field.attname: getattr(self, field.attname)
+            for field in self._meta.concrete_fields
+        }
+
     def get_absolute_url(self):
         return reverse('blog:post_detail', args=(self.pk,))
 
@@ -116,3 +268,226 @@ class Comment(BaseBlogModel):
 
     def __str__(self):
         return self.text[:MAX_COMM_TEXT_LENGTH]
+
+
+class PostRanking(models.Model):
+    """
+    Материализованные показатели поста для лент популярного.
+
+    Строки пересчитываются инкрементально в rankings.py
+    при изменении комментариев и сбросе счётчика просмотров.
+    """
+
+    post = models.OneToOneField(
+        Post,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='ranking',
+        verbose_name='Публикация',
+    )
+    comment_count = models.PositiveIntegerField('Комментарии', default=0)
+    view_count = models.PositiveIntegerField('Просмотры', default=0)
+    score = models.FloatField('Рейтинг', default=0)
+    refreshed_at = models.DateTimeField('Пересчитано', auto_now=True)
+
+    class Meta:
+        verbose_name = 'рейтинг публикации'
+        verbose_name_plural = 'Рейтинги публикаций'
+        indexes = (
+            models.Index(fields=('-score', '-post'),
+                         name='ranking_score_idx'),
+            models.Index(fields=('-comment_count', '-post'),
+                         name='ranking_comments_idx'),
+        )
+
+    def __str__(self):
+        return f'{self.post_id}: {self.score:.3f}'
+
+
+class Watermark(models.Model):
+    """
+    Момент последнего изменения данных в некоторой области.
+
+    Ключи описаны в watermarks.py; по ним дёшево, поиском
+    по первичному ключу, строятся HTTP-валидаторы лент.
+    """
+
+    key = models.CharField('Ключ', max_length=CHARFIELD_MAX_LENGTH,
+                           primary_key=True)
+    changed_at = models.DateTimeField('Изменено')
+
+    class Meta:
+        verbose_name = 'отметка изменений'
+        verbose_name_plural = 'Отметки изменений'
+
+    def __str__(self):
+        return f'{self.key}: {self.changed_at}'
+
+
+class MonthlyCount(models.Model):
+    """
+    Материализованное число записей за месяц.
+
+    scope задаёт, что именно считается, например 'blog.post.pub_date';
+    строки обновляются инкрементально обработчиками из date_counts.py.
+    """
+
+    scope = models.CharField('Область', max_length=CHARFIELD_MAX_LENGTH)
+    year = models.PositiveSmallIntegerField('Год')
+    month = models.PositiveSmallIntegerField('Месяц')
+    count = models.IntegerField('Количество', default=0)
+
+    class Meta:
+        verbose_name = 'число записей за месяц'
+        verbose_name_plural = 'Число записей по месяцам'
+        ordering = ('scope', 'year', 'month')
+        constraints = (
+            models.UniqueConstraint(
+                fields=('scope', 'year', 'month'),
+                name='unique_monthly_count',
+            ),
+        )
+
+    def __str__(self):
+        return f'{self.scope} {self.year}-{self.month:02}: {self.count}'
+
+
+class Follow(models.Model):
+    """Подписка пользователя на публикации автора."""
+
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='following',
+        verbose_name='Подписчик',
+    )
+    author = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='followers',
+        verbose_name='Автор',
+    )
+    created_at = models.DateTimeField('Подписан', auto_now_add=True)
+
+    class Meta:
+        verbose_name = 'подписка'
+        verbose_name_plural = 'Подписки'
+        constraints = (
+            models.UniqueConstraint(
+                fields=('user', 'author'), name='unique_follow'),
+        )
+
+    def __str__(self):
+        return f'{self.user} → {self.author}'
+
+
+class TimelineEntry(models.Model):
+    """
+    Пост в предрассчитанной ленте подписок пользователя.
+
+    Строки раскладываются при публикации поста (timelines.py);
+    pub_date скопирована из поста, чтобы лента читалась
+    по индексу (user, -pub_date) без сортировки постов.
+    """
+
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='timeline_entries',
+        verbose_name='Читатель',
+    )
+    post = models.ForeignKey(
+        Post,
+        on_delete=models.CASCADE,
+        related_name='timeline_entries',
+        verbose_name='Публикация',
+    )
+    pub_date = models.DateTimeField('Дата публикации')
+
+    class Meta:
+        verbose_name = 'запись ленты подписок'
+        verbose_name_plural = 'Записи лент подписок'
+        constraints = (
+            models.UniqueConstraint(
+                fields=('user', 'post'), name='unique_timeline_entry'),
+        )
+        indexes = (
+            models.Index(fields=('user', '-pub_date'),
+                         name='timeline_user_date_idx'),
+        )
+
+    def __str__(self):
+        return f'{self.user}: {self.post_id}'
+
+
+class TimelinePost(models.Model):
+    """
+    Пост, видимый в лентах подписок, и способ его доставки.
+
+    fanned_out — пост разложен по TimelineEntry подписчиков; иначе
+    у автора слишком много подписчиков, и пост подмешивается в ленту
+    при показе по индексу (author, fanned_out, -pub_date).
+    Строки ведёт timelines.py; у скрытых постов строки нет.
+    """
+
+    post = models.OneToOneField(
+        Post,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='timeline_state',
+        verbose_name='Публикация',
+    )
+    author = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='+',
+        verbose_name='Автор',
+    )
+    pub_date = models.DateTimeField('Дата публикации')
+    fanned_out = models.BooleanField('Разослан в ленты подписчиков')
+
+    class Meta:
+        verbose_name = 'пост лент подписок'
+        verbose_name_plural = 'Посты лент подписок'
+        indexes = (
+            models.Index(fields=('author', 'fanned_out', '-pub_date'),
+                         name='timeline_post_author_idx'),
+        )
+
+    def __str__(self):
+        return f'{self.post_id}: {self.fanned_out}'
+
+
+class RelatedPost(models.Model):
+    """
+    Похожий пост с его местом в списке похожих.
+
+    Строки строит команда build_related_posts по сходству TF-IDF
+    (related.py); страница поста читает их по индексу (post, rank).
+    """
+
+    post = models.ForeignKey(
+        Post,
+        on_delete=models.CASCADE,
+        related_name='related_links',
+        verbose_name='Публикация',
+    )
+    related = models.ForeignKey(
+        Post,
+        on_delete=models.CASCADE,
+        related_name='+',
+        verbose_name='Похожая публикация',
+    )
+    rank = models.PositiveSmallIntegerField('Место')
+    score = models.FloatField('Сходство')
+
+    class Meta:
+        verbose_name = 'похожая публикация'
+        verbose_name_plural = 'Похожие публикации'
+        constraints = (
+            models.UniqueConstraint(
+                fields=('post', 'rank'), name='unique_related_rank'),
+        )
+
+    def __str__(self):
+        return f'{self.post_id} → {self.related_id} ({self.score:.3f})'
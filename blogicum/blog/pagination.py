@@ -0,0 +1,141 @@
+from dataclasses import dataclass
+from typing import Any, Callable, List, Optional
+
+from django.core.paginator import EmptyPage, Paginator
+from django.db.models import Q
+from django.utils.functional import cached_property
+
+
+@dataclass
+class KeysetPage:
+    """Страница ленты с курсором на следующую страницу."""
+
+    object_list: List[Any]
+    next_cursor: Optional[str]
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    @property
+    def has_next(self):
+        return self.next_cursor is not None
+
+
+class KeysetPaginator:
+    """
+    Пагинация по ключу вместо OFFSET.
+
+    Лента сортируется по (key, pk) по убыванию, а курсор хранит
+    значения последней строки страницы, поэтому стоимость запроса
+    не растёт с номером страницы и не требует COUNT(*).
+    """
+
+    def __init__(self, queryset, key, per_page,
+                 parse: Callable[[str], Any] = str,
+                 value_of: Optional[Callable[[Any], Any]] = None):
+        self.queryset = queryset.order_by(f'-{key}', '-pk')
+        self.key = key
+        self.per_page = per_page
+        self.parse = parse
+        self.value_of = value_of or self._lookup_value
+
+    def _lookup_value(self, obj):
+        value = obj
+        for part in self.key.split('__'):
+            value = getattr(value, part)
+        return value
+
+    def decode(self, cursor):
+        """Разбирает курсор; некорректный курсор означает первую страницу."""
+        if not cursor:
+            return None
+        value, sep, pk = cursor.rpartition('_')
+        if not sep:
+            return None
+        try:
+            return self.parse(value), int(pk)
+        except (TypeError, ValueError):
+            return None
+
+    @staticmethod
+    def encode(value, pk):
+        if hasattr(value, 'isoformat'):
+            value = value.isoformat()
+        return f'{value}_{pk}'
+
+    def get_page(self, cursor=None):
+        """Возвращает страницу после строки, на которую указывает курсор."""
+        queryset = self.queryset
+        position = self.decode(cursor)
+        if position is not None:
+            value, pk = position
+            queryset = queryset.filter(
+                Q(**{f'{self.key}__lt': value})
+                | Q(**{self.key: value, 'pk__lt': pk})
+            )
+        rows = list(queryset[:self.per_page + 1])
+        next_cursor = None
+        if len(rows) > self.per_page:
+            rows = rows[:self.per_page]
+            last = rows[-1]
+            next_cursor = self.encode(self.value_of(last), last.pk)
+        return KeysetPage(rows, next_cursor)
+
+
+class CountedPaginator(Paginator):
+    """
+    Пагинатор, которому число объектов передаётся готовым,
+    например из материализованных счётчиков, вместо COUNT(*).
+
+    Счётчик может отставать от объектов, поэтому page() сверяет
+    его со строками страницы и поправляет число объектов.
+    """
+
+    def __init__(self, object_list, per_page, count, **kwargs):
+        super().__init__(object_list, per_page, **kwargs)
+        self._count = count
+
+    @cached_property
+    def count(self):
+        return self._count
+
+    def _set_count(self, count):
+        self.__dict__['count'] = count
+        self.__dict__.pop('num_pages', None)
+
+    def _rows(self, number):
+        bottom = (number - 1) * self.per_page
+        return bottom, list(
+            self.object_list[bottom:bottom + self.per_page + 1])
+
+    def page(self, number):
+        """
+        Возвращает страницу, поправляя число объектов по её строкам.
+
+        Неполная страница даёт точное число объектов, лишняя строка —
+        нижнюю оценку. Если страница в пределах счётчика оказалась
+        пустой, число объектов считается COUNT(*) и отдаётся последняя
+        страница, а не 404 на ссылку из пагинатора.
+        """
+        try:
+            number = self.validate_number(number)
+        except EmptyPage:
+            number = int(number)
+            if number < 1:
+                raise
+        bottom, rows = self._rows(number)
+        if len(rows) > self.per_page:
+            self._set_count(max(self.count, bottom + len(rows)))
+        elif rows or number == 1:
+            self._set_count(bottom + len(rows))
+        else:
+            advertised = number <= self.num_pages
+            self._set_count(self.object_list.count())
+            if advertised:
+                number = max(self.num_pages, 1)
+                bottom, rows = self._rows(number)
+        number = self.validate_number(number)
+        return self._get_page(rows[:self.per_page], number, self)
@@ -0,0 +1,114 @@
+from blogicum.constants import BULK_CHUNK_SIZE, POST_CACHE_TIMEOUT
+from django.core.cache import cache
+from django.db.models import Count
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .instrumentation import record_cache
+from .models import Comment, Post
+from .signals import bulk_changed, defer, in_bulk_operation
+from .watermarks import SHARED_KEYS, last_changed
+
+
+def _generation():
+    """
+    Возвращает поколение кэша по отметке изменений общих данных.
+
+    Правка категории, места или автора меняет поколение, и все
+    закэшированные посты перестают находиться без явной очистки.
+    """
+    moment = last_changed(SHARED_KEYS.values())
+    return moment.timestamp() if moment else 0
+
+
+def _key(pk, generation):
+    return f'post-entry:{generation}:{pk}'
+
+
+def get_posts(pks, serialize):
+    """
+    Возвращает записи кэша для постов pks в виде {pk: запись}.
+
+    Запись содержит сериализованный пост (data) и поля, по которым
+    проверяется его видимость. Отсутствующие в кэше посты выбираются
+    одним запросом pk IN (...) и сохраняются в кэш. Несуществующие
+    посты тоже запоминаются пустой записью, но в результат не попадают.
+    """
+    generation = _generation()
+    keys = {pk: _key(pk, generation) for pk in pks}
+    cached = cache.get_many(keys.values())
+    entries = {
+        pk: cached[key] for pk, key in keys.items() if key in cached
+    }
+    missing = [pk for pk in pks if pk not in entries]
+    record_cache(hits=len(entries), misses=len(missing))
+    if missing:
+        posts = Post.objects.select_related(
+            'author', 'category', 'location'
+        ).annotate(comment_count=Count('comments')).filter(pk__in=missing)
+        fresh = {
+            post.pk: {
+                'data': serialize(post),
+                'author_id': post.author_id,
+                'is_live': post.is_live,
+                'category_is_published': bool(
+                    post.category and post.category.is_published),
+            }
+            for post in posts
+        }
+        cache.set_many(
+            {keys[pk]: fresh.get(pk, {}) for pk in missing},
+            POST_CACHE_TIMEOUT,
+        )
+        entries.update(fresh)
+    return {pk: entry for pk, entry in entries.items() if entry}
+
+
+def invalidate(pks):
+    """Удаляет посты из кэша текущего поколения."""
+    generation = _generation()
+    pks = list(set(pks))
+    for start in range(0, len(pks), BULK_CHUNK_SIZE):
+        cache.delete_many(
+            [_key(pk, generation)
+             for pk in pks[start:start + BULK_CHUNK_SIZE]]
+        )
+
+
+def _invalidate_or_defer(pks):
+    if in_bulk_operation():
+        defer('post_cache', pks)
+    else:
+        invalidate(pks)
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+def invalidate_post(sender, instance, raw=False, **kwargs):
+    """Удаляет из кэша изменённый или удалённый пост."""
+    if not raw:
+        _invalidate_or_defer([instance.pk])
+
+
+@receiver(post_save, sender=Comment)
+@receiver(post_delete, sender=Comment)
+def invalidate_commented_post(sender, instance, raw=False, **kwargs):
+    """Удаляет из кэша пост, у которого изменилось число комментариев."""
+    if not raw:
+        _invalidate_or_defer([instance.post_id])
+
+
+@receiver(bulk_changed)
+def invalidate_after_bulk(sender, pks, deleted, deferred, **kwargs):
+    """Удаляет из кэша посты, затронутые пакетной операцией."""
+    post_ids = list(deferred.get('post_cache', ()))
+    if sender is Post:
+        post_ids.extend(pks)
+    elif sender is Comment and not deleted:
+        for start in range(0, len(pks), BULK_CHUNK_SIZE):
+            post_ids.extend(
+                Comment.objects.filter(
+                    pk__in=pks[start:start + BULK_CHUNK_SIZE]
+                ).values_list('post_id', flat=True).distinct()
+            )
+    invalidate(post_ids)
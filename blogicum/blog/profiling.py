@@ -0,0 +1,266 @@
+import json
+import os
+import random
+import re
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.contrib import admin
+from django.core import signing
+from django.db import connections
+from django.http import Http404, HttpResponse
+from django.utils.timezone import now
+from django.views.generic import TemplateView
+
+PROFILE_HEADER = 'HTTP_X_BLOGICUM_PROFILE'
+
+PROFILED_NAMESPACES = {'blog', 'pages'}
+
+_SIGNING_SALT = 'blog.profiling'
+
+_PROFILE_ID = re.compile(r'^[\w.-]+$')
+
+
+def make_token():
+    """Возвращает подписанное значение заголовка X-Blogicum-Profile."""
+    return signing.TimestampSigner(salt=_SIGNING_SALT).sign('profile')
+
+
+def _token_valid(token):
+    try:
+        signing.TimestampSigner(salt=_SIGNING_SALT).unsign(
+            token, max_age=settings.PROFILE_TOKEN_MAX_AGE)
+    except signing.BadSignature:
+        return False
+    return True
+
+
+class StackSampler(threading.Thread):
+    """
+    Поток, снимающий стек другого потока раз в interval секунд.
+
+    Стеки копятся в виде «корень;…;вершина» с числом попаданий —
+    это свёрнутый формат, который понимают flamegraph.pl и speedscope.
+    """
+
+    def __init__(self, thread_id, interval):
+        super().__init__(daemon=True)
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks = Counter()
+        self._stopped = threading.Event()
+
+    def run(self):
+        while not self._stopped.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is not None:
+                self.stacks[self._collapse(frame)] += 1
+
+    @staticmethod
+    def _collapse(frame):
+        names = []
+        while frame is not None:
+            code = frame.f_code
+            names.append(
+                f'{frame.f_globals.get("__name__", "?")}:{code.co_name}')
+            frame = frame.f_back
+        return ';'.join(reversed(names))
+
+    def stop(self):
+        self._stopped.set()
+        self.join()
+
+
+class ProfilingSession:
+    """Профилирование одного запроса: стеки и журнал запросов к базе."""
+
+    def __init__(self, view_name, path):
+        self.view_name = view_name
+        self.path = path
+        self.queries = []
+        self.sampler = StackSampler(
+            threading.get_ident(), settings.PROFILE_INTERVAL)
+        self._stack = ExitStack()
+        self._start = None
+
+    def _log_query(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.queries.append({
+                'sql': sql,
+                'ms': round((time.perf_counter() - start) * 1000, 3),
+            })
+
+    def start(self):
+        for connection in connections.all():
+            self._stack.enter_context(
+                connection.execute_wrapper(self._log_query))
+        self._start = time.perf_counter()
+        self.sampler.start()
+
+    def finish(self, response):
+        self.sampler.stop()
+        self._stack.close()
+        save_profile({
+            'view': self.view_name,
+            'path': self.path,
+            'status': response.status_code,
+            'started_at': now().isoformat(),
+            'duration_ms': round(
+                (time.perf_counter() - self._start) * 1000, 3),
+            'interval_ms': settings.PROFILE_INTERVAL * 1000,
+            'queries': self.queries,
+            'stacks': dict(self.sampler.stacks),
+        })
+
+
+def save_profile(data):
+    """Сохраняет профиль в PROFILE_DIR и удаляет самые старые."""
+    directory = settings.PROFILE_DIR
+    os.makedirs(directory, exist_ok=True)
+    name = '{}-{}-{}'.format(
+        now().strftime('%Y%m%d%H%M%S%f'),
+        data['view'].replace(':', '.'),
+        os.getpid(),
+    )
+    path = os.path.join(directory, f'{name}.json')
+    with open(f'{path}.tmp', 'w', encoding='utf-8') as fh:
+        json.dump(data, fh)
+    os.replace(f'{path}.tmp', path)
+    for old in list_profiles()[settings.PROFILE_KEEP:]:
+        os.remove(os.path.join(directory, f'{old}.json'))
+
+
+def list_profiles():
+    """Возвращает идентификаторы профилей, начиная с новых."""
+    try:
+        names = os.listdir(settings.PROFILE_DIR)
+    except FileNotFoundError:
+        return []
+    return sorted(
+        (name[:-len('.json')] for name in names if name.endswith('.json')),
+        reverse=True,
+    )
+
+
+def load_profile(profile_id):
+    if not _PROFILE_ID.match(profile_id):
+        raise Http404
+    path = os.path.join(settings.PROFILE_DIR, f'{profile_id}.json')
+    try:
+        with open(path, encoding='utf-8') as fh:
+            return json.load(fh)
+    except (OSError, ValueError):
+        raise Http404
+
+
+class SamplingProfilerMiddleware:
+    """
+    Профилирует выборочные запросы к представлениям blog и pages.
+
+    Профилируется каждый PROFILE_SAMPLE_RATE-й запрос в среднем
+    (0 — выборка выключена) и любой запрос с подписанным заголовком
+    X-Blogicum-Profile (см. make_token()). Пока запрос обрабатывается,
+    отдельный поток снимает его стек, а соединения с базой записывают
+    запросы; результат сохраняется в PROFILE_DIR.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        session = getattr(request, '_profiling_session', None)
+        if session is not None:
+            session.finish(response)
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        match = request.resolver_match
+        if match is None or match.namespace not in PROFILED_NAMESPACES:
+            return None
+        if not self._wanted(request):
+            return None
+        request._profiling_session = ProfilingSession(
+            match.view_name, request.path)
+        request._profiling_session.start()
+        return None
+
+    @staticmethod
+    def _wanted(request):
+        token = request.META.get(PROFILE_HEADER)
+        if token:
+            return _token_valid(token)
+        rate = settings.PROFILE_SAMPLE_RATE
+        return bool(rate) and random.randrange(rate) == 0
+
+
+class ProfilerListView(TemplateView):
+    """Страница админки со списком сохранённых профилей."""
+
+    template_name = 'admin/profiles/list.html'
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context.update(admin.site.each_context(self.request))
+        context['title'] = 'Профили запросов'
+        context['profiles'] = [
+            {'id': profile_id, **self._summary(profile_id)}
+            for profile_id in list_profiles()
+        ]
+        return context
+
+    @staticmethod
+    def _summary(profile_id):
+        try:
+            data = load_profile(profile_id)
+        except Http404:
+            return {}
+        return {
+            'view': data['view'],
+            'started_at': data['started_at'],
+            'duration_ms': data['duration_ms'],
+            'queries': len(data['queries']),
+            'samples': sum(data['stacks'].values()),
+        }
+
+
+class ProfilerReportView(TemplateView):
+    """
+    Страница админки с одним профилем.
+
+    С параметром ?format=collapsed отдаёт стеки файлом
+    для flamegraph.pl или speedscope.
+    """
+
+    template_name = 'admin/profiles/detail.html'
+
+    def get(self, request, *args, **kwargs):
+        if request.GET.get('format') == 'collapsed':
+            data = load_profile(kwargs['profile_id'])
+            response = HttpResponse(
+                ''.join(f'{stack} {count}\n'
+                        for stack, count in data['stacks'].items()),
+                content_type='text/plain; charset=utf-8',
+            )
+            response['Content-Disposition'] = (
+                f'attachment; filename="{kwargs["profile_id"]}.folded"')
+            return response
+        return super().get(request, *args, **kwargs)
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context.update(admin.site.each_context(self.request))
+        profile = load_profile(kwargs['profile_id'])
+        context['title'] = f'Профиль {profile["view"]}'
+        context['profile_id'] = kwargs['profile_id']
+        context['profile'] = profile
+        context['top_stacks'] = sorted(
+            profile['stacks'].items(), key=lambda item: -item[1])[:50]
+        return context
@@ -0,0 +1,101 @@
+from blogicum.constants import (BULK_CHUNK_SIZE,
+                                RANKING_COMMENT_WEIGHT,
+                                RANKING_GRAVITY)
+from django.db import transaction
+from django.db.models import Count
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from django.utils.timezone import now
+
+from .models import Comment, Post, PostRanking
+from .signals import bulk_changed, defer, in_bulk_operation, views_flushed
+
+
+def calculate_score(view_count, comment_count, pub_date, moment):
+    """
+    Считает рейтинг с затуханием по возрасту поста.
+
+    Вес активности делится на (возраст в часах + 2) в степени
+    RANKING_GRAVITY, поэтому свежие обсуждения обгоняют старые.
+    """
+    age_hours = max((moment - pub_date).total_seconds() / 3600, 0)
+    activity = view_count + RANKING_COMMENT_WEIGHT * comment_count
+    return activity / (age_hours + 2) ** RANKING_GRAVITY
+
+
+def refresh(post_ids):
+    """Пересчитывает строки рейтинга для указанных постов."""
+    post_ids = list(set(post_ids))
+    moment = now()
+    for start in range(0, len(post_ids), BULK_CHUNK_SIZE):
+        _refresh_chunk(post_ids[start:start + BULK_CHUNK_SIZE], moment)
+
+
+def _refresh_chunk(post_ids, moment):
+    posts = Post.objects.filter(pk__in=post_ids).order_by().annotate(
+        comments_total=Count('comments')
+    ).values_list('pk', 'comments_total', 'view_count', 'pub_date')
+    rankings = [
+        PostRanking(
+            post_id=pk,
+            comment_count=comments,
+            view_count=views,
+            score=calculate_score(views, comments, pub_date, moment),
+            refreshed_at=moment,
+        )
+        for pk, comments, views, pub_date in posts
+    ]
+    existing = set(
+        PostRanking.objects.filter(pk__in=post_ids)
+        .values_list('pk', flat=True)
+    )
+    with transaction.atomic():
+        PostRanking.objects.bulk_update(
+            [ranking for ranking in rankings if ranking.pk in existing],
+            ('comment_count', 'view_count', 'score', 'refreshed_at'),
+        )
+        PostRanking.objects.bulk_create(
+            [ranking for ranking in rankings if ranking.pk not in existing]
+        )
+
+
+def refresh_published_since(since):
+    """Пересчитывает рейтинг постов, опубликованных после since."""
+    post_ids = Post.objects.filter(
+        pub_date__gte=since
+    ).values_list('pk', flat=True)
+    refresh(post_ids.iterator())
+
+
+@receiver(post_save, sender=Post)
+def refresh_saved_post(sender, instance, raw=False, **kwargs):
+    """Заводит или обновляет строку рейтинга сохранённого поста."""
+    if not raw:
+        refresh([instance.pk])
+
+
+@receiver(post_save, sender=Comment)
+@receiver(post_delete, sender=Comment)
+def refresh_commented_post(sender, instance, raw=False, **kwargs):
+    """Пересчитывает рейтинг поста после изменения его комментариев."""
+    if raw:
+        return
+    post_id = instance.post_id
+    if in_bulk_operation():
+        defer('rankings', [post_id])
+    else:
+        # После фиксации транзакции: при каскадном удалении поста
+        # строка рейтинга не должна появиться заново.
+        transaction.on_commit(lambda: refresh([post_id]))
+
+
+@receiver(bulk_changed, sender=Comment)
+def refresh_after_bulk(sender, deferred, **kwargs):
+    """Пересчитывает рейтинг постов, затронутых пакетным удалением."""
+    refresh(deferred.get('rankings', ()))
+
+
+@receiver(views_flushed)
+def refresh_viewed_posts(sender, counts, **kwargs):
+    """Обновляет рейтинг постов, чьи просмотры записаны в базу."""
+    refresh(counts)
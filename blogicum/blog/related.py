@@ -0,0 +1,248 @@
+"""
+Похожие посты по косинусному сходству векторов TF-IDF.
+
+Модуль нужен только команде build_related_posts и требует
+numpy и scipy; страница поста читает готовые строки RelatedPost.
+"""
+import re
+from collections import Counter, defaultdict
+
+import numpy as np
+from blogicum.constants import (BULK_CHUNK_SIZE, RELATED_BATCH_SIZE,
+                                RELATED_MIN_SCORE, RELATED_POSTS_COUNT)
+from django.db import transaction
+from django.db.models import Q
+from django.utils.timezone import now
+from scipy import sparse
+
+from .date_counts import ARCHIVED
+from .models import Post, RelatedPost, Watermark
+from .watermarks import RELATED, last_changed, related_category_key, touch
+
+_WORD = re.compile(r'[^\W\d_]{3,}')
+
+
+def tokenize(text):
+    """Разбивает текст на слова от трёх букв в нижнем регистре."""
+    return _WORD.findall(text.lower())
+
+
+def build_matrix(documents):
+    """
+    Строит нормированную матрицу TF-IDF по парам (id, текст).
+
+    Возвращает массив id и разреженную матрицу CSR, где строка —
+    документ. Частота слова берётся в логарифмической шкале;
+    слова, встретившиеся лишь в одном документе, отбрасываются:
+    на сходство они не влияют, а матрицу раздувают.
+    """
+    ids, indptr, indices, counts = [], [0], [], []
+    vocabulary = {}
+    for pk, text in documents:
+        terms = Counter(
+            vocabulary.setdefault(word, len(vocabulary))
+            for word in tokenize(text)
+        )
+        ids.append(pk)
+        indices.extend(terms.keys())
+        counts.extend(terms.values())
+        indptr.append(len(indices))
+    if not ids:
+        return np.array(ids, dtype=int), sparse.csr_matrix((0, 0))
+    matrix = sparse.csr_matrix(
+        (np.array(counts, dtype=np.float32), indices, indptr),
+        shape=(len(ids), len(vocabulary)),
+    )
+    frequencies = np.bincount(matrix.indices, minlength=matrix.shape[1])
+    shared = np.flatnonzero(frequencies > 1)
+    matrix = matrix[:, shared]
+    matrix.data = 1 + np.log(matrix.data)
+    idf = np.log((1 + len(ids)) / (1 + frequencies[shared])) + 1
+    matrix = matrix @ sparse.diags(idf.astype(np.float32))
+    norms = np.sqrt(matrix.multiply(matrix).sum(axis=1)).A1
+    norms[norms == 0] = 1
+    return np.array(ids), (sparse.diags(1 / norms) @ matrix).tocsr()
+
+
+def score_batches(matrix, rows):
+    """
+    Отдаёт сходство строк rows со всеми документами пачками.
+
+    За шаг перемножается RELATED_BATCH_SIZE строк, поэтому в памяти
+    лежит плотная матрица не больше RELATED_BATCH_SIZE × N.
+    Сходство документа с самим собой обнуляется.
+    """
+    transposed = matrix.T.tocsc()
+    for start in range(0, len(rows), RELATED_BATCH_SIZE):
+        batch = rows[start:start + RELATED_BATCH_SIZE]
+        scores = (matrix[batch] @ transposed).toarray()
+        scores[np.arange(len(batch)), batch] = 0
+        yield batch, scores
+
+
+def top_neighbours(scores, count=RELATED_POSTS_COUNT):
+    """
+    Возвращает номера и сходство count самых похожих столбцов
+    каждой строки scores по убыванию сходства.
+
+    argpartition отбирает их без сортировки всей строки.
+    """
+    count = min(count, scores.shape[1])
+    columns = np.argpartition(-scores, count - 1, axis=1)[:, :count]
+    values = np.take_along_axis(scores, columns, axis=1)
+    order = np.argsort(-values, axis=1)
+    return (np.take_along_axis(columns, order, axis=1),
+            np.take_along_axis(values, order, axis=1))
+
+
+def _documents():
+    posts = Post.objects.filter(ARCHIVED).order_by('pk').values_list(
+        'pk', 'title', 'text')
+    for pk, title, text in posts.iterator():
+        yield pk, f'{title}\n{text}'
+
+
+def build(full=False):
+    """
+    Обновляет таблицу похожих постов и возвращает число
+    пересчитанных постов.
+
+    Полный пересчёт строит соседей всех видимых постов. Иначе
+    пересчитываются посты, изменённые или ставшие видимыми после
+    прошлого запуска (отметка RELATED, см. _changed_since()), а сами
+    они добавляются в списки похожих остальных постов. Списки,
+    в которых остались скрытые с тех пор посты, строятся заново;
+    прочие оценки остаются прежними до следующего полного пересчёта.
+
+    Матрица TF-IDF и веса IDF строятся заново по всем видимым постам
+    при каждом запуске, поэтому чтение и разбор текстов — O(число
+    постов) и в инкрементальном режиме; экономится только
+    перемножение, квадратичное по числу постов. Это фоновая задача
+    для периодического запуска, а не для обработки запроса.
+    """
+    started = now()
+    since = None if full else last_changed([RELATED])
+    ids, matrix = build_matrix(_documents())
+    if since is None:
+        rows = np.arange(len(ids))
+        changed = None
+    else:
+        changed = _changed_since(since)
+        stale = _stale_lists() - changed
+        rows = np.flatnonzero(np.isin(ids, list(changed)))
+        stale_rows = np.flatnonzero(np.isin(ids, list(stale)))
+    neighbours = {}
+    candidates = defaultdict(list)
+    for batch, scores in score_batches(matrix, rows):
+        neighbours.update(_nearest(ids, batch, scores))
+        if changed is not None:
+            _collect_candidates(ids, batch, scores, changed, candidates)
+    if changed is not None:
+        for batch, scores in score_batches(matrix, stale_rows):
+            neighbours.update(_nearest(ids, batch, scores))
+        neighbours.update(_merge(
+            {post_id: found for post_id, found in candidates.items()
+             if post_id not in stale},
+            changed,
+        ))
+        rows = np.concatenate((rows, stale_rows))
+    with transaction.atomic():
+        if changed is None:
+            RelatedPost.objects.all().delete()
+        else:
+            RelatedPost.objects.exclude(
+                post__in=Post.objects.filter(ARCHIVED)).delete()
+            post_ids = list(neighbours)
+            for start in range(0, len(post_ids), BULK_CHUNK_SIZE):
+                RelatedPost.objects.filter(
+                    post_id__in=post_ids[start:start + BULK_CHUNK_SIZE],
+                ).delete()
+        _save(neighbours)
+        touch([RELATED], started)
+    return len(rows)
+
+
+def _changed_since(since):
+    """
+    Возвращает видимые посты, изменённые после since.
+
+    Сюда входят и посты категорий, отмеченных related_category_key():
+    после публикации категории их updated_at не меняется.
+    """
+    prefix = related_category_key('')
+    category_ids = [
+        int(key[len(prefix):]) for key in Watermark.objects.filter(
+            key__startswith=prefix, changed_at__gte=since,
+        ).values_list('key', flat=True)
+    ]
+    return set(Post.objects.filter(ARCHIVED).filter(
+        Q(updated_at__gte=since) | Q(category_id__in=category_ids)
+    ).values_list('pk', flat=True))
+
+
+def _stale_lists():
+    """Возвращает видимые посты, в списках которых есть скрытые посты."""
+    return set(RelatedPost.objects.filter(
+        post__in=Post.objects.filter(ARCHIVED),
+    ).exclude(
+        related__in=Post.objects.filter(ARCHIVED),
+    ).values_list('post_id', flat=True).distinct())
+
+
+def _nearest(ids, batch, scores):
+    columns, values = top_neighbours(scores)
+    neighbours = {}
+    for row, row_columns, row_values in zip(batch, columns, values):
+        keep = row_values >= RELATED_MIN_SCORE
+        neighbours[int(ids[row])] = list(zip(
+            ids[row_columns[keep]].tolist(), row_values[keep].tolist()))
+    return neighbours
+
+
+def _collect_candidates(ids, batch, scores, changed, candidates):
+    """
+    Собирает изменённые посты как кандидатов в похожие для остальных.
+
+    Сходство симметрично, поэтому столбцы пачки изменённых постов
+    дают их сходство со всеми остальными без нового умножения.
+    """
+    for row, column in np.argwhere(scores >= RELATED_MIN_SCORE):
+        post_id = int(ids[column])
+        if post_id not in changed:
+            candidates[post_id].append(
+                (int(ids[batch[row]]), float(scores[row, column])))
+
+
+def _merge(candidates, changed):
+    """
+    Сливает кандидатов с сохранёнными списками похожих постов.
+
+    Из сохранённых строк убираются устаревшие оценки изменённых постов.
+    """
+    stored = defaultdict(list)
+    post_ids = list(candidates)
+    for start in range(0, len(post_ids), BULK_CHUNK_SIZE):
+        rows = RelatedPost.objects.filter(
+            post_id__in=post_ids[start:start + BULK_CHUNK_SIZE],
+        ).exclude(related_id__in=changed).values_list(
+            'post_id', 'related_id', 'score')
+        for post_id, related_id, score in rows:
+            stored[post_id].append((related_id, score))
+    return {
+        post_id: sorted(
+            stored[post_id] + found, key=lambda item: -item[1],
+        )[:RELATED_POSTS_COUNT]
+        for post_id, found in candidates.items()
+    }
+
+
+def _save(neighbours):
+    RelatedPost.objects.bulk_create(
+        (
+            RelatedPost(post_id=post_id, related_id=related_id,
+                        rank=rank, score=score)
+            for post_id, related in neighbours.items()
+            for rank, (related_id, score) in enumerate(related)
+        ),
+        batch_size=BULK_CHUNK_SIZE,
+    )
@@ -0,0 +1,82 @@
+import random
+from contextvars import ContextVar
+from dataclasses import dataclass
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+
+# Кука, пока она есть, все чтения клиента идут в основную базу.
+PIN_COOKIE = 'db_primary'
+
+
+@dataclass
+class RoutingState:
+    """Состояние маршрутизации в пределах одного запроса."""
+
+    pinned: bool = False
+    wrote: bool = False
+
+
+_state = ContextVar('db_routing_state', default=None)
+
+
+class ReplicaRouter:
+    """
+    Направляет чтения на реплики из DATABASE_REPLICAS, запись — в default.
+
+    Чтение идёт в default, если реплик нет, если открыта транзакция
+    в default (её данные на репликах ещё не видны) и если клиент
+    недавно писал: тогда запрос закреплён за основной базой
+    (см. ReplicaPinMiddleware).
+    """
+
+    def db_for_read(self, model, **hints):
+        replicas = settings.DATABASE_REPLICAS
+        state = _state.get()
+        if (not replicas
+                or connections[DEFAULT_DB_ALIAS].in_atomic_block
+                or (state is not None and (state.pinned or state.wrote))):
+            return DEFAULT_DB_ALIAS
+        return random.choice(replicas)
+
+    def db_for_write(self, model, **hints):
+        state = _state.get()
+        if state is not None:
+            state.wrote = True
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db not in settings.DATABASE_REPLICAS
+
+
+class ReplicaPinMiddleware:
+    """
+    Обеспечивает чтение своих записей при работе с репликами.
+
+    После запроса, который писал в базу, клиент получает куку
+    на REPLICA_PIN_SECONDS секунд; пока она есть, его запросы
+    читают из default. Так перенаправление после создания поста
+    на профиль показывает новый пост, даже если реплика отстаёт.
+    Стоит после SessionMiddleware, чтобы сохранение сессии
+    не считалось записью.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        state = RoutingState(pinned=PIN_COOKIE in request.COOKIES)
+        token = _state.set(state)
+        try:
+            response = self.get_response(request)
+        finally:
+            _state.reset(token)
+        if state.wrote and settings.DATABASE_REPLICAS:
+            response.set_cookie(
+                PIN_COOKIE, '1', max_age=settings.REPLICA_PIN_SECONDS,
+                httponly=True, samesite='Lax',
+            )
+        return response
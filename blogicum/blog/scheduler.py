@@ -0,0 +1,28 @@
+from django.utils.timezone import now
+
+from .bulk import update_in_chunks
+from .models import Post
+
+
+def pending():
+    """Опубликованные посты, которые ещё ждут своей даты."""
+    return Post.objects.filter(is_published=True, is_live=False)
+
+
+def publish_due(moment=None):
+    """
+    Переводит в ленту посты, чья дата публикации наступила.
+
+    Обновление идёт через update_in_chunks, поэтому после него
+    срабатывают те же обработчики bulk_changed, что и при публикации
+    из админки: отметки изменений лент, кэш постов, ленты подписок.
+    Возвращает первичные ключи переведённых постов.
+    """
+    return update_in_chunks(
+        pending().filter(pub_date__lt=moment or now()), is_live=True)
+
+
+def next_due():
+    """Возвращает ближайшую дату публикации отложенного поста."""
+    return pending().order_by('pub_date').values_list(
+        'pub_date', flat=True).first()
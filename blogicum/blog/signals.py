@@ -0,0 +1,47 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.dispatch import Signal
+
+# Отправляется один раз после пакетного изменения объектов
+# в обход save()/delete(): sender — модель, pks — список
+# первичных ключей затронутых объектов, deleted — были ли они удалены,
+# deferred — работа, отложенная обработчиками до конца операции.
+bulk_changed = Signal()
+
+# Отправляется после записи буфера просмотров: counts — словарь
+# {id поста: число новых просмотров}.
+views_flushed = Signal()
+
+_bulk_state = ContextVar('bulk_state', default=None)
+
+
+def in_bulk_operation():
+    """
+    Сообщает, выполняется ли сейчас пакетная операция.
+
+    Обработчики post_save/post_delete вместо немедленной работы
+    откладывают её через defer() до сигнала bulk_changed.
+    """
+    return _bulk_state.get() is not None
+
+
+def defer(key, values):
+    """Копит значения под ключом key до конца пакетной операции."""
+    _bulk_state.get().setdefault(key, []).extend(values)
+
+
+@contextmanager
+def bulk_operation():
+    """
+    Помечает код внутри блока как часть пакетной операции.
+
+    Возвращает словарь отложенной работы, который передаётся
+    обработчикам bulk_changed.
+    """
+    deferred = {}
+    token = _bulk_state.set(deferred)
+    try:
+        yield deferred
+    finally:
+        _bulk_state.reset(token)
@@ -0,0 +1,276 @@
+import json
+import os
+from datetime import datetime
+from xml.sax.saxutils import escape
+
+from blogicum.constants import SITEMAP_SHARD_SIZE
+from django.conf import settings
+from django.db.models import BigIntegerField, ExpressionWrapper, F, Q
+from django.db.models.signals import post_delete, post_save, pre_delete
+from django.dispatch import receiver
+from django.urls import reverse
+from django.utils.timezone import now
+
+from .models import Category, Post, User, Watermark
+from .signals import defer, in_bulk_operation
+from .watermarks import sitemap_key, touch
+
+MANIFEST_NAME = 'manifest.json'
+
+SITEMAP_NS = 'http://www.sitemaps.org/schemas/sitemap/0.9'
+
+
+class Section:
+    """
+    Раздел карты сайта, разбитый на шарды по диапазонам первичных ключей.
+
+    Шард n содержит записи с pk из (n * size, (n + 1) * size], поэтому
+    запись всегда попадает в один и тот же файл и при изменении
+    перестраивается только её шард. Шарды, из которых записи
+    удалены или скрыты без изменения updated_at, помечаются
+    отметками sitemap_key() (см. mark_shards()).
+    """
+
+    name = None
+    model = None
+
+    def get_queryset(self):
+        raise NotImplementedError
+
+    def get_changed(self, since, moment):
+        """Возвращает записи, изменившиеся после since."""
+        raise NotImplementedError
+
+    def location(self, obj):
+        return obj.get_absolute_url()
+
+    def lastmod(self, obj):
+        return getattr(obj, 'updated_at', None)
+
+    @staticmethod
+    def _shards_of(queryset):
+        shard = ExpressionWrapper(
+            (F('pk') - 1) / SITEMAP_SHARD_SIZE,
+            output_field=BigIntegerField(),
+        )
+        return set(
+            queryset.annotate(shard=shard).order_by()
+            .values_list('shard', flat=True).distinct()
+        )
+
+    def all_shards(self):
+        return self._shards_of(self.get_queryset())
+
+    def changed_shards(self, since, moment):
+        return (self._shards_of(self.get_changed(since, moment))
+                | self.marked_shards(since))
+
+    def marked_shards(self, since):
+        prefix = sitemap_key(self.name, '')
+        keys = Watermark.objects.filter(
+            key__startswith=prefix, changed_at__gt=since,
+        ).values_list('key', flat=True)
+        return {int(key[len(prefix):]) for key in keys}
+
+    def iter_shard(self, shard):
+        """Построчно отдаёт записи шарда, не держа выборку в памяти."""
+        low = shard * SITEMAP_SHARD_SIZE
+        return self.get_queryset().filter(
+            pk__gt=low, pk__lte=low + SITEMAP_SHARD_SIZE
+        ).order_by('pk').iterator(chunk_size=2000)
+
+
+class PostSection(Section):
+    name = 'posts'
+    model = Post
+
+    def get_queryset(self):
+        return Post.objects.filter(
+            is_live=True,
+            category__is_published=True,
+        ).only('pk', 'updated_at')
+
+    def get_changed(self, since, moment):
+        # Посты из изменившихся категорий тоже меняют шард;
+        # переход в ленту по расписанию сдвигает updated_at поста.
+        return Post.objects.filter(
+            Q(updated_at__gt=since) | Q(category__updated_at__gt=since))
+
+
+class CategorySection(Section):
+    name = 'categories'
+    model = Category
+
+    def get_queryset(self):
+        return Category.objects.filter(
+            is_published=True).only('pk', 'slug', 'updated_at')
+
+    def get_changed(self, since, moment):
+        return Category.objects.filter(updated_at__gt=since)
+
+    def location(self, obj):
+        return reverse('blog:category_posts', args=(obj.slug,))
+
+
+class ProfileSection(Section):
+    name = 'profiles'
+    model = User
+
+    def get_queryset(self):
+        return User.objects.filter(is_active=True).only('pk', 'username')
+
+    def get_changed(self, since, moment):
+        return User.objects.filter(date_joined__gt=since)
+
+    def location(self, obj):
+        return reverse('blog:profile', args=(obj.username,))
+
+
+SECTIONS = {
+    section.name: section
+    for section in (PostSection(), CategorySection(), ProfileSection())
+}
+
+
+def shard_of(pk):
+    return (pk - 1) // SITEMAP_SHARD_SIZE
+
+
+def mark_shards(section_name, pks):
+    """
+    Помечает шарды записей pks для перестройки при следующей сборке.
+
+    Нужна для удалений: удалённую запись не найти по updated_at.
+    """
+    keys = {sitemap_key(section_name, shard_of(pk)) for pk in pks}
+    if in_bulk_operation():
+        defer('watermarks', keys)
+    else:
+        touch(keys)
+
+
+def get_root():
+    return settings.SITEMAP_ROOT
+
+
+def shard_filename(section_name, shard):
+    return f'sitemap-{section_name}-{shard}.xml'
+
+
+def _absolute(path):
+    return escape(settings.SITEMAP_BASE_URL.rstrip('/') + path)
+
+
+def _write_atomically(path, lines):
+    tmp_path = f'{path}.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as fh:
+        fh.writelines(lines)
+    os.replace(tmp_path, path)
+
+
+def _shard_lines(section, shard, stats):
+    yield '<?xml version="1.0" encoding="UTF-8"?>\n'
+    yield f'<urlset xmlns="{SITEMAP_NS}">\n'
+    for obj in section.iter_shard(shard):
+        stats['count'] += 1
+        yield f'<url><loc>{_absolute(section.location(obj))}</loc>'
+        lastmod = section.lastmod(obj)
+        if lastmod is not None:
+            yield f'<lastmod>{lastmod.date().isoformat()}</lastmod>'
+        yield '</url>\n'
+    yield '</urlset>\n'
+
+
+def _index_lines(manifest):
+    yield '<?xml version="1.0" encoding="UTF-8"?>\n'
+    yield f'<sitemapindex xmlns="{SITEMAP_NS}">\n'
+    for section_name, shards in sorted(manifest['sections'].items()):
+        for shard, info in sorted(shards.items(), key=lambda i: int(i[0])):
+            path = reverse('blog:sitemap_section',
+                           args=(section_name, int(shard)))
+            yield (
+                f'<sitemap><loc>{_absolute(path)}</loc>'
+                f'<lastmod>{info["built_at"][:10]}</lastmod></sitemap>\n'
+            )
+    yield '</sitemapindex>\n'
+
+
+def load_manifest():
+    try:
+        with open(get_root() / MANIFEST_NAME, encoding='utf-8') as fh:
+            return json.load(fh)
+    except (OSError, ValueError):
+        return None
+
+
+def build(full=False):
+    """
+    Перестраивает карту сайта на диске.
+
+    Без full перезаписываются только шарды, в которых есть записи,
+    изменившиеся после прошлой сборки, — их находят запросы
+    по индексам updated_at и pub_date, и шарды, помеченные
+    mark_shards() после удаления записей.
+    Возвращает число перезаписанных шардов.
+    """
+    root = get_root()
+    os.makedirs(root, exist_ok=True)
+    manifest = None if full else load_manifest()
+    moment = now()
+    if manifest is None:
+        manifest = {'sections': {}}
+        since = None
+    else:
+        since = datetime.fromisoformat(manifest['built_at'])
+    rebuilt = 0
+    for section in SECTIONS.values():
+        shards_info = manifest['sections'].setdefault(section.name, {})
+        if since is None:
+            shards = section.all_shards()
+        else:
+            shards = section.changed_shards(since, moment)
+        for shard in sorted(shards):
+            path = root / shard_filename(section.name, shard)
+            stats = {'count': 0}
+            _write_atomically(path, _shard_lines(section, shard, stats))
+            rebuilt += 1
+            if stats['count']:
+                shards_info[str(shard)] = {
+                    'count': stats['count'], 'built_at': moment.isoformat()}
+            else:
+                os.remove(path)
+                shards_info.pop(str(shard), None)
+    manifest['built_at'] = moment.isoformat()
+    _write_atomically(root / 'sitemap.xml', _index_lines(manifest))
+    _write_atomically(root / MANIFEST_NAME, [json.dumps(manifest)])
+    return rebuilt
+
+
+_SECTION_OF = {section.model: section.name for section in SECTIONS.values()}
+
+
+@receiver(post_delete, sender=Post)
+@receiver(post_delete, sender=Category)
+@receiver(post_delete, sender=User)
+def mark_deleted(sender, instance, **kwargs):
+    """Помечает шард удалённой записи."""
+    mark_shards(_SECTION_OF[sender], [instance.pk])
+
+
+@receiver(pre_delete, sender=Category)
+def mark_category_posts(sender, instance, **kwargs):
+    """
+    Помечает шарды постов удаляемой категории.
+
+    Посты остаются без категории (SET_NULL) и выпадают из карты,
+    но их updated_at при этом не меняется.
+    """
+    mark_shards(PostSection.name, Post.objects.filter(
+        category=instance).values_list('pk', flat=True).iterator())
+
+
+@receiver(post_save, sender=User)
+def mark_deactivated(sender, instance, raw=False, **kwargs):
+    """Помечает шард отключённого профиля: date_joined не меняется."""
+    if not raw and not instance.is_active:
+        mark_shards(ProfileSection.name, [instance.pk])
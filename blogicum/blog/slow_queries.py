@@ -0,0 +1,186 @@
+import hashlib
+import json
+import logging
+import os
+import re
+import sys
+import time
+from collections import defaultdict
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.contrib import admin
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+from django.utils.timezone import now
+from django.views.generic import TemplateView
+
+logger = logging.getLogger(__name__)
+
+_current_view = ContextVar('slow_query_view', default=None)
+
+# Списки параметров IN (%s, %s, …) разной длины — один и тот же запрос.
+_PLACEHOLDER_LIST = re.compile(r'\((?:%s,\s*)+%s\)')
+
+# Обёртки execute проекта: их кадры не считаются местом вызова.
+_OWN_FILES = tuple(
+    os.path.join(os.path.dirname(__file__), name)
+    for name in ('slow_queries.py', 'instrumentation.py', 'profiling.py')
+)
+
+
+def fingerprint(sql):
+    """Возвращает отпечаток формы запроса без учёта числа параметров IN."""
+    shape = _PLACEHOLDER_LIST.sub('(%s, ...)', sql)
+    return hashlib.sha1(shape.encode()).hexdigest()[:12], shape
+
+
+def params_fingerprint(params):
+    return hashlib.sha1(repr(params).encode()).hexdigest()[:12]
+
+
+def _template_site(frame):
+    node = frame.f_locals.get('self')
+    origin = getattr(node, 'origin', None)
+    token = getattr(node, 'token', None)
+    if origin is None or token is None:
+        return None
+    return f'{origin.template_name}:{token.lineno}'
+
+
+def call_site(frame):
+    """
+    Находит место в коде проекта и в шаблоне, откуда пришёл запрос.
+
+    Кодом проекта считаются файлы внутри BASE_DIR, кроме обёрток execute;
+    место в шаблоне берётся из ближайшего Node.render_annotated.
+    """
+    base_dir = str(settings.BASE_DIR)
+    code_site = template_site = None
+    while frame is not None and not (code_site and template_site):
+        filename = frame.f_code.co_filename
+        if (template_site is None
+                and frame.f_code.co_name == 'render_annotated'):
+            template_site = _template_site(frame)
+        if (code_site is None and filename.startswith(base_dir)
+                and filename not in _OWN_FILES):
+            code_site = (f'{os.path.relpath(filename, base_dir)}:'
+                         f'{frame.f_lineno} in {frame.f_code.co_name}')
+        frame = frame.f_back
+    return code_site, template_site
+
+
+def log_slow_queries(execute, sql, params, many, context):
+    """Обёртка execute, записывающая запросы дольше SLOW_QUERY_MS."""
+    start = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        duration_ms = (time.perf_counter() - start) * 1000
+        if duration_ms >= settings.SLOW_QUERY_MS:
+            code_site, template_site = call_site(sys._getframe(1))
+            sql_fingerprint, shape = fingerprint(sql)
+            logger.warning(json.dumps({
+                'at': now().isoformat(),
+                'ms': round(duration_ms, 3),
+                'view': _current_view.get(),
+                'code': code_site,
+                'template': template_site,
+                'fingerprint': sql_fingerprint,
+                'params': params_fingerprint(params),
+                'sql': shape,
+            }, ensure_ascii=False))
+
+
+@receiver(connection_created)
+def install_wrapper(sender, connection, **kwargs):
+    """
+    Подключает журнал медленных запросов к каждому соединению.
+
+    Обёртка ставится первой: соединение может открыться во время
+    запроса, когда execute_wrapper() замеров времени и профилировщика
+    уже добавили свои обёртки, а место вызова ищется над обёрткой.
+    """
+    if log_slow_queries not in connection.execute_wrappers:
+        connection.execute_wrappers.insert(0, log_slow_queries)
+
+
+class SlowQueryViewMiddleware:
+    """Запоминает имя представления для записей журнала медленных запросов."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        token = _current_view.set(None)
+        try:
+            return self.get_response(request)
+        finally:
+            _current_view.reset(token)
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        match = request.resolver_match
+        _current_view.set(match.view_name if match else None)
+
+
+def log_files():
+    """
+    Возвращает журналы файловых обработчиков логгера и их ротированные
+    копии.
+
+    Пути берутся у самих обработчиков, а не из настроек, поэтому
+    отчёт читает ровно те файлы, куда пишет журнал.
+    """
+    paths = []
+    for handler in logger.handlers:
+        path = getattr(handler, 'baseFilename', None)
+        if path is None:
+            continue
+        paths.append(path)
+        paths += [f'{path}.{index}' for index in range(1, 100)
+                  if os.path.exists(f'{path}.{index}')]
+    return paths
+
+
+def summarize(paths):
+    """
+    Группирует записи журналов по форме запроса и месту вызова.
+
+    Возвращает группы, отсортированные по суммарному времени.
+    """
+    groups = defaultdict(lambda: {'count': 0, 'total_ms': 0.0, 'max_ms': 0.0})
+    for path in paths:
+        try:
+            with open(path, encoding='utf-8') as fh:
+                lines = fh.readlines()
+        except OSError:
+            continue
+        for line in lines:
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                continue
+            key = (entry['fingerprint'], entry['code'], entry['template'])
+            group = groups[key]
+            group.update(
+                sql=entry['sql'], view=entry['view'], code=entry['code'],
+                template=entry['template'],
+            )
+            group['count'] += 1
+            group['total_ms'] += entry['ms']
+            group['max_ms'] = max(group['max_ms'], entry['ms'])
+    return sorted(groups.values(), key=lambda group: -group['total_ms'])
+
+
+class SlowQueryReportView(TemplateView):
+    """Страница админки с самыми затратными медленными запросами."""
+
+    template_name = 'admin/slow_queries.html'
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context.update(admin.site.each_context(self.request))
+        context['title'] = 'Медленные запросы'
+        context['threshold'] = settings.SLOW_QUERY_MS
+        context['groups'] = summarize(log_files())[:50]
+        return context
@@ -0,0 +1,58 @@
+from django.conf import settings
+from django.core.handlers.asgi import ASGIRequest
+from django.http import StreamingHttpResponse
+from django.template import RequestContext
+from django.template.loader import get_template, select_template
+from django.utils.safestring import mark_safe
+
+# Метка, на месте которой в шаблоне страницы выводится поток записей.
+STREAM_MARKER = mark_safe('<!-- blog:stream -->')
+
+
+class StreamingTemplateMixin:
+    """
+    Mixin, отдающий длинную страницу частями (STREAMING_PAGES = True).
+
+    Шаблон страницы вместо цикла по записям выводит stream_marker,
+    если он есть в контексте. Страница рендерится без записей
+    и делится по метке: начало с шапкой уходит клиенту сразу,
+    затем по одной рендерятся записи из get_stream_items()
+    шаблоном stream_item_template, затем конец страницы.
+    Записи читаются через iterator(), поэтому в памяти
+    не держится ни вся выборка, ни весь HTML.
+
+    Под ASGI Django 3.2 читает поток в цикле событий,
+    где запросы к базе запрещены, поэтому там страница отдаётся целиком.
+    """
+
+    stream_item_template = None
+    stream_item_name = None
+
+    def get_stream_items(self, context):
+        raise NotImplementedError(
+            'Переопределите get_stream_items() в наследнике')
+
+    def render_to_response(self, context, **response_kwargs):
+        if (not settings.STREAMING_PAGES
+                or isinstance(self.request, ASGIRequest)):
+            return super().render_to_response(context, **response_kwargs)
+        context['stream_marker'] = STREAM_MARKER
+        page = select_template(self.get_template_names()).render(
+            context, self.request)
+        head, _, tail = page.partition(STREAM_MARKER)
+        response_kwargs.setdefault('content_type', self.content_type)
+        return StreamingHttpResponse(
+            self.stream(head, self.get_stream_items(context), context, tail),
+            **response_kwargs,
+        )
+
+    def stream(self, head, items, context, tail):
+        yield head
+        template = get_template(self.stream_item_template).template
+        request_context = RequestContext(self.request, context)
+        # Контекст-процессоры выполняются один раз на всю страницу.
+        with request_context.bind_template(template):
+            for item in items:
+                with request_context.push({self.stream_item_name: item}):
+                    yield template.render(request_context)
+        yield tail
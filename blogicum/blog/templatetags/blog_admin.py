@@ -0,0 +1,82 @@
+import datetime
+
+from django import template
+from django.contrib.admin.templatetags.admin_list import date_hierarchy
+from django.contrib.admin.templatetags.base import InclusionAdminNode
+from django.db.models import Sum
+from django.utils import formats
+from django.utils.text import capfirst
+from django.utils.translation import gettext as _
+
+from blog.date_counts import get_scope
+from blog.models import MonthlyCount
+
+register = template.Library()
+
+
+def _has_other_filters(cl, date_params):
+    """Проверяет, сужена ли выборка чем-то кроме самой иерархии дат."""
+    return bool(cl.query) or bool(
+        set(cl.get_filters_params()) - set(date_params))
+
+
+def monthly_date_hierarchy(cl):
+    """
+    Строит иерархию дат по материализованным счётчикам MonthlyCount.
+
+    Годы и месяцы берутся из таблицы счётчиков без обхода основной
+    таблицы; дни выбранного месяца и выборки с дополнительными
+    фильтрами отдаются стандартной реализации, которая работает
+    по индексу в пределах диапазона.
+    """
+    field_name = cl.date_hierarchy
+    year_field = f'{field_name}__year'
+    month_field = f'{field_name}__month'
+    day_field = f'{field_name}__day'
+    year_lookup = cl.params.get(year_field)
+    if cl.params.get(month_field) or _has_other_filters(
+            cl, (year_field, month_field, day_field)):
+        return date_hierarchy(cl)
+
+    def link(filters):
+        return cl.get_query_string(filters, [f'{field_name}__'])
+
+    counts = MonthlyCount.objects.filter(
+        scope=get_scope(cl.model, field_name), count__gt=0)
+    if year_lookup:
+        months = counts.filter(year=year_lookup).order_by('month')
+        return {
+            'show': True,
+            'back': {'link': link({}), 'title': _('All dates')},
+            'choices': [{
+                'link': link({year_field: year_lookup,
+                              month_field: row.month}),
+                'title': '{} ({})'.format(
+                    capfirst(formats.date_format(
+                        datetime.date(row.year, row.month, 1),
+                        'YEAR_MONTH_FORMAT')),
+                    row.count,
+                ),
+            } for row in months],
+        }
+    years = (
+        counts.values('year').annotate(total=Sum('count')).order_by('year')
+    )
+    return {
+        'show': True,
+        'back': None,
+        'choices': [{
+            'link': link({year_field: str(row['year'])}),
+            'title': f"{row['year']} ({row['total']})",
+        } for row in years],
+    }
+
+
+@register.tag(name='monthly_date_hierarchy')
+def monthly_date_hierarchy_tag(parser, token):
+    return InclusionAdminNode(
+        parser, token,
+        func=monthly_date_hierarchy,
+        template_name='date_hierarchy.html',
+        takes_context=False,
+    )
@@ -0,0 +1,178 @@
+import heapq
+
+from blogicum.constants import (BULK_CHUNK_SIZE, PAGINATE_BY,
+                                TIMELINE_BACKFILL,
+                                TIMELINE_FANOUT_MAX_FOLLOWERS)
+from django.db import transaction
+from django.db.models import Q
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+from django.utils.dateparse import parse_datetime
+
+from .models import Follow, Post, TimelineEntry, TimelinePost
+from .pagination import KeysetPage, KeysetPaginator
+from .signals import bulk_changed
+
+
+def is_visible(post):
+    """
+    Проверяет, должен ли пост быть в лентах подписчиков.
+
+    Отложенный пост раскладывается, когда run_scheduler
+    переводит его в ленту (is_live).
+    """
+    return post.is_live and (
+        post.category is None or post.category.is_published)
+
+
+def fan_out(post):
+    """
+    Раскладывает пост по лентам подписчиков его автора.
+
+    Для автора с числом подписчиков больше TIMELINE_FANOUT_MAX_FOLLOWERS
+    запись в тысячи лент на каждый пост дороже, чем чтение его постов
+    при показе ленты, поэтому такой пост только помечается
+    как не разосланный (TimelinePost.fanned_out = False)
+    и подмешивается в get_timeline().
+    """
+    followers = Follow.objects.filter(author_id=post.author_id)
+    fanned_out = followers.count() <= TIMELINE_FANOUT_MAX_FOLLOWERS
+    with transaction.atomic():
+        if fanned_out:
+            TimelineEntry.objects.filter(post=post).update(
+                pub_date=post.pub_date)
+            user_ids = followers.values_list('user_id', flat=True)
+            _add_entries(post, user_ids.iterator())
+        else:
+            TimelineEntry.objects.filter(post=post).delete()
+        TimelinePost.objects.update_or_create(
+            post_id=post.pk,
+            defaults={'author_id': post.author_id,
+                      'pub_date': post.pub_date,
+                      'fanned_out': fanned_out},
+        )
+
+
+def _add_entries(post, user_ids):
+    batch = []
+    for user_id in user_ids:
+        batch.append(TimelineEntry(
+            user_id=user_id, post_id=post.pk, pub_date=post.pub_date))
+        if len(batch) == BULK_CHUNK_SIZE:
+            TimelineEntry.objects.bulk_create(batch, ignore_conflicts=True)
+            batch = []
+    TimelineEntry.objects.bulk_create(batch, ignore_conflicts=True)
+
+
+def retract(post):
+    """Убирает пост из лент подписчиков."""
+    with transaction.atomic():
+        TimelineEntry.objects.filter(post=post).delete()
+        TimelinePost.objects.filter(post_id=post.pk).delete()
+
+
+def sync(post):
+    """Раскладывает или убирает пост в зависимости от его видимости."""
+    if is_visible(post):
+        fan_out(post)
+    elif TimelinePost.objects.filter(post_id=post.pk).exists():
+        retract(post)
+
+
+def follow(user, author):
+    """
+    Подписывает user на author и добавляет в ленту его последние посты.
+
+    Возвращает False, если подписка уже была.
+    """
+    _, created = Follow.objects.get_or_create(user=user, author=author)
+    if created:
+        posts = TimelinePost.objects.filter(
+            author=author, fanned_out=True,
+        ).order_by('-pub_date').values_list('post_id', 'pub_date')
+        TimelineEntry.objects.bulk_create(
+            [TimelineEntry(user=user, post_id=pk, pub_date=pub_date)
+             for pk, pub_date in posts[:TIMELINE_BACKFILL]],
+            ignore_conflicts=True,
+        )
+    return created
+
+
+def unfollow(user, author):
+    """Отписывает user от author и чистит его ленту от постов автора."""
+    with transaction.atomic():
+        Follow.objects.filter(user=user, author=author).delete()
+        TimelineEntry.objects.filter(user=user, post__author=author).delete()
+
+
+def is_following(user, author_id):
+    return (user.is_authenticated and Follow.objects.filter(
+        user=user, author_id=author_id).exists())
+
+
+# Разбирает курсор ленты подписок: дата публикации и id поста.
+_paginator = KeysetPaginator(
+    TimelineEntry.objects.none(), 'pub_date', PAGINATE_BY,
+    parse=parse_datetime,
+)
+
+
+def get_timeline(user, posts, cursor=None, per_page=PAGINATE_BY):
+    """
+    Возвращает страницу ленты подписок пользователя (KeysetPage).
+
+    Лента читается по индексу (user, -pub_date) из его строк
+    TimelineEntry и отдельно по индексу (author, fanned_out, -pub_date)
+    из неразосланных постов авторов, на которых он подписан.
+    Обе выборки ограничены размером страницы и сливаются по
+    (pub_date, post_id), а курсор ?after= указывает на последнюю
+    строку страницы. Сами посты загружаются из posts по ключам.
+    """
+    position = _paginator.decode(cursor)
+    entries = _after(
+        TimelineEntry.objects.filter(user=user), position,
+    ).values_list('pub_date', 'post_id')
+    pulled = _after(
+        TimelinePost.objects.filter(
+            author__in=Follow.objects.filter(user=user).values('author_id'),
+            fanned_out=False,
+        ),
+        position,
+    ).values_list('pub_date', 'post_id')
+    rows = heapq.nlargest(
+        per_page + 1,
+        set(entries[:per_page + 1]) | set(pulled[:per_page + 1]),
+    )
+    next_cursor = None
+    if len(rows) > per_page:
+        rows = rows[:per_page]
+        next_cursor = _paginator.encode(*rows[-1])
+    found = posts.order_by().in_bulk([pk for _, pk in rows])
+    return KeysetPage(
+        [found[pk] for _, pk in rows if pk in found], next_cursor)
+
+
+def _after(queryset, position):
+    """Оставляет строки ленты после курсора, от новых к старым."""
+    queryset = queryset.order_by('-pub_date', '-post_id')
+    if position is None:
+        return queryset
+    pub_date, post_id = position
+    return queryset.filter(
+        Q(pub_date__lt=pub_date) | Q(pub_date=pub_date, post_id__lt=post_id))
+
+
+@receiver(post_save, sender=Post)
+def sync_saved_post(sender, instance, raw=False, **kwargs):
+    """Обновляет ленты подписчиков после фиксации сохранения поста."""
+    if not raw:
+        transaction.on_commit(lambda: sync(instance))
+
+
+@receiver(bulk_changed, sender=Post)
+def sync_bulk_posts(sender, pks, deleted, **kwargs):
+    """Обновляет ленты после пакетного изменения постов."""
+    if deleted:
+        return
+    for post in Post.objects.filter(pk__in=pks).select_related('category'):
+        sync(post)
@@ -1,6 +1,6 @@
 from django.urls import path
 
-from . import views
+from . import api, feeds, metrics, views
 from .views import (ProfileDetailView,
                     EditProfileView,
                     PostCreateView,
@@ -15,6 +15,8 @@ urlpatterns = [
          CategoryPostsView.as_view(),
          name='category_posts'),
     path('', IndexView.as_view(), name='index'),
+    path('popular/', views.PopularPostsView.as_view(), name='popular'),
+    path('discussed/', views.DiscussedPostsView.as_view(), name='discussed'),
     path('posts/<int:post_id>/', PostDetailView.as_view(), name='post_detail'),
     path('posts/create/', PostCreateView.as_view(), name='create_post'),
     path('posts/<int:post_id>/edit/',
@@ -31,7 +33,47 @@ urlpatterns = [
 
     path('profile/<slug:username>/',
          ProfileDetailView.as_view(), name='profile'),
+    path('profile/<slug:username>/follow/',
+         views.FollowView.as_view(), name='follow'),
+    path('profile/<slug:username>/unfollow/',
+         views.UnfollowView.as_view(), name='unfollow'),
+    path('archive/<int:year>/',
+         views.ArchiveView.as_view(), name='archive_year'),
+    path('archive/<int:year>/<int:month>/',
+         views.ArchiveView.as_view(), name='archive_month'),
+    path('archive/<int:year>/<int:month>/<int:day>/',
+         views.ArchiveView.as_view(), name='archive_day'),
+    path('subscriptions/',
+         views.SubscriptionsView.as_view(), name='subscriptions'),
     path('edit-profile/<slug:username>/',
          EditProfileView.as_view(), name='edit_profile'),
 
+    path('feeds/rss/', feeds.LatestPostsFeed(), name='feed_rss'),
+    path('feeds/atom/', feeds.LatestPostsAtomFeed(), name='feed_atom'),
+    path('feeds/category/<slug:category_slug>/rss/',
+         feeds.CategoryPostsFeed(), name='category_feed_rss'),
+    path('feeds/category/<slug:category_slug>/atom/',
+         feeds.CategoryPostsAtomFeed(), name='category_feed_atom'),
+    path('feeds/profile/<slug:username>/rss/',
+         feeds.AuthorPostsFeed(), name='profile_feed_rss'),
+    path('feeds/profile/<slug:username>/atom/',
+         feeds.AuthorPostsAtomFeed(), name='profile_feed_atom'),
+
+    path('api/posts/', api.PostListApiView.as_view(), name='api_posts'),
+    path('api/posts/batch/',
+         api.PostBatchApiView.as_view(), name='api_posts_batch'),
+    path('api/posts/<int:post_id>/',
+         api.PostApiView.as_view(), name='api_post'),
+    path('api/posts/<int:post_id>/comments/',
+         api.CommentListApiView.as_view(), name='api_comments'),
+    path('api/category/<slug:category_slug>/',
+         api.CategoryApiView.as_view(), name='api_category'),
+    path('api/profile/<slug:username>/',
+         api.ProfileApiView.as_view(), name='api_profile'),
+
+    path('metrics/', metrics.MetricsView.as_view(), name='metrics'),
+
+    path('sitemap.xml', views.SitemapIndexView.as_view(), name='sitemap'),
+    path('sitemap-<slug:section>-<int:shard>.xml',
+         views.SitemapSectionView.as_view(), name='sitemap_section'),
 ]
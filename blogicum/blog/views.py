@@ -1,17 +1,31 @@
-from blogicum.constants import PAGINATE_BY
+from datetime import timedelta
+
+from blogicum.constants import (PAGINATE_BY, POPULAR_PERIOD_DAYS,
+                                RELATED_POSTS_COUNT)
 from django.contrib.auth.mixins import LoginRequiredMixin, UserPassesTestMixin
 from django.core.exceptions import PermissionDenied
 from django.core.paginator import Paginator
-from django.db.models import Count
-from django.http import Http404
+from django.db.models import Count, F, Max, Q, Subquery
+from django.http import FileResponse, Http404
 from django.shortcuts import get_object_or_404, redirect
 from django.urls import reverse_lazy, reverse
+from django.utils.functional import cached_property
 from django.utils.timezone import now
-from django.views.generic import (UpdateView, DeleteView,
+from django.views.generic import (UpdateView, DeleteView, View,
                                   DetailView, CreateView, ListView)
 
+from .conditional import ConditionalGetMixin
+from .counters import view_counter
+from . import date_counts
+from .database import RetryOnLockedMixin
+from . import sitemaps
 from .forms import PostForm, UserForm, CommentForm
-from .models import Post, Category, User, Comment
+from .models import Post, Category, User, Comment, RelatedPost, Watermark
+from .pagination import CountedPaginator, KeysetPaginator
+from .streaming import StreamingTemplateMixin
+from . import timelines
+from .watermarks import (SHARED_KEYS, POSTS, RELATED, author_key,
+                         category_key, feed_last_modified)
 
 
 class OnlyAuthorMixin(UserPassesTestMixin):
@@ -23,13 +37,39 @@ class OnlyAuthorMixin(UserPassesTestMixin):
         return obj.author == self.request.user
 
 
-class ProfileDetailView(DetailView):
+def get_feed_validators(key):
+    """Возвращает валидаторы ленты по её отметке изменений."""
+    last_modified = feed_last_modified(key)
+    if last_modified is None:
+        return None
+    return key, last_modified
+
+
+class ProfileDetailView(ConditionalGetMixin, StreamingTemplateMixin,
+                        DetailView):
     """Представление для отображения профиля пользователя и его постов."""
 
     model = User
     template_name = 'blog/profile.html'
     context_object_name = 'profile'
     success_url = reverse_lazy('profile', kwargs={'username': 'username'})
+    stream_item_template = 'includes/post_article.html'
+    stream_item_name = 'post'
+
+    def get_validators(self):
+        """Строит валидаторы по отметке изменений постов автора."""
+        author_id = User.objects.filter(
+            username=self.kwargs.get('username')
+        ).values_list('pk', flat=True).first()
+        if author_id is None:
+            return None
+        validators = get_feed_validators(author_key(author_id))
+        if validators is None:
+            return None
+        version, last_modified = validators
+        # Кнопка подписки зависит от того, кто смотрит профиль.
+        following = timelines.is_following(self.request.user, author_id)
+        return (version, following), last_modified
 
     def get_object(self):
         """Возвращает объект User по имени пользователя."""
@@ -47,8 +87,14 @@ class ProfileDetailView(DetailView):
             comment_count=Count('comments')).order_by('-pub_date')
         context['posts'] = posts
         context['page_obj'] = self.paginate_posts(context['posts'])
+        context['is_following'] = timelines.is_following(
+            self.request.user, user.pk)
         return context
 
+    def get_stream_items(self, context):
+        """Отдаёт посты текущей страницы, не загружая их все сразу."""
+        return context['page_obj'].object_list.iterator()
+
     def paginate_posts(self, posts):
         """
         Пагинирует список постов
@@ -80,27 +126,102 @@ class EditProfileView(LoginRequiredMixin, UpdateView):
             kwargs={'username': self.object.username})
 
 
+def get_published_posts():
+    """Возвращает опубликованные посты без аннотаций и сортировки."""
+    return Post.objects.select_related(
+        'author', 'category', 'location'
+    ).filter(is_live=True, category__is_published=True)
+
+
 def get_filtered_posts():
     """
     Возвращает список опубликованных постов,
     отсортированных по дате публикации.
     """
+    return get_published_posts().annotate(
+        comment_count=Count('comments')).order_by('-pub_date')
+
+
+def get_visible_posts(user):
+    """
+    Возвращает посты, которые может открыть пользователь:
+    опубликованные и, для автора, все его собственные.
+    """
+    visible = Q(is_live=True, category__is_published=True)
+    if user.is_authenticated:
+        visible |= Q(author=user)
     return Post.objects.select_related(
-        'author', 'category', 'location'
-    ).filter(
-        is_published=True,
-        pub_date__lt=now(),
-        category__is_published=True
-    ).annotate(comment_count=Count('comments')).order_by('-pub_date')
+        'author', 'category', 'location').filter(visible)
 
 
-class IndexView(ListView):
+def is_post_visible(user, author_id, is_live, category_is_published):
+    """Проверяет по уже загруженным полям, виден ли пост пользователю."""
+    return author_id == user.pk or (is_live and category_is_published)
+
+
+def get_post_validators(post_id, user):
+    """
+    Строит валидаторы поста одним запросом по первичному ключу.
+
+    Версия складывается из числа и даты последнего изменения
+    комментариев и отметки изменений общих данных
+    (авторов, категорий, мест) и списков похожих постов.
+    Для скрытого от пользователя поста валидаторы не строятся,
+    чтобы ответ прошёл обычную проверку доступа.
+    """
+    shared_changed = Watermark.objects.filter(
+        key__in=(*SHARED_KEYS.values(), RELATED)
+    ).order_by('-changed_at').values('changed_at')[:1]
+    post = Post.objects.filter(pk=post_id).annotate(
+        comments_total=Count('comments'),
+        comments_changed=Max('comments__updated_at'),
+        shared_changed=Subquery(shared_changed),
+    ).values(
+        'author_id', 'is_live', 'category__is_published',
+        'updated_at', 'comments_total',
+        'comments_changed', 'shared_changed',
+    ).first()
+    if post is None or not is_post_visible(
+        user, post['author_id'], post['is_live'],
+        post['category__is_published'],
+    ):
+        return None
+    last_modified = max(
+        moment for moment in (post['updated_at'],
+                              post['comments_changed'],
+                              post['shared_changed'])
+        if moment is not None
+    )
+    return (post['comments_total'], post['comments_changed'],
+            post['shared_changed']), last_modified
+
+
+def get_related_posts(post):
+    """
+    Возвращает похожие посты одним запросом по индексу (post, rank).
+
+    Списки строит команда build_related_posts; посты, скрытые
+    после её запуска, отбрасываются здесь.
+    """
+    return [
+        link.related for link in RelatedPost.objects.filter(
+            post=post, related__is_live=True,
+            related__category__is_published=True,
+        ).select_related('related').order_by('rank')[:RELATED_POSTS_COUNT]
+    ]
+
+
+class IndexView(ConditionalGetMixin, ListView):
     """Представление для отображения списка постов на главной странице."""
 
     template_name = 'blog/index.html'
     context_object_name = 'page_obj'
     paginate_by = PAGINATE_BY
 
+    def get_validators(self):
+        """Строит валидаторы по отметке изменений всех постов."""
+        return get_feed_validators(POSTS)
+
     def get_queryset(self):
         """Возвращает отфильтрованные посты для главной страницы."""
         return get_filtered_posts()
@@ -116,13 +237,22 @@ class IndexView(ListView):
         return context
 
 
-class CategoryPostsView(ListView):
+class CategoryPostsView(ConditionalGetMixin, ListView):
     """Представление для отображения постов в определённой категории."""
 
     template_name = 'blog/category.html'
     context_object_name = 'post_list'
     paginate_by = PAGINATE_BY
 
+    def get_validators(self):
+        """Строит валидаторы по отметке изменений постов категории."""
+        category_id = Category.objects.filter(
+            slug=self.kwargs.get('category_slug'), is_published=True
+        ).values_list('pk', flat=True).first()
+        if category_id is None:
+            return None
+        return get_feed_validators(category_key(category_id))
+
     def get_queryset(self):
         """Возвращает отфильтрованные посты для указанной категории."""
         category_slug = self.kwargs.get('category_slug')
@@ -139,7 +269,156 @@ class CategoryPostsView(ListView):
         return context
 
 
-class PostCreateView(LoginRequiredMixin, CreateView):
+class SubscriptionsView(LoginRequiredMixin, ListView):
+    """Представление для ленты постов авторов, на которых подписан."""
+
+    template_name = 'blog/subscriptions.html'
+    context_object_name = 'page_obj'
+
+    def get_queryset(self):
+        """Возвращает опубликованные посты, из которых собирается лента."""
+        return get_filtered_posts()
+
+    def get_context_data(self, **kwargs):
+        """Добавляет в контекст страницу ленты, листаемую курсором ?after=."""
+        context = super().get_context_data(**kwargs)
+        context['page_obj'] = timelines.get_timeline(
+            self.request.user, self.object_list,
+            self.request.GET.get('after'))
+        return context
+
+
+class ArchiveView(ConditionalGetMixin, ListView):
+    """
+    Представление для архива постов за год, месяц или день.
+
+    Число постов за год и месяц для пагинации и навигация
+    по архиву берутся из материализованных счётчиков,
+    поэтому COUNT по постам выполняется только для дня.
+    """
+
+    template_name = 'blog/archive.html'
+    paginate_by = PAGINATE_BY
+
+    def get_validators(self):
+        """Строит валидаторы по отметке изменений всех постов."""
+        return get_feed_validators(POSTS)
+
+    @cached_property
+    def period(self):
+        """Возвращает границы периода архива."""
+        try:
+            return date_counts.period_range(
+                self.kwargs['year'], self.kwargs.get('month'),
+                self.kwargs.get('day'))
+        except (ValueError, OverflowError):
+            raise Http404('Такой даты нет')
+
+    @cached_property
+    def navigation(self):
+        return date_counts.archive_navigation()
+
+    def get_queryset(self):
+        """Возвращает опубликованные посты за период."""
+        start, end = self.period
+        return get_filtered_posts().filter(
+            pub_date__gte=start, pub_date__lt=end)
+
+    def get_paginator(self, queryset, per_page, **kwargs):
+        """Берёт число постов за год или месяц из счётчиков архива."""
+        if 'day' in self.kwargs:
+            return super().get_paginator(queryset, per_page, **kwargs)
+        count = date_counts.archive_count(
+            self.navigation, self.kwargs['year'], self.kwargs.get('month'))
+        return CountedPaginator(queryset, per_page, count, **kwargs)
+
+    def get_context_data(self, **kwargs):
+        """Добавляет в контекст период и навигацию по архиву."""
+        context = super().get_context_data(**kwargs)
+        context['period_start'] = self.period[0]
+        context['archive_year'] = self.kwargs['year']
+        context['archive_month'] = self.kwargs.get('month')
+        context['archive_day'] = self.kwargs.get('day')
+        context['navigation'] = self.navigation
+        return context
+
+
+class FollowView(LoginRequiredMixin, View):
+    """Представление для подписки на автора."""
+
+    def post(self, request, username):
+        """Подписывает текущего пользователя и возвращает на профиль."""
+        author = get_object_or_404(User, username=username)
+        if author != request.user:
+            timelines.follow(request.user, author)
+        return redirect('blog:profile', username=username)
+
+
+class UnfollowView(LoginRequiredMixin, View):
+    """Представление для отписки от автора."""
+
+    def post(self, request, username):
+        """Отписывает текущего пользователя и возвращает на профиль."""
+        author = get_object_or_404(User, username=username)
+        timelines.unfollow(request.user, author)
+        return redirect('blog:profile', username=username)
+
+
+class RankedPostsView(ListView):
+    """
+    Базовое представление лент по материализованному рейтингу.
+
+    Число комментариев берётся из PostRanking, а не считается
+    через Count, а страницы листаются курсором ?after=.
+    """
+
+    template_name = 'blog/ranking.html'
+    context_object_name = 'page_obj'
+    title = None
+    ranking_key = None
+    parse_key = str
+
+    def get_queryset(self):
+        """Возвращает опубликованные посты, у которых есть рейтинг."""
+        return get_published_posts().select_related('ranking').filter(
+            ranking__isnull=False
+        ).annotate(comment_count=F('ranking__comment_count'))
+
+    def get_context_data(self, **kwargs):
+        """Добавляет в контекст страницу ленты и заголовок."""
+        context = super().get_context_data(**kwargs)
+        paginator = KeysetPaginator(
+            self.object_list, self.ranking_key, PAGINATE_BY,
+            parse=self.parse_key,
+        )
+        context['page_obj'] = paginator.get_page(
+            self.request.GET.get('after'))
+        context['title'] = self.title
+        return context
+
+
+class PopularPostsView(RankedPostsView):
+    """Представление для ленты популярных постов за неделю."""
+
+    title = 'Популярное за неделю'
+    ranking_key = 'ranking__score'
+    parse_key = float
+
+    def get_queryset(self):
+        """Оставляет посты, опубликованные за последнюю неделю."""
+        return super().get_queryset().filter(
+            pub_date__gte=now() - timedelta(days=POPULAR_PERIOD_DAYS))
+
+
+class DiscussedPostsView(RankedPostsView):
+    """Представление для ленты самых обсуждаемых постов."""
+
+    title = 'Самое обсуждаемое'
+    ranking_key = 'ranking__comment_count'
+    parse_key = int
+
+
+class PostCreateView(LoginRequiredMixin, RetryOnLockedMixin, CreateView):
     """Представление для создания нового поста."""
 
     model = Post
@@ -196,27 +475,30 @@ class DeletePostView(LoginRequiredMixin, OnlyAuthorMixin, DeleteView):
     success_url = reverse_lazy('blog:index')
 
 
-class PostDetailView(LoginRequiredMixin, DetailView):
+class PostDetailView(LoginRequiredMixin, ConditionalGetMixin,
+                     StreamingTemplateMixin, DetailView):
     """Представление для отображения детальной информации о посте."""
 
     model = Post
     template_name = 'blog/detail.html'
     pk_url_kwarg = 'post_id'
+    stream_item_template = 'includes/comment_item.html'
+    stream_item_name = 'comment'
 
-    def get_object(self, queryset=None):
-        """
-        Возвращает объект поста,
-        если он доступен текущему пользователю.
-        """
-        post = super().get_object(queryset)
+    def get(self, request, *args, **kwargs):
+        """Отдаёт страницу поста и учитывает просмотр в буфере счётчика."""
+        response = super().get(request, *args, **kwargs)
+        view_counter.record(self.kwargs[self.pk_url_kwarg])
+        return response
 
-        if post.author != self.request.user and (
-            not post.is_published
-            or not post.category.is_published
-            or post.pub_date > now()
-        ):
-            raise Http404
-        return post
+    def get_validators(self):
+        """Строит валидаторы по посту и его комментариям."""
+        return get_post_validators(
+            self.kwargs[self.pk_url_kwarg], self.request.user)
+
+    def get_queryset(self):
+        """Возвращает посты, доступные текущему пользователю."""
+        return get_visible_posts(self.request.user)
 
     def get_context_data(self, **kwargs):
         """
@@ -226,10 +508,15 @@ class PostDetailView(LoginRequiredMixin, DetailView):
         context = super().get_context_data(**kwargs)
         context['form'] = CommentForm()
         context['comments'] = self.object.comments.select_related('author')
+        context['related_posts'] = get_related_posts(self.object)
         return context
 
+    def get_stream_items(self, context):
+        """Отдаёт комментарии по мере чтения из базы."""
+        return context['comments'].iterator()
+
 
-class CommentPostView(LoginRequiredMixin, CreateView):
+class CommentPostView(LoginRequiredMixin, RetryOnLockedMixin, CreateView):
     """Представление для создания нового комментария к посту."""
 
     model = Comment
@@ -244,7 +531,6 @@ class CommentPostView(LoginRequiredMixin, CreateView):
         post = get_object_or_404(Post, id=post_id)
         form.instance.author = self.request.user
         form.instance.post = post
-        form.save()
         return super().form_valid(form)
 
     def get_success_url(self):
@@ -320,3 +606,35 @@ class CommentDeleteView(LoginRequiredMixin,
         """
         return reverse_lazy('blog:post_detail',
                             kwargs={'post_id': self.object.post.id})
+
+
+class SitemapIndexView(View):
+    """
+    Отдаёт индекс карты сайта, собранный командой build_sitemaps.
+
+    Файлы читаются с диска без обращений к базе. Карту строит
+    только команда: до первого запуска build_sitemaps при деплое
+    индекс отвечает 404.
+    """
+
+    def get(self, request):
+        path = sitemaps.get_root() / 'sitemap.xml'
+        try:
+            return FileResponse(
+                open(path, 'rb'), content_type='application/xml')
+        except FileNotFoundError:
+            raise Http404
+
+
+class SitemapSectionView(View):
+    """Отдаёт готовый файл одного шарда карты сайта."""
+
+    def get(self, request, section, shard):
+        if section not in sitemaps.SECTIONS:
+            raise Http404
+        path = sitemaps.get_root() / sitemaps.shard_filename(section, shard)
+        try:
+            return FileResponse(
+                open(path, 'rb'), content_type='application/xml')
+        except FileNotFoundError:
+            raise Http404
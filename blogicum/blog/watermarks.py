@@ -0,0 +1,196 @@
+from blogicum.constants import BULK_CHUNK_SIZE
+from django.contrib.auth import get_user_model
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from django.utils.timezone import now
+
+from .models import Category, Comment, Location, Post, Watermark
+from .signals import bulk_changed, defer, in_bulk_operation
+
+User = get_user_model()
+
+# Изменения постов и комментариев к ним.
+POSTS = 'posts'
+
+# Списки похожих постов, которые строит build_related_posts.
+RELATED = 'related'
+
+
+def model_key(model):
+    """Возвращает ключ отметки изменений всей модели."""
+    return model._meta.label_lower
+
+
+# Данные, которые показываются в карточках любой ленты.
+SHARED_KEYS = {
+    model: model_key(model) for model in (Category, Location, User)
+}
+
+
+def category_key(category_id):
+    return f'{POSTS}:category:{category_id}'
+
+
+def author_key(author_id):
+    return f'{POSTS}:author:{author_id}'
+
+
+def related_category_key(category_id):
+    """
+    Ключ категории, видимость постов которой могла измениться.
+
+    Скрытие или публикация категории не меняет updated_at её постов,
+    поэтому build_related_posts находит такие посты по этой отметке.
+    """
+    return f'{RELATED}:category:{category_id}'
+
+
+def sitemap_key(section_name, shard):
+    """Ключ шарда карты сайта, из которого пропала запись."""
+    return f'sitemap:{section_name}:{shard}'
+
+
+def feed_keys(*keys):
+    """Возвращает ключи, от которых зависит лента постов."""
+    return (*keys, *SHARED_KEYS.values())
+
+
+def post_keys(category_id, author_id):
+    """Возвращает ключи лент, в которых показывается пост."""
+    return {POSTS, category_key(category_id), author_key(author_id)}
+
+
+def model_last_changed(model):
+    """
+    Возвращает момент последнего изменения любой записи модели.
+
+    Отметка в Watermark учитывает и удаления; если её ещё нет,
+    берётся MAX(updated_at), который читается из индекса.
+    """
+    moment = last_changed([model_key(model)])
+    if moment is None and hasattr(model.objects, 'last_changed'):
+        moment = model.objects.last_changed()
+    return moment
+
+
+def touch(keys, moment=None):
+    """Сдвигает отметки изменений для ключей на текущий момент."""
+    keys = set(keys)
+    if not keys:
+        return
+    moment = moment or now()
+    updated = Watermark.objects.filter(key__in=keys).update(
+        changed_at=moment)
+    if updated < len(keys):
+        existing = set(
+            Watermark.objects.filter(key__in=keys)
+            .values_list('key', flat=True)
+        )
+        Watermark.objects.bulk_create(
+            [Watermark(key=key, changed_at=moment)
+             for key in keys - existing],
+            ignore_conflicts=True,
+        )
+
+
+def last_changed(keys):
+    """Возвращает самую позднюю отметку изменений среди ключей."""
+    moments = Watermark.objects.filter(key__in=keys).values_list(
+        'changed_at', flat=True)
+    return max(moments, default=None)
+
+
+def feed_last_modified(*keys):
+    """
+    Возвращает момент последнего изменения ленты.
+
+    Это поиск по первичному ключу в Watermark: отложенный пост
+    сдвигает отметки, когда run_scheduler переводит его в ленту.
+    """
+    return last_changed(feed_keys(*keys))
+
+
+def _touch_or_defer(keys):
+    if in_bulk_operation():
+        defer('watermarks', keys)
+    else:
+        touch(keys)
+
+
+def _chunks(pks):
+    pks = list(set(pks))
+    for start in range(0, len(pks), BULK_CHUNK_SIZE):
+        yield pks[start:start + BULK_CHUNK_SIZE]
+
+
+def _keys_of_posts(post_ids):
+    keys = {POSTS}
+    for chunk in _chunks(post_ids):
+        rows = Post.objects.filter(pk__in=chunk).values_list(
+            'category_id', 'author_id').distinct()
+        for category_id, author_id in rows:
+            keys |= post_keys(category_id, author_id)
+    return keys
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+def touch_post(sender, instance, raw=False, **kwargs):
+    """Отмечает изменение лент, где пост был или стал виден."""
+    if raw:
+        return
+    keys = post_keys(instance.category_id, instance.author_id)
+    keys.add(model_key(Post))
+    loaded = getattr(instance, '_loaded_values', {})
+    if 'category_id' in loaded:
+        keys.add(category_key(loaded['category_id']))
+    _touch_or_defer(keys)
+
+
+@receiver(post_save, sender=Category)
+def touch_related_category(sender, instance, raw=False, **kwargs):
+    """Отмечает категорию для пересчёта похожих постов."""
+    if not raw:
+        _touch_or_defer({related_category_key(instance.pk)})
+
+
+@receiver(post_save, sender=Comment)
+@receiver(post_delete, sender=Comment)
+def touch_comment(sender, instance, raw=False, **kwargs):
+    """Отмечает изменение лент поста, у которого изменились комментарии."""
+    if raw:
+        return
+    if in_bulk_operation():
+        defer('watermarks', {POSTS, model_key(Comment)})
+        defer('commented_posts', [instance.post_id])
+    else:
+        touch(_keys_of_posts([instance.post_id]) | {model_key(Comment)})
+
+
+@receiver(post_save)
+@receiver(post_delete)
+def touch_shared(sender, instance, raw=False, update_fields=None, **kwargs):
+    """Отмечает изменение данных, общих для всех лент."""
+    if raw or sender not in SHARED_KEYS:
+        return
+    if update_fields and set(update_fields) == {'last_login'}:
+        return
+    _touch_or_defer({SHARED_KEYS[sender]})
+
+
+@receiver(bulk_changed)
+def touch_after_bulk(sender, pks, deleted, deferred, **kwargs):
+    """Отмечает изменения пакетной операции одним запросом на ключ."""
+    keys = set(deferred.get('watermarks', ()))
+    keys.add(model_key(sender))
+    if sender is Post and not deleted:
+        keys |= _keys_of_posts(pks)
+    elif sender is Comment:
+        post_ids = deferred.get('commented_posts') or [
+            post_id
+            for chunk in _chunks(pks)
+            for post_id in Comment.objects.filter(pk__in=chunk)
+            .values_list('post_id', flat=True).distinct()
+        ]
+        keys |= _keys_of_posts(post_ids)
+    touch(keys)
@@ -5,3 +5,53 @@ MAX_COMM_TEXT_LENGTH = 30
 CHARFIELD_MAX_LENGTH = 256
 
 PAGINATE_BY = 10
+
+BULK_CHUNK_SIZE = 500
+
+# Вес комментария относительно просмотра в рейтинге популярности.
+RANKING_COMMENT_WEIGHT = 5
+
+# Скорость затухания рейтинга со временем (степень возраста в часах).
+RANKING_GRAVITY = 1.5
+
+POPULAR_PERIOD_DAYS = 7
+
+EXCERPT_WORDS = 30
+
+FEED_ITEMS = 20
+
+FEED_CACHE_TIMEOUT = 60 * 60
+
+# Не больше 50 000 адресов в одном файле карты сайта.
+SITEMAP_SHARD_SIZE = 50000
+
+POST_CACHE_TIMEOUT = 60 * 60
+
+# Сколько постов можно запросить одним пакетным запросом API.
+API_BATCH_MAX_IDS = 100
+
+# Границы корзин гистограмм: время в миллисекундах и счётчики.
+LATENCY_BUCKETS_MS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+COUNT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100)
+
+# Повторы записи при «database is locked»: пауза растёт вдвое
+# с каждой попыткой, начиная с DB_RETRY_DELAY секунд.
+DB_WRITE_ATTEMPTS = 5
+DB_RETRY_DELAY = 0.05
+
+# Посты авторов, у которых подписчиков больше этого числа,
+# не раскладываются по лентам, а подмешиваются при показе ленты.
+TIMELINE_FANOUT_MAX_FOLLOWERS = 1000
+
+# Сколько последних постов автора попадает в ленту при подписке.
+TIMELINE_BACKFILL = 50
+
+# Навигация архива сбрасывается при изменении счётчиков,
+# таймаут лишь ограничивает жизнь забытых записей.
+ARCHIVE_NAV_CACHE_TIMEOUT = 24 * 60 * 60
+
+# Похожие посты: сколько показывать, порог косинусного сходства
+# и сколько строк матрицы TF-IDF перемножается за один шаг.
+RELATED_POSTS_COUNT = 5
+RELATED_MIN_SCORE = 0.05
+RELATED_BATCH_SIZE = 256
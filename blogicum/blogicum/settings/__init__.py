@@ -0,0 +1,22 @@
+"""
+Настройки проекта по окружениям.
+
+Окружение выбирается переменной BLOGICUM_ENV: dev (по умолчанию),
+test или prod. Модуль окружения можно указать и напрямую,
+например DJANGO_SETTINGS_MODULE=blogicum.settings.prod.
+"""
+import os
+
+ENVIRONMENT = os.environ.get('BLOGICUM_ENV', 'dev')
+
+if ENVIRONMENT == 'prod':
+    from .prod import *  # noqa: F401, F403
+elif ENVIRONMENT == 'test':
+    from .test import *  # noqa: F401, F403
+elif ENVIRONMENT == 'dev':
+    from .dev import *  # noqa: F401, F403
+else:
+    raise ImportError(
+        f'Неизвестное окружение BLOGICUM_ENV={ENVIRONMENT!r}: '
+        'ожидается dev, test или prod'
+    )
@@ -0,0 +1,317 @@
+import os
+import tempfile
+from pathlib import Path
+
+# Build paths inside the project like this: BASE_DIR / 'subdir'.
+BASE_DIR = Path(__file__).resolve().parent.parent.parent
+
+
+# Quick-start development settings - unsuitable for production
+# See https://docs.djangoproject.com/en/3.2/howto/deployment/checklist/
+
+# SECURITY WARNING: keep the secret key used in production secret!
+SECRET_KEY = 'django-insecure-_zyi)93rfwa&1acx4#(z(fzev1+t_%ccwvc@+h-i#*=xmfai9z'
+
+# SECURITY WARNING: don't run with debug turned on in production!
+DEBUG = True
+
+ALLOWED_HOSTS = [
+    'localhost',
+    '127.0.0.1',
+]
+
+# Длинные страницы (профиль, пост с комментариями) отдаются частями.
+STREAMING_PAGES = False
+
+# Отдавать ли замеры запроса в заголовке Server-Timing.
+SERVER_TIMING_HEADER = True
+
+# Каталог, где процессы сохраняют метрики для экспорта /metrics/.
+# Общий для всех рабочих процессов; файлы завершившихся процессов
+# сворачиваются в retired.json при старте следующего.
+METRICS_DIR = Path(tempfile.gettempdir()) / 'blogicum-metrics'
+
+METRICS_PERSIST_INTERVAL = 5
+
+# Токен Prometheus для /metrics/ (заголовок Authorization: Bearer);
+# без него экспорт доступен только сотрудникам.
+METRICS_TOKEN = os.environ.get('METRICS_TOKEN')
+
+# Профилировать в среднем каждый N-й запрос (0 — только по заголовку
+# X-Blogicum-Profile), снимая стек раз в PROFILE_INTERVAL секунд.
+PROFILE_SAMPLE_RATE = 0
+
+PROFILE_INTERVAL = 0.005
+
+PROFILE_TOKEN_MAX_AGE = 60 * 60
+
+PROFILE_DIR = Path(tempfile.gettempdir()) / 'blogicum-profiles'
+
+PROFILE_KEEP = 200
+
+# Запросы к базе дольше SLOW_QUERY_MS миллисекунд пишутся
+# в SLOW_QUERY_LOG с местом вызова (см. blog/slow_queries.py).
+# Путь попадает в LOGGING при импорте этого модуля; профиль,
+# меняющий журнал, переопределяет LOGGING['handlers']['slow_queries'].
+# Отчёт в админке читает файл самого обработчика.
+SLOW_QUERY_MS = 100
+
+SLOW_QUERY_LOG = Path(tempfile.gettempdir()) / 'blogicum-slow-queries.log'
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'formatters': {
+        'message': {'format': '%(message)s'},
+    },
+    'handlers': {
+        'slow_queries': {
+            'class': 'logging.handlers.RotatingFileHandler',
+            'filename': SLOW_QUERY_LOG,
+            'maxBytes': 10 * 1024 * 1024,
+            'backupCount': 5,
+            'encoding': 'utf-8',
+            'delay': True,
+            'formatter': 'message',
+        },
+    },
+    'loggers': {
+        'blog.slow_queries': {
+            'handlers': ['slow_queries'],
+            'level': 'WARNING',
+            'propagate': False,
+        },
+    },
+}
+
+# Application definition
+
+INSTALLED_APPS = [
+    'django.contrib.admin',
+    'django.contrib.auth',
+    'django.contrib.contenttypes',
+    'django.contrib.sessions',
+    'django.contrib.messages',
+    'django.contrib.staticfiles',
+    'blog.apps.BlogConfig',
+    'pages.apps.PagesConfig',
+    'django_bootstrap5',
+]
+
+MIDDLEWARE = [
+    'blog.instrumentation.ServerTimingMiddleware',
+    'blog.profiling.SamplingProfilerMiddleware',
+    'blog.slow_queries.SlowQueryViewMiddleware',
+    'django.middleware.security.SecurityMiddleware',
+    'django.contrib.sessions.middleware.SessionMiddleware',
+    'blog.routers.ReplicaPinMiddleware',
+    'django.middleware.common.CommonMiddleware',
+    'django.middleware.csrf.CsrfViewMiddleware',
+    'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'django.contrib.messages.middleware.MessageMiddleware',
+    'django.middleware.clickjacking.XFrameOptionsMiddleware',
+]
+
+ROOT_URLCONF = 'blogicum.urls'
+
+TEMPLATES_DIR = BASE_DIR / 'templates'
+
+TEMPLATES = [
+    {
+        'BACKEND': 'django.template.backends.django.DjangoTemplates',
+        'DIRS': [TEMPLATES_DIR],
+        'APP_DIRS': True,
+        'OPTIONS': {
+            'context_processors': [
+                'django.template.context_processors.debug',
+                'django.template.context_processors.request',
+                'django.contrib.auth.context_processors.auth',
+                'django.contrib.messages.context_processors.messages',
+            ],
+        },
+    },
+]
+
+WSGI_APPLICATION = 'blogicum.wsgi.application'
+
+
+# Database
+# https://docs.djangoproject.com/en/3.2/ref/settings/#databases
+
+# PostgreSQL включается переменной POSTGRES_DB. С POSTGRES_POOL_SIZE > 0
+# соединения берутся из пула процесса (blog/backends/postgresql_pool,
+# нужен psycopg2) и возвращаются в него в конце запроса.
+if os.environ.get('POSTGRES_DB'):
+    DATABASES = {
+        'default': {
+            'ENGINE': (
+                'blog.backends.postgresql_pool'
+                if int(os.environ.get('POSTGRES_POOL_SIZE', 0))
+                else 'django.db.backends.postgresql'
+            ),
+            'NAME': os.environ['POSTGRES_DB'],
+            'USER': os.environ.get('POSTGRES_USER', ''),
+            'PASSWORD': os.environ.get('POSTGRES_PASSWORD', ''),
+            'HOST': os.environ.get('POSTGRES_HOST', ''),
+            'PORT': os.environ.get('POSTGRES_PORT', ''),
+            'POOL_SIZE': int(os.environ.get('POSTGRES_POOL_SIZE', 0)),
+            # Сколько секунд ждать свободное соединение пула.
+            'POOL_TIMEOUT': float(os.environ.get('POSTGRES_POOL_TIMEOUT', 5)),
+        }
+    }
+else:
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': BASE_DIR / 'db.sqlite3',
+        }
+    }
+
+
+def env_conn_max_age(default):
+    """
+    Читает CONN_MAX_AGE из DJANGO_CONN_MAX_AGE: число секунд
+    или none — без ограничения; пустое значение — default.
+    """
+    value = os.environ.get('DJANGO_CONN_MAX_AGE', '').strip().lower()
+    if not value:
+        return default
+    if value == 'none':
+        return None
+    return int(value)
+
+
+# Сколько секунд соединение живёт между запросами (0 — закрывается
+# в конце каждого запроса, None — без ограничения).
+DATABASES['default']['CONN_MAX_AGE'] = env_conn_max_age(0)
+
+# Реплики для чтения: адреса серверов PostgreSQL в POSTGRES_REPLICA_HOSTS
+# или, для проверки на одной машине, файлы SQLite в SQLITE_REPLICAS
+# (через запятую). Чтения идут на случайную реплику, запись — в default
+# (см. blog/routers.py).
+_replicas = [
+    item for item in os.environ.get(
+        'POSTGRES_REPLICA_HOSTS' if os.environ.get('POSTGRES_DB')
+        else 'SQLITE_REPLICAS', ''
+    ).split(',') if item
+]
+
+DATABASE_REPLICAS = []
+
+for _index, _replica in enumerate(_replicas, start=1):
+    DATABASES[f'replica{_index}'] = {
+        **DATABASES['default'],
+        'HOST' if os.environ.get('POSTGRES_DB') else 'NAME': _replica,
+    }
+    DATABASE_REPLICAS.append(f'replica{_index}')
+
+DATABASE_ROUTERS = ['blog.routers.ReplicaRouter']
+
+# Сколько секунд после записи клиент читает из default, чтобы увидеть
+# свои изменения, пока они доходят до реплик.
+REPLICA_PIN_SECONDS = 5
+
+# Проверять постоянное соединение в начале запроса и переоткрывать,
+# если сервер его закрыл (аналог CONN_HEALTH_CHECKS из Django 4.1).
+DB_HEALTH_CHECKS = True
+
+# Прагмы для каждого нового соединения с SQLite: журнал WAL,
+# чтобы читатели не блокировали писателя, ожидание блокировки
+# до 5 секунд вместо ошибки, отображение файла в память
+# и кэш страниц (отрицательное значение — в килобайтах).
+SQLITE_PRAGMAS = {
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    'busy_timeout': 5000,
+    'mmap_size': 256 * 1024 * 1024,
+    'cache_size': -64 * 1024,
+}
+
+
+# Password validation
+# https://docs.djangoproject.com/en/3.2/ref/settings/#auth-password-validators
+
+AUTH_PASSWORD_VALIDATORS = [
+    {
+        'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator',
+    },
+    {
+        'NAME': 'django.contrib.auth.password_validation.MinimumLengthValidator',
+    },
+    {
+        'NAME': 'django.contrib.auth.password_validation.CommonPasswordValidator',
+    },
+    {
+        'NAME': 'django.contrib.auth.password_validation.NumericPasswordValidator',
+    },
+]
+
+
+# Internationalization
+# https://docs.djangoproject.com/en/3.2/topics/i18n/
+
+LANGUAGE_CODE = 'ru-RU'
+
+TIME_ZONE = 'Europe/Berlin'
+
+USE_I18N = True
+
+USE_L10N = True
+
+USE_TZ = True
+
+
+# Static files (CSS, JavaScript, Images)
+# https://docs.djangoproject.com/en/3.2/howto/static-files/
+
+STATIC_URL = '/static/'
+
+STATICFILES_DIRS = [BASE_DIR / 'static']
+
+# Default primary key field type
+# https://docs.djangoproject.com/en/3.2/ref/settings/#default-auto-field
+
+DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
+
+MEDIA_ROOT = BASE_DIR / 'media/'
+
+MEDIA_URL = '/media/'
+
+SITEMAP_ROOT = MEDIA_ROOT / 'sitemaps'
+
+SITEMAP_BASE_URL = 'http://127.0.0.1:8000'
+
+EMAIL_BACKEND = 'django.core.mail.backends.filebased.EmailBackend'
+
+EMAIL_FILE_PATH = BASE_DIR / 'sent_emails'
+
+TITLE_MAX_LENGTH = 20
+
+MAX_COMM_TEXT_LENGTH = 30
+
+CHARFIELD_MAX_LENGTH = 256
+
+MAX_POSTS = 10
+
+LOGIN_REDIRECT_URL = 'blog:index'
+
+LOGIN_URL = 'login'
+
+INTERNAL_IPS = [
+    '127.0.0.1',
+]
+
+CSRF_FAILURE_VIEW = 'pages.views.csrf_failure'
+
+# Просмотры постов копятся в памяти процесса и записываются в базу
+# не реже раза в VIEW_COUNT_FLUSH_INTERVAL секунд (фоновым потоком,
+# если просмотров больше нет) и при штатном завершении процесса;
+# при аварийном (SIGKILL) теряются просмотры не более чем за интервал.
+VIEW_COUNT_FLUSH_INTERVAL = 10
+
+VIEW_COUNT_MAX_PENDING = 1000
+
+# run_scheduler проверяет новые отложенные посты не реже раза
+# в SCHEDULER_POLL_INTERVAL секунд, а до ближайшей известной даты
+# публикации спит ровно столько, сколько до неё осталось.
+SCHEDULER_POLL_INTERVAL = 5
@@ -0,0 +1,79 @@
+"""
+Боевое окружение.
+
+Панели отладки нет, шаблоны компилируются один раз на процесс,
+статика отдаётся с хешем в имени, соединения с базой не закрываются
+после каждого запроса, кэш общий для всех рабочих процессов.
+Секретный ключ и список хостов берутся из окружения.
+"""
+import os
+import tempfile
+from pathlib import Path
+
+from .base import *  # noqa: F401, F403
+from .base import BASE_DIR, DATABASES, TEMPLATES, env_conn_max_age
+
+DEBUG = False
+
+SECRET_KEY = os.environ['DJANGO_SECRET_KEY']
+
+ALLOWED_HOSTS = os.environ.get('DJANGO_ALLOWED_HOSTS', 'localhost').split(',')
+
+SERVER_TIMING_HEADER = False
+
+TEMPLATES = [{
+    **TEMPLATES[0],
+    'APP_DIRS': False,
+    'OPTIONS': {
+        **TEMPLATES[0]['OPTIONS'],
+        'loaders': [
+            ('django.template.loaders.cached.Loader', [
+                'django.template.loaders.filesystem.Loader',
+                'django.template.loaders.app_directories.Loader',
+            ]),
+        ],
+    },
+}]
+
+STATIC_ROOT = Path(
+    os.environ.get('DJANGO_STATIC_ROOT', BASE_DIR / 'collected_static'))
+
+# Перед запуском нужен collectstatic: он пишет staticfiles.json
+# с хешированными именами файлов.
+STATICFILES_STORAGE = (
+    'django.contrib.staticfiles.storage.ManifestStaticFilesStorage')
+
+# С пулом соединения и так переиспользуются, держать их в потоках
+# между запросами незачем.
+DATABASES = {
+    alias: {
+        **database,
+        'CONN_MAX_AGE': env_conn_max_age(
+            0 if database.get('POOL_SIZE') else 60),
+    }
+    for alias, database in DATABASES.items()
+}
+
+# Memcached, если задан его адрес (нужен пакет pymemcache),
+# иначе файловый кэш, общий для процессов на одной машине.
+if os.environ.get('MEMCACHED_LOCATION'):
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.memcached.PyMemcacheCache',
+            'LOCATION': os.environ['MEMCACHED_LOCATION'].split(','),
+        },
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+            'LOCATION': os.environ.get(
+                'DJANGO_CACHE_DIR',
+                Path(tempfile.gettempdir()) / 'blogicum-cache'),
+        },
+    }
+
+SESSION_ENGINE = 'django.contrib.sessions.backends.cached_db'
+
+SESSION_COOKIE_SECURE = CSRF_COOKIE_SECURE = (
+    os.environ.get('DJANGO_SECURE_COOKIES', '1') == '1')
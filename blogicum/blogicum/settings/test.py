@@ -0,0 +1,24 @@
+"""Окружение тестов: без панели отладки и с быстрым хешем паролей."""
+import os
+import tempfile
+from pathlib import Path
+
+from .base import *  # noqa: F401, F403
+from .base import DATABASES
+
+DEBUG = True
+
+PASSWORD_HASHERS = ['django.contrib.auth.hashers.MD5PasswordHasher']
+
+# Тестовая база в файле, а не в памяти: так блокировки SQLite
+# при параллельной записи те же, что в работе.
+DATABASES['default']['TEST'] = {
+    'NAME': Path(tempfile.gettempdir()) / f'blogicum-test-{os.getpid()}.db',
+}
+
+# Реплика для тестов маршрутизации: то же соединение, что и default.
+# Чтения на неё идут, только если тест добавит её в DATABASE_REPLICAS.
+DATABASES['replica'] = {
+    **DATABASES['default'],
+    'TEST': {'MIRROR': 'default'},
+}
@@ -5,12 +5,24 @@ from django.urls import include, path, reverse_lazy
 from django.conf import settings
 from django.views.generic import CreateView
 
+from blog.profiling import ProfilerListView, ProfilerReportView
+from blog.slow_queries import SlowQueryReportView
+
 
 handler403 = 'pages.views.csrf_failure'
 handler404 = 'pages.views.page_not_found'
 handler500 = 'pages.views.server_error'
 
 urlpatterns = [
+    path('admin/profiles/',
+         admin.site.admin_view(ProfilerListView.as_view()),
+         name='profiler_list'),
+    path('admin/profiles/<str:profile_id>/',
+         admin.site.admin_view(ProfilerReportView.as_view()),
+         name='profiler_report'),
+    path('admin/slow-queries/',
+         admin.site.admin_view(SlowQueryReportView.as_view()),
+         name='slow_queries'),
     path('admin/', admin.site.urls),
     path('', include('blog.urls')),
     path('pages/', include('pages.urls', namespace='pages')),
@@ -27,7 +39,7 @@ urlpatterns = [
 ]
 
 
-if settings.DEBUG:
+if 'debug_toolbar' in settings.INSTALLED_APPS:
     import debug_toolbar
     # Добавить к списку urlpatterns список адресов из приложения debug_toolbar:
     urlpatterns += (path('__debug__/', include(debug_toolbar.urls)),)
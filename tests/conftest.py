@@ -41,6 +41,12 @@ def enable_debug_false():
         yield
 
 
+@pytest.fixture(autouse=True)
+def flush_view_counts_immediately():
+    with override_settings(VIEW_COUNT_FLUSH_INTERVAL=0):
+        yield
+
+
 class SafeImportFromContextManager:
     def __init__(
             self,
@@ -0,0 +1,105 @@
+from datetime import datetime
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from mixer.backend.django import Mixer
+
+pytestmark = [pytest.mark.django_db]
+
+
+def _count_changelist_queries(admin_client, url):
+    with CaptureQueriesContext(connection) as ctx:
+        response = admin_client.get(url)
+    assert response.status_code == HTTPStatus.OK, (
+        f"Убедитесь, что страница админки `{url}` открывается без ошибок."
+    )
+    return len(ctx.captured_queries)
+
+
+@pytest.mark.parametrize(
+    ("url", "model"),
+    [
+        ("/admin/blog/post/", "blog.Post"),
+        ("/admin/blog/comment/", "blog.Comment"),
+    ],
+)
+def test_changelist_queries_do_not_grow_with_rows(
+        mixer: Mixer, admin_client, url, model):
+    mixer.cycle(3).blend(model)
+    few_rows = _count_changelist_queries(admin_client, url)
+    mixer.cycle(12).blend(model)
+    many_rows = _count_changelist_queries(admin_client, url)
+    assert many_rows == few_rows, (
+        f"Убедитесь, что число запросов на странице `{url}` "
+        "не зависит от количества строк в списке."
+    )
+
+
+@pytest.mark.parametrize(
+    ("url", "model"),
+    [
+        ("/admin/blog/post/", "blog.Post"),
+        ("/admin/blog/comment/", "blog.Comment"),
+    ],
+)
+def test_bulk_moderation_actions(mixer: Mixer, admin_client, url, model):
+    items = mixer.cycle(5).blend(model, is_published=True)
+    model_cls = type(items[0])
+    selected = [item.pk for item in items[:3]]
+
+    admin_client.post(url, {
+        "action": "unpublish_selected",
+        "_selected_action": selected,
+    })
+    assert set(
+        model_cls.objects.filter(is_published=False)
+        .values_list("pk", flat=True)
+    ) == set(selected), (
+        f"Убедитесь, что действие `unpublish_selected` на странице `{url}` "
+        "снимает с публикации только выбранные объекты."
+    )
+
+    admin_client.post(url, {
+        "action": "delete_selected",
+        "_selected_action": selected,
+        "post": "yes",
+    })
+    assert not model_cls.objects.filter(pk__in=selected).exists(), (
+        f"Убедитесь, что действие `delete_selected` на странице `{url}` "
+        "удаляет выбранные объекты."
+    )
+    assert model_cls.objects.count() == len(items) - len(selected)
+
+
+def test_monthly_counts_follow_posts(mixer: Mixer, admin_client):
+    from blog.models import MonthlyCount, Post
+
+    pub_date = timezone.make_aware(datetime(2020, 5, 17, 12))
+    posts = mixer.cycle(4).blend(Post, pub_date=pub_date)
+    scope_counts = MonthlyCount.objects.filter(
+        scope="blog.post.pub_date", year=2020, month=5)
+    assert scope_counts.get().count == 4, (
+        "Убедитесь, что помесячный счётчик публикаций "
+        "увеличивается при создании поста."
+    )
+
+    posts[0].pub_date = timezone.make_aware(datetime(2021, 1, 3, 12))
+    posts[0].save()
+    admin_client.post("/admin/blog/post/", {
+        "action": "delete_selected",
+        "_selected_action": [posts[1].pk, posts[2].pk],
+        "post": "yes",
+    })
+    assert scope_counts.get().count == 1, (
+        "Убедитесь, что помесячный счётчик публикаций уменьшается "
+        "при переносе даты и пакетном удалении постов."
+    )
+
+    response = admin_client.get("/admin/blog/post/")
+    assert "2020 (1)" in response.content.decode("utf-8"), (
+        "Убедитесь, что иерархия дат в админке публикаций "
+        "показывает годы с числом записей."
+    )
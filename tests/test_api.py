@@ -0,0 +1,106 @@
+from http import HTTPStatus
+
+import pytest
+from django.utils import timezone
+
+pytestmark = [pytest.mark.django_db]
+
+
+def test_post_list_pages_and_fields(
+        client, many_posts_with_published_locations):
+    from blog.models import Post
+
+    expected = set(Post.objects.filter(
+        is_published=True, category__is_published=True,
+        pub_date__lt=timezone.now(),
+    ).values_list("pk", flat=True))
+    seen = []
+    url = "/api/posts/?fields=id,title"
+    while url:
+        response = client.get(url)
+        assert response.status_code == HTTPStatus.OK, (
+            "Убедитесь, что лента `/api/posts/` открывается без ошибок."
+        )
+        data = response.json()
+        for item in data["results"]:
+            assert set(item) == {"id", "title"}, (
+                "Убедитесь, что API отдаёт только поля из параметра fields."
+            )
+            seen.append(item["id"])
+        url = data["next"]
+    assert len(seen) == len(set(seen)) and set(seen) == expected, (
+        "Убедитесь, что курсор ?after= обходит все опубликованные посты "
+        "ровно один раз."
+    )
+
+    response = client.get("/api/posts/?fields=id,secret")
+    assert response.status_code == HTTPStatus.BAD_REQUEST, (
+        "Убедитесь, что запрос неизвестного поля отвечает 400."
+    )
+
+
+def test_post_detail(
+        client, user_client, post_with_published_location):
+    post = post_with_published_location
+    url = f"/api/posts/{post.id}/"
+    assert client.get(url).status_code == HTTPStatus.UNAUTHORIZED, (
+        "Убедитесь, что пост в API, как и страница поста, "
+        "доступен только авторизованным пользователям."
+    )
+    response = user_client.get(url)
+    assert response.status_code == HTTPStatus.OK
+    data = response.json()
+    assert data["text"] == post.text and data["comment_count"] == 0, (
+        "Убедитесь, что пост в API отдаётся целиком."
+    )
+    response = user_client.get(url, HTTP_IF_NONE_MATCH=response["ETag"])
+    assert response.status_code == HTTPStatus.NOT_MODIFIED, (
+        "Убедитесь, что неизменившийся пост в API отвечает "
+        "304 Not Modified."
+    )
+    response = user_client.get(f"{url}comments/")
+    assert response.json() == {"results": [], "next": None}
+
+
+def test_hidden_post_not_found(
+        another_user_client, unpublished_posts_with_published_locations):
+    post = unpublished_posts_with_published_locations[0]
+    response = another_user_client.get(f"/api/posts/{post.id}/")
+    assert response.status_code == HTTPStatus.NOT_FOUND, (
+        "Убедитесь, что снятый с публикации пост недоступен в API "
+        "для других пользователей."
+    )
+
+
+def test_post_batch(
+        user_client, another_user_client, post_with_published_location,
+        unpublished_posts_with_published_locations,
+        django_assert_max_num_queries):
+    post = post_with_published_location
+    hidden = unpublished_posts_with_published_locations[0]
+    url = f"/api/posts/batch/?ids={hidden.id},{post.id},999999&fields=id"
+    response = another_user_client.get(url)
+    assert response.status_code == HTTPStatus.OK, (
+        "Убедитесь, что пакетный запрос `/api/posts/batch/` "
+        "открывается без ошибок."
+    )
+    assert response.json()["results"] == [{"id": post.id}], (
+        "Убедитесь, что пакетный запрос отдаёт только видимые "
+        "пользователю посты в порядке параметра ids."
+    )
+    ids = [item["id"] for item in user_client.get(url).json()["results"]]
+    assert ids == [hidden.id, post.id], (
+        "Убедитесь, что автор получает свои неопубликованные посты."
+    )
+
+    with django_assert_max_num_queries(3):
+        another_user_client.get(url)
+    post.title = "Новый заголовок"
+    post.save()
+    response = another_user_client.get(
+        f"/api/posts/batch/?ids={post.id}&fields=title")
+    assert response.json()["results"] == [{"title": "Новый заголовок"}], (
+        "Убедитесь, что изменённый пост не отдаётся из устаревшего кэша."
+    )
+    response = user_client.get("/api/posts/batch/?ids=1,x")
+    assert response.status_code == HTTPStatus.BAD_REQUEST
@@ -0,0 +1,105 @@
+from datetime import datetime
+from http import HTTPStatus
+
+import pytest
+from django.utils import timezone
+
+pytestmark = [pytest.mark.django_db]
+
+
+def archive_count(year, month):
+    from blog.date_counts import ARCHIVE_SCOPE
+    from blog.models import MonthlyCount
+
+    row = MonthlyCount.objects.filter(
+        scope=ARCHIVE_SCOPE, year=year, month=month).first()
+    return row.count if row else 0
+
+
+@pytest.fixture
+def march_post(mixer, user, published_category):
+    return mixer.blend(
+        "blog.Post", author=user, is_published=True,
+        category=published_category,
+        pub_date=timezone.make_aware(datetime(2020, 3, 15, 12)),
+    )
+
+
+def test_archive_counts_follow_visibility(march_post):
+    from blog.bulk import update_in_chunks
+    from blog.models import Post
+
+    assert archive_count(2020, 3) == 1, (
+        "Убедитесь, что опубликованный пост учитывается в счётчике архива."
+    )
+    march_post.is_published = False
+    march_post.save()
+    assert archive_count(2020, 3) == 0, (
+        "Убедитесь, что снятие с публикации уменьшает счётчик архива."
+    )
+    update_in_chunks(Post.objects.filter(pk=march_post.pk), is_published=True)
+    assert archive_count(2020, 3) == 1, (
+        "Убедитесь, что пакетное изменение пересчитывает счётчик архива."
+    )
+    march_post.refresh_from_db()
+    march_post.delete()
+    assert archive_count(2020, 3) == 0, (
+        "Убедитесь, что удаление поста уменьшает счётчик архива."
+    )
+
+
+def test_archive_pages(march_post, client):
+    response = client.get("/archive/2020/3/")
+    assert response.status_code == HTTPStatus.OK
+    assert march_post in response.context["page_obj"], (
+        "Убедитесь, что пост выводится на странице архива за месяц."
+    )
+    assert response.context["navigation"][0]["count"] == 1, (
+        "Убедитесь, что навигация архива строится по счётчикам."
+    )
+    response = client.get("/archive/2020/3/16/")
+    assert march_post not in response.context["page_obj"], (
+        "Убедитесь, что архив за день показывает только посты этого дня."
+    )
+    assert client.get("/archive/2020/2/30/").status_code == (
+        HTTPStatus.NOT_FOUND
+    ), "Убедитесь, что архив за несуществующую дату возвращает 404."
+
+
+def test_archive_survives_stale_counts(march_post, client):
+    from blog.date_counts import ARCHIVE_NAV_KEY, ARCHIVE_SCOPE
+    from blog.models import MonthlyCount
+    from django.core.cache import cache
+
+    MonthlyCount.objects.filter(
+        scope=ARCHIVE_SCOPE, year=2020, month=3).update(count=25)
+    cache.delete(ARCHIVE_NAV_KEY)
+    response = client.get("/archive/2020/3/", {"page": 3})
+    assert response.status_code == HTTPStatus.OK, (
+        "Убедитесь, что страница в пределах устаревшего счётчика "
+        "не возвращает 404."
+    )
+    page = response.context["page_obj"]
+    assert list(page) == [march_post] and page.paginator.num_pages == 1, (
+        "Убедитесь, что пагинатор поправляет устаревший счётчик "
+        "и показывает последнюю страницу."
+    )
+    assert client.get(
+        "/archive/2020/3/", {"page": 4}).status_code == HTTPStatus.NOT_FOUND
+
+
+def test_archive_navigation_reset_after_commit(
+        march_post, django_capture_on_commit_callbacks):
+    from blog.date_counts import ARCHIVE_NAV_KEY, ARCHIVE_SCOPE, apply_deltas
+    from django.core.cache import cache
+
+    cache.set(ARCHIVE_NAV_KEY, [])
+    with django_capture_on_commit_callbacks() as callbacks:
+        apply_deltas({(ARCHIVE_SCOPE, 2020, 3): 1})
+        assert cache.get(ARCHIVE_NAV_KEY) == [], (
+            "Убедитесь, что кэш навигации архива сбрасывается только "
+            "после фиксации транзакции."
+        )
+    for callback in callbacks:
+        callback()
+    assert cache.get(ARCHIVE_NAV_KEY) is None
@@ -0,0 +1,25 @@
+from http import HTTPStatus
+
+import pytest
+from asgiref.sync import async_to_sync
+from django.test import AsyncClient
+
+pytestmark = [pytest.mark.django_db(transaction=True)]
+
+
+def test_post_detail_under_asgi(
+        settings, user, post_with_published_location):
+    settings.STREAMING_PAGES = True
+    post = post_with_published_location
+    client = AsyncClient()
+    client.force_login(user)
+    response = async_to_sync(client.get)(f"/posts/{post.id}/")
+    assert response.status_code == HTTPStatus.OK
+    assert not response.streaming, (
+        "Убедитесь, что под ASGI страница не отдаётся потоком: "
+        "Django 3.2 читает его в цикле событий, где ORM недоступен."
+    )
+    assert post.title in response.content.decode("utf-8"), (
+        "Убедитесь, что под ASGI страница поста отдаётся целиком "
+        "теми же синхронными представлениями."
+    )
@@ -0,0 +1,49 @@
+from datetime import datetime
+
+import pytest
+from django.db.models.signals import pre_delete
+from django.utils import timezone
+
+pytestmark = [pytest.mark.django_db]
+
+
+def test_failed_chunk_keeps_deleted_chunks_counted(
+        monkeypatch, mixer, user, published_category):
+    from blog import bulk
+    from blog.date_counts import ARCHIVE_SCOPE
+    from blog.models import MonthlyCount, Post
+
+    kept, removed = sorted(
+        mixer.cycle(2).blend(
+            "blog.Post", author=user, is_published=True,
+            category=published_category,
+            pub_date=timezone.make_aware(datetime(2020, 3, 15, 12)),
+        ),
+        key=lambda post: -post.pk,
+    )
+    monkeypatch.setattr(
+        bulk, "iter_pk_chunks",
+        lambda queryset: ([pk] for pk in sorted(
+            queryset.values_list("pk", flat=True))),
+    )
+
+    def fail(sender, instance, **kwargs):
+        if instance.pk == kept.pk:
+            raise RuntimeError("сбой удаления")
+
+    pre_delete.connect(fail, sender=Post)
+    try:
+        with pytest.raises(RuntimeError):
+            bulk.delete_in_chunks(Post.objects.all())
+    finally:
+        pre_delete.disconnect(fail, sender=Post)
+
+    assert list(Post.objects.values_list("pk", flat=True)) == [kept.pk], (
+        "Убедитесь, что порция с ошибкой откатывается, "
+        "а уже удалённые порции остаются удалёнными."
+    )
+    assert MonthlyCount.objects.get(
+        scope=ARCHIVE_SCOPE, year=2020, month=3).count == 1, (
+        "Убедитесь, что отложенные счётчики применяются "
+        "для удалённых порций и после сбоя."
+    )
@@ -0,0 +1,73 @@
+from http import HTTPStatus
+
+import pytest
+from django.db.models import Model
+from mixer.backend.django import Mixer
+
+pytestmark = [pytest.mark.django_db]
+
+
+def _revalidate(client, url):
+    first = client.get(url)
+    assert first.status_code == HTTPStatus.OK
+    assert first.has_header("ETag"), (
+        f"Убедитесь, что страница `{url}` отдаёт заголовок ETag."
+    )
+    return client.get(url, HTTP_IF_NONE_MATCH=first["ETag"])
+
+
+def test_post_detail_not_modified(
+        mixer: Mixer, user_client, user, post_with_published_location: Model):
+    url = f"/posts/{post_with_published_location.id}/"
+    response = _revalidate(user_client, url)
+    assert response.status_code == HTTPStatus.NOT_MODIFIED, (
+        "Убедитесь, что неизменившаяся страница поста отвечает "
+        "304 Not Modified на запрос с совпадающим ETag."
+    )
+    etag = user_client.get(url)["ETag"]
+    mixer.blend(
+        "blog.Comment", post=post_with_published_location, author=user)
+    response = user_client.get(url, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == HTTPStatus.OK, (
+        "Убедитесь, что после нового комментария страница поста "
+        "отдаётся заново."
+    )
+
+
+@pytest.mark.parametrize(
+    "url_template",
+    ["/", "/category/{post.category.slug}/",
+     "/profile/{post.author.username}/"],
+)
+def test_feeds_not_modified(
+        client, post_with_published_location, url_template):
+    post = post_with_published_location
+    url = url_template.format(post=post)
+    response = _revalidate(client, url)
+    assert response.status_code == HTTPStatus.NOT_MODIFIED, (
+        f"Убедитесь, что неизменившаяся лента `{url}` отвечает "
+        "304 Not Modified на запрос с совпадающим ETag."
+    )
+    etag = client.get(url)["ETag"]
+    post.title = "Новый заголовок"
+    post.save()
+    response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == HTTPStatus.OK, (
+        f"Убедитесь, что после изменения поста лента `{url}` "
+        "отдаётся заново."
+    )
+
+
+def test_bulk_update_moves_updated_at(post_with_published_location):
+    from blog.models import Post
+    from blog.watermarks import model_last_changed
+
+    before = post_with_published_location.updated_at
+    Post.objects.filter(pk=post_with_published_location.pk).update(
+        is_published=False)
+    post_with_published_location.refresh_from_db()
+    assert post_with_published_location.updated_at > before, (
+        "Убедитесь, что пакетное обновление постов "
+        "сдвигает их поле `updated_at`."
+    )
+    assert model_last_changed(Post) >= before
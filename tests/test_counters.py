@@ -0,0 +1,65 @@
+import time
+
+import pytest
+from django.db.models import Model
+
+from blog.counters import ViewCounter
+from blog.models import Post
+
+pytestmark = [pytest.mark.django_db]
+
+
+def test_view_counter_flushes_in_batches(
+        post_with_published_location: Model, another_user):
+    another_post = Post.objects.create(
+        title="Другой пост",
+        text="Текст",
+        pub_date=post_with_published_location.pub_date,
+        author=another_user,
+        category=post_with_published_location.category,
+    )
+    counter = ViewCounter(flush_interval=3600, max_pending=10)
+    for _ in range(3):
+        counter.record(post_with_published_location.pk)
+    counter.record(another_post.pk)
+
+    post_with_published_location.refresh_from_db()
+    assert post_with_published_location.view_count == 0, (
+        "Убедитесь, что просмотры копятся в буфере до сброса."
+    )
+
+    counter.flush()
+    assert dict(
+        Post.objects.filter(
+            pk__in=[post_with_published_location.pk, another_post.pk]
+        ).values_list("pk", "view_count")
+    ) == {post_with_published_location.pk: 3, another_post.pk: 1}, (
+        "Убедитесь, что при сбросе буфера просмотры "
+        "прибавляются к счётчикам постов."
+    )
+
+
+def test_view_counter_flushes_when_full(post_with_published_location):
+    counter = ViewCounter(flush_interval=3600, max_pending=1)
+    counter.record(post_with_published_location.pk)
+    post_with_published_location.refresh_from_db()
+    assert post_with_published_location.view_count == 1, (
+        "Убедитесь, что буфер сбрасывается, когда в нём набирается "
+        "`max_pending` постов."
+    )
+
+
+@pytest.mark.django_db(transaction=True)
+def test_view_counter_flushes_when_idle(post_with_published_location):
+    counter = ViewCounter(flush_interval=0.05, max_pending=10)
+    counter.record(post_with_published_location.pk)
+    deadline = time.monotonic() + 5
+    while time.monotonic() < deadline:
+        post_with_published_location.refresh_from_db()
+        if post_with_published_location.view_count:
+            break
+        time.sleep(0.02)
+    assert post_with_published_location.view_count == 1, (
+        "Убедитесь, что буфер сбрасывается по истечении интервала "
+        "и без новых просмотров."
+    )
@@ -0,0 +1,73 @@
+import pytest
+from django.core.signals import request_started
+from django.db import connection
+
+
+@pytest.mark.django_db(transaction=True)
+def test_broken_persistent_connection_reopened(monkeypatch):
+    monkeypatch.setitem(connection.settings_dict, "CONN_MAX_AGE", 60)
+    connection.ensure_connection()
+    closed = []
+    monkeypatch.setattr(connection, "is_usable", lambda: False)
+    # Тестовая база SQLite в памяти, её соединение close() не закрывает.
+    monkeypatch.setattr(connection, "close", lambda: closed.append(True))
+    request_started.send(sender=None)
+    assert closed, (
+        "Убедитесь, что разорванное постоянное соединение закрывается "
+        "в начале запроса."
+    )
+
+
+@pytest.mark.django_db(transaction=True)
+def test_healthy_persistent_connection_kept(monkeypatch):
+    monkeypatch.setitem(connection.settings_dict, "CONN_MAX_AGE", 60)
+    connection.ensure_connection()
+    raw = connection.connection
+    request_started.send(sender=None)
+    assert connection.connection is raw, (
+        "Убедитесь, что рабочее постоянное соединение переиспользуется."
+    )
+
+
+class _ListPool:
+    """Внутренний пул без ограничения, как ThreadedConnectionPool."""
+
+    def __init__(self):
+        self.free = []
+        self.issued = 0
+
+    def getconn(self):
+        self.issued += 1
+        return self.free.pop() if self.free else object()
+
+    def putconn(self, connection, close=False):
+        if not close:
+            self.free.append(connection)
+
+
+def test_pool_waits_for_released_connection():
+    import threading
+
+    from blog.backends.postgresql_pool.pool import BlockingPool, PoolExhausted
+
+    pool = BlockingPool(_ListPool(), size=1, timeout=0.05)
+    held = pool.getconn()
+    with pytest.raises(PoolExhausted):
+        pool.getconn()
+
+    pool.timeout = 5
+    threading.Timer(0.05, pool.putconn, args=(held,)).start()
+    assert pool.getconn() is held, (
+        "Убедитесь, что при исчерпании пула поток ждёт "
+        "возвращённое соединение, а не получает ошибку."
+    )
+
+
+@pytest.mark.parametrize("value, expected", [
+    ("", 30), ("none", None), ("None", None), ("600", 600),
+])
+def test_conn_max_age_from_environment(monkeypatch, value, expected):
+    from blogicum.settings.base import env_conn_max_age
+
+    monkeypatch.setenv("DJANGO_CONN_MAX_AGE", value)
+    assert env_conn_max_age(30) == expected
@@ -0,0 +1,63 @@
+from http import HTTPStatus
+
+import pytest
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.mark.parametrize(
+    "url_template",
+    [
+        "/feeds/rss/",
+        "/feeds/atom/",
+        "/feeds/category/{post.category.slug}/rss/",
+        "/feeds/profile/{post.author.username}/atom/",
+    ],
+)
+def test_feeds(client, post_with_published_location, url_template):
+    post = post_with_published_location
+    url = url_template.format(post=post)
+    response = client.get(url)
+    assert response.status_code == HTTPStatus.OK, (
+        f"Убедитесь, что лента `{url}` открывается без ошибок."
+    )
+    content = response.content.decode("utf-8")
+    assert post.title in content and post.excerpt in content, (
+        f"Убедитесь, что в ленте `{url}` есть заголовок и анонс поста."
+    )
+
+    response = client.get(url, HTTP_IF_NONE_MATCH=response["ETag"])
+    assert response.status_code == HTTPStatus.NOT_MODIFIED, (
+        f"Убедитесь, что неизменившаяся лента `{url}` отвечает "
+        "304 Not Modified."
+    )
+
+    post.title = "Обновлённый заголовок"
+    post.save()
+    response = client.get(url)
+    assert "Обновлённый заголовок" in response.content.decode("utf-8"), (
+        f"Убедитесь, что после правки поста лента `{url}` "
+        "не отдаётся из устаревшего кэша."
+    )
+
+
+def test_feed_of_missing_category(client):
+    response = client.get("/feeds/category/no-such-category/rss/")
+    assert response.status_code == HTTPStatus.NOT_FOUND
+
+
+@pytest.mark.parametrize(
+    "url_template",
+    ["/feeds/atom/", "/feeds/profile/{post.author.username}/atom/"],
+)
+def test_feed_author_links_absolute(
+        client, post_with_published_location, url_template):
+    post = post_with_published_location
+    url = url_template.format(post=post)
+    content = client.get(url).content.decode("utf-8")
+    assert (
+        f"<uri>http://testserver/profile/{post.author.username}/</uri>"
+        in content
+    ), (
+        f"Убедитесь, что ссылка на автора в ленте `{url}` абсолютная."
+    )
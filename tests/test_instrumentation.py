@@ -0,0 +1,29 @@
+import pytest
+
+pytestmark = [pytest.mark.django_db]
+
+
+def test_server_timing(client, post_with_published_location):
+    from blog.instrumentation import registry
+
+    registry.clear()
+    response = client.get("/")
+    assert response.has_header("Server-Timing"), (
+        "Убедитесь, что ответы содержат заголовок Server-Timing."
+    )
+    timing = response["Server-Timing"]
+    assert "db;dur=" in timing and "tpl;dur=" in timing
+    client.get("/feeds/rss/")
+    client.get("/feeds/rss/")
+
+    snapshot = registry.snapshot()
+    index_queries = snapshot[("blog:index", "queries")]
+    assert index_queries["count"] == 1 and index_queries["sum"] > 0, (
+        "Убедитесь, что число запросов к базе учитывается "
+        "в гистограмме по имени представления."
+    )
+    assert snapshot[("blog:index", "template_ms")]["sum"] > 0
+    assert snapshot[("blog:feed_rss", "cache_misses")]["sum"] == 1
+    assert snapshot[("blog:feed_rss", "cache_hits")]["sum"] == 1, (
+        "Убедитесь, что попадания в кэш лент учитываются в гистограммах."
+    )
@@ -0,0 +1,60 @@
+import json
+
+import pytest
+
+pytestmark = [pytest.mark.django_db]
+
+
+def test_metrics_across_processes(
+        settings, tmp_path, client, admin_client, mixer, user,
+        post_with_published_location):
+    from blog.instrumentation import registry
+
+    settings.METRICS_DIR = tmp_path
+    registry.clear()
+    mixer.blend(
+        "blog.Comment", post=post_with_published_location, author=user)
+    client.get("/")
+    # Файл метрик другого, уже завершившегося рабочего процесса.
+    (tmp_path / "1.json").write_text(json.dumps({
+        "pid": 999999999,
+        "histograms": [],
+        "counters": [["blog_writes_total",
+                      {"action": "create", "model": "comment"}, 2]],
+        "gauges": {"blog_view_buffer_pending": 100},
+    }))
+
+    response = admin_client.get("/metrics/")
+    assert response.status_code == 200, (
+        "Убедитесь, что экспорт метрик `/metrics/` доступен сотрудникам."
+    )
+    content = response.content.decode("utf-8")
+    assert (
+        'blog_request_duration_milliseconds_count{view="blog:index"} 1'
+        in content
+    ), "Убедитесь, что экспортируется гистограмма времени запросов."
+    assert (
+        'blog_writes_total{action="create",model="comment"} 3' in content
+    ), "Убедитесь, что счётчики всех процессов складываются."
+    assert "blog_view_buffer_pending 0" in content, (
+        "Убедитесь, что датчики завершившихся процессов не учитываются."
+    )
+
+    registry.retire_stale(tmp_path)
+    assert not (tmp_path / "1.json").exists(), (
+        "Убедитесь, что файлы завершившихся процессов сворачиваются "
+        "при старте рабочего процесса."
+    )
+    content = admin_client.get("/metrics/").content.decode("utf-8")
+    assert (
+        'blog_writes_total{action="create",model="comment"} 3' in content
+    ), "Убедитесь, что счётчики не убывают после свёртки файлов."
+
+    assert client.get("/metrics/").status_code == 403, (
+        "Убедитесь, что адрес клиента не открывает доступ к метрикам."
+    )
+    settings.METRICS_TOKEN = "secret"
+    assert client.get(
+        "/metrics/", HTTP_AUTHORIZATION="Bearer secret").status_code == 200
+    assert client.get(
+        "/metrics/", HTTP_AUTHORIZATION="Bearer wrong").status_code == 403
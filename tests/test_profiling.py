@@ -0,0 +1,42 @@
+from http import HTTPStatus
+
+import pytest
+
+pytestmark = [pytest.mark.django_db]
+
+
+def test_flagged_request_profiled(
+        settings, tmp_path, client, admin_client, user_client,
+        post_with_published_location):
+    from blog.profiling import list_profiles, make_token
+
+    settings.PROFILE_DIR = tmp_path
+    settings.PROFILE_SAMPLE_RATE = 0
+    client.get("/")
+    assert list_profiles() == [], (
+        "Убедитесь, что без заголовка и выборки запросы не профилируются."
+    )
+    client.get("/", HTTP_X_BLOGICUM_PROFILE="подделка")
+    assert list_profiles() == []
+
+    client.get("/", HTTP_X_BLOGICUM_PROFILE=make_token())
+    profiles = list_profiles()
+    assert len(profiles) == 1, (
+        "Убедитесь, что запрос с подписанным заголовком профилируется."
+    )
+
+    response = admin_client.get("/admin/profiles/")
+    assert "blog:index" in response.content.decode("utf-8"), (
+        "Убедитесь, что профиль виден на странице админки."
+    )
+    response = admin_client.get(f"/admin/profiles/{profiles[0]}/")
+    assert response.status_code == HTTPStatus.OK
+    assert "blog_post" in response.content.decode("utf-8"), (
+        "Убедитесь, что в профиле сохраняется журнал запросов к базе."
+    )
+    response = admin_client.get(
+        f"/admin/profiles/{profiles[0]}/?format=collapsed")
+    assert response.status_code == HTTPStatus.OK
+    assert user_client.get("/admin/profiles/").status_code == (
+        HTTPStatus.FOUND
+    ), "Убедитесь, что профили доступны только сотрудникам."
@@ -0,0 +1,63 @@
+from datetime import timedelta
+from http import HTTPStatus
+
+import pytest
+from django.utils import timezone
+from mixer.backend.django import Mixer
+
+from blog.models import Post, PostRanking
+from blog.pagination import KeysetPaginator
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def ranked_posts(mixer: Mixer, user, published_category,
+                 django_capture_on_commit_callbacks):
+    posts = mixer.cycle(3).blend(
+        "blog.Post", author=user, category=published_category,
+        is_published=True,
+        pub_date=timezone.now() - timedelta(days=1), location=None,
+    )
+    with django_capture_on_commit_callbacks(execute=True):
+        for n_comments, post in zip((2, 0, 1), posts):
+            mixer.cycle(n_comments).blend(
+                "blog.Comment", post=post, author=user)
+    return posts
+
+
+def test_comments_refresh_ranking(ranked_posts):
+    counts = dict(
+        PostRanking.objects.values_list("post_id", "comment_count"))
+    assert counts == {
+        ranked_posts[0].pk: 2, ranked_posts[1].pk: 0, ranked_posts[2].pk: 1,
+    }, (
+        "Убедитесь, что таблица рейтинга хранит актуальное число "
+        "комментариев к каждому посту."
+    )
+
+
+def test_discussed_feed_order(ranked_posts, client):
+    response = client.get("/discussed/")
+    assert response.status_code == HTTPStatus.OK
+    page = response.context["page_obj"]
+    assert [post.pk for post in page] == [
+        ranked_posts[0].pk, ranked_posts[2].pk, ranked_posts[1].pk,
+    ], (
+        "Убедитесь, что лента обсуждаемого отсортирована "
+        "по числу комментариев."
+    )
+
+
+def test_keyset_paginator_walks_all_rows(ranked_posts):
+    paginator = KeysetPaginator(
+        Post.objects.all(), "ranking__comment_count", 2, parse=int)
+    first = paginator.get_page()
+    second = paginator.get_page(first.next_cursor)
+    assert first.has_next and not second.has_next
+    assert [post.pk for post in [*first, *second]] == [
+        ranked_posts[0].pk, ranked_posts[2].pk, ranked_posts[1].pk,
+    ], (
+        "Убедитесь, что курсорная пагинация отдаёт все строки ленты "
+        "по одному разу и в правильном порядке."
+    )
@@ -0,0 +1,92 @@
+from http import HTTPStatus
+
+import pytest
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def related_posts(mixer, user, published_category):
+    return mixer.cycle(3).blend(
+        "blog.Post", author=user, is_published=True,
+        category=published_category,
+    )
+
+
+def test_detail_shows_related_posts(related_posts, user_client):
+    from blog.models import Post, RelatedPost
+
+    post, shown, hidden = related_posts
+    RelatedPost.objects.create(post=post, related=hidden, rank=0, score=0.9)
+    RelatedPost.objects.create(post=post, related=shown, rank=1, score=0.5)
+    Post.objects.filter(pk=hidden.pk).update(is_published=False)
+
+    response = user_client.get(f"/posts/{post.id}/")
+    assert response.status_code == HTTPStatus.OK
+    assert response.context["related_posts"] == [shown], (
+        "Убедитесь, что на странице поста выводятся похожие посты "
+        "без снятых с публикации."
+    )
+
+
+def test_build_finds_similar_posts(mixer, user, published_category):
+    pytest.importorskip("scipy")
+    from blog.related import build
+
+    def blend(text):
+        return mixer.blend(
+            "blog.Post", author=user, is_published=True,
+            category=published_category, title=text.split()[0], text=text,
+        )
+
+    alps = blend("горы снег лыжи перевал")
+    ski = blend("лыжи снег склон горы")
+    sea = blend("море пляж солнце волны")
+    assert build(full=True) == 3
+    assert [link.related for link in alps.related_links.all()] == [ski], (
+        "Убедитесь, что похожими считаются посты с общими словами."
+    )
+    blend("море волны прибой пляж")
+    assert build() == 1, (
+        "Убедитесь, что без --all пересчитываются только новые посты."
+    )
+    assert sea.related_links.exists(), (
+        "Убедитесь, что новый пост попадает в похожие уже посчитанных."
+    )
+
+
+def test_incremental_build_follows_category_visibility(
+        mixer, user, published_category):
+    pytest.importorskip("scipy")
+    from blog.related import build
+
+    hidden_category = mixer.blend("blog.Category", is_published=True)
+
+    def blend(text, category=published_category):
+        return mixer.blend(
+            "blog.Post", author=user, is_published=True,
+            category=category, title=text.split()[0], text=text,
+        )
+
+    alps = blend("горы снег лыжи перевал")
+    ski = blend("лыжи снег склон горы", category=hidden_category)
+    blend("море пляж солнце волны")
+    build(full=True)
+    assert [link.related for link in alps.related_links.all()] == [ski]
+
+    hidden_category.is_published = False
+    hidden_category.save()
+    build()
+    assert not alps.related_links.exists(), (
+        "Убедитесь, что посты скрытой категории убираются "
+        "из списков похожих без полного пересчёта."
+    )
+
+    hidden_category.is_published = True
+    hidden_category.save()
+    build()
+    assert [link.related for link in alps.related_links.all()] == [ski], (
+        "Убедитесь, что посты снова опубликованной категории "
+        "возвращаются в похожие без полного пересчёта."
+    )
+    assert [link.related for link in ski.related_links.all()] == [alps]
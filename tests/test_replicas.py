@@ -0,0 +1,44 @@
+from http import HTTPStatus
+
+import pytest
+from django.db import connections
+from django.test.utils import CaptureQueriesContext
+
+pytestmark = [
+    pytest.mark.django_db(transaction=True, databases=["default", "replica"])
+]
+
+
+@pytest.fixture
+def replica(settings):
+    settings.DATABASE_REPLICAS = ["replica"]
+    return connections["replica"]
+
+
+def test_reads_go_to_replica(replica, user_client, post_with_published_location):
+    with CaptureQueriesContext(replica) as queries:
+        response = user_client.get(
+            f"/posts/{post_with_published_location.id}/")
+    assert response.status_code == HTTPStatus.OK
+    assert len(queries), (
+        "Убедитесь, что страница поста читает данные с реплики."
+    )
+
+
+def test_reads_pinned_after_write(
+        replica, user_client, post_with_published_location):
+    from blog.routers import PIN_COOKIE
+
+    post = post_with_published_location
+    response = user_client.post(
+        f"/posts/{post.id}/comment/", {"text": "Комментарий"})
+    assert response.status_code == HTTPStatus.FOUND
+    assert PIN_COOKIE in response.cookies, (
+        "Убедитесь, что после записи клиент закрепляется за основной базой."
+    )
+    with CaptureQueriesContext(replica) as queries:
+        response = user_client.get(response["Location"])
+    assert response.status_code == HTTPStatus.OK
+    assert not len(queries), (
+        "Убедитесь, что после записи чтения идут в основную базу."
+    )
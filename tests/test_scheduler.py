@@ -0,0 +1,82 @@
+from datetime import timedelta
+from http import HTTPStatus
+
+import pytest
+from django.utils import timezone
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def scheduled_post(mixer, user, published_category):
+    return mixer.blend(
+        "blog.Post", author=user, is_published=True,
+        category=published_category,
+        pub_date=timezone.now() + timedelta(days=1),
+    )
+
+
+def test_scheduled_post_goes_live(
+        scheduled_post, client, another_user):
+    from blog.scheduler import publish_due
+    from blog.timelines import follow
+    from blog.watermarks import POSTS, feed_last_modified
+
+    follow(another_user, scheduled_post.author)
+    assert not scheduled_post.is_live
+    assert publish_due() == [], (
+        "Убедитесь, что пост не попадает в ленту раньше даты публикации."
+    )
+    before = feed_last_modified(POSTS)
+    # Дата публикации наступила.
+    assert publish_due(scheduled_post.pub_date + timedelta(seconds=1)) == [
+        scheduled_post.pk]
+
+    scheduled_post.refresh_from_db()
+    assert scheduled_post.is_live, (
+        "Убедитесь, что планировщик переводит пост в ленту."
+    )
+    assert feed_last_modified(POSTS) > before, (
+        "Убедитесь, что переход в ленту сдвигает отметку изменений лент."
+    )
+    assert scheduled_post.timeline_entries.filter(
+        user=another_user).exists(), (
+        "Убедитесь, что переход в ленту раскладывает пост подписчикам."
+    )
+    response = client.get("/")
+    assert response.status_code == HTTPStatus.OK
+    assert scheduled_post in response.context["page_obj"]
+
+
+def test_bulk_unpublish_clears_live_flag(post_with_published_location):
+    from blog.models import Post
+
+    post = post_with_published_location
+    assert post.is_live
+    Post.objects.filter(pk=post.pk).update(is_published=False)
+    post.refresh_from_db()
+    assert not post.is_live, (
+        "Убедитесь, что снятие с публикации снимает и флаг is_live."
+    )
+
+
+def test_silent_and_bulk_writes_keep_live_flag(
+        post_with_published_location, user, published_category):
+    from blog.models import Post
+
+    post = post_with_published_location
+    Post.objects.filter(pk=post.pk).update_silently(
+        pub_date=timezone.now() + timedelta(days=1))
+    post.refresh_from_db()
+    assert not post.is_live, (
+        "Убедитесь, что update_silently() пересчитывает is_live "
+        "при переносе даты публикации."
+    )
+    created, = Post.objects.bulk_create([Post(
+        title="Пакетный", text="Текст", author=user,
+        category=published_category, is_published=True,
+        pub_date=timezone.now() - timedelta(hours=1),
+    )])
+    assert created.is_live, (
+        "Убедитесь, что bulk_create() заполняет is_live."
+    )
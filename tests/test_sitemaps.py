@@ -0,0 +1,81 @@
+from http import HTTPStatus
+
+import pytest
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def sitemap_root(settings, tmp_path):
+    settings.SITEMAP_ROOT = tmp_path
+    return tmp_path
+
+
+def _content(response):
+    return b"".join(response.streaming_content).decode("utf-8")
+
+
+def test_sitemap_served_from_disk(
+        client, sitemap_root, post_with_published_location):
+    from blog.sitemaps import build
+
+    post = post_with_published_location
+    assert client.get("/sitemap.xml").status_code == HTTPStatus.NOT_FOUND, (
+        "Убедитесь, что карта сайта не строится внутри запроса."
+    )
+    build()
+    response = client.get("/sitemap.xml")
+    assert response.status_code == HTTPStatus.OK, (
+        "Убедитесь, что индекс карты сайта `/sitemap.xml` открывается."
+    )
+    assert "/sitemap-posts-0.xml" in _content(response), (
+        "Убедитесь, что индекс карты сайта ссылается на шарды разделов."
+    )
+    content = _content(client.get("/sitemap-posts-0.xml"))
+    assert f"/posts/{post.id}/" in content, (
+        "Убедитесь, что шард карты сайта содержит опубликованные посты."
+    )
+    assert client.get("/sitemap-posts-7.xml").status_code == (
+        HTTPStatus.NOT_FOUND
+    )
+
+
+def test_incremental_build(sitemap_root, post_with_published_location):
+    from blog.sitemaps import build
+
+    assert build() >= 1
+    assert build() == 0, (
+        "Убедитесь, что без изменений карта сайта не перестраивается."
+    )
+    post = post_with_published_location
+    post.is_published = False
+    post.save()
+    assert build() == 1, (
+        "Убедитесь, что после правки поста перестраивается только его шард."
+    )
+    content = (sitemap_root / "sitemap.xml").read_text(encoding="utf-8")
+    assert "sitemap-posts-0.xml" not in content, (
+        "Убедитесь, что опустевший шард убирается из индекса карты сайта."
+    )
+
+
+def test_deleted_post_leaves_sitemap(
+        sitemap_root, post_with_published_location, another_user, mixer):
+    from blog.sitemaps import build
+
+    post = post_with_published_location
+    kept = mixer.blend(
+        "blog.Post", author=another_user, is_published=True,
+        category=post.category,
+    )
+    build()
+    post.delete()
+    assert build() == 1, (
+        "Убедитесь, что удаление поста перестраивает его шард."
+    )
+    content = (sitemap_root / "sitemap-posts-0.xml").read_text(
+        encoding="utf-8")
+    assert f"/posts/{post.id}/" not in content, (
+        "Убедитесь, что удалённый пост убирается из карты сайта."
+    )
+    assert f"/posts/{kept.id}/" in content
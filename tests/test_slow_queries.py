@@ -0,0 +1,77 @@
+import logging
+from http import HTTPStatus
+
+import pytest
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def slow_query_log(settings, tmp_path):
+    settings.SLOW_QUERY_MS = 0
+    path = tmp_path / "slow.log"
+    handler = logging.FileHandler(path, encoding="utf-8")
+    logger = logging.getLogger("blog.slow_queries")
+    logger.addHandler(handler)
+    yield path
+    logger.removeHandler(handler)
+    handler.close()
+
+
+def test_slow_queries_attributed(
+        slow_query_log, mixer, user, user_client, admin_client,
+        post_with_published_location):
+    from blog.slow_queries import log_files, summarize
+
+    post = post_with_published_location
+    mixer.blend("blog.Comment", post=post, author=user)
+    user_client.get(f"/posts/{post.id}/")
+
+    groups = [
+        group for group in summarize([slow_query_log])
+        if group["view"] == "blog:post_detail"
+    ]
+    assert any(
+        (group["code"] or "").startswith("blog/views.py:")
+        for group in groups
+    ), "Убедитесь, что для запроса указывается строка в blog/views.py."
+    assert any(
+        (group["template"] or "").startswith("includes/comments.html:")
+        for group in groups
+    ), "Убедитесь, что для запроса из шаблона указывается шаблон и строка."
+
+    assert str(slow_query_log) in log_files(), (
+        "Убедитесь, что отчёт читает файлы обработчиков журнала."
+    )
+    response = admin_client.get("/admin/slow-queries/")
+    assert response.status_code == HTTPStatus.OK
+    assert "blog:post_detail" in response.content.decode("utf-8"), (
+        "Убедитесь, что отчёт в админке показывает медленные запросы."
+    )
+
+
+@pytest.mark.django_db(transaction=True)
+def test_call_site_when_connection_opened_in_request(
+        slow_query_log, client, post_with_published_location):
+    from blog.slow_queries import log_slow_queries, summarize
+    from django.db import connection
+
+    # Соединение откроется заново внутри запроса, под обёртками
+    # замеров времени, как при CONN_MAX_AGE = 0.
+    if log_slow_queries in connection.execute_wrappers:
+        connection.execute_wrappers.remove(log_slow_queries)
+    connection.close()
+    client.get("/")
+
+    codes = [
+        group["code"] or "" for group in summarize([slow_query_log])
+        if group["view"] == "blog:index"
+    ]
+    assert any(code.startswith("blog/views.py:") for code in codes), (
+        "Убедитесь, что место вызова указывает на представление, "
+        "даже если соединение открыто во время запроса."
+    )
+    assert not any(
+        code.startswith(("blog/instrumentation.py:", "blog/profiling.py:"))
+        for code in codes
+    ), "Убедитесь, что обёртки замеров не считаются местом вызова."
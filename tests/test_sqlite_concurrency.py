@@ -0,0 +1,114 @@
+from concurrent.futures import ThreadPoolExecutor
+from http import HTTPStatus
+
+import pytest
+from django.db import OperationalError, connection
+from django.test import Client
+
+WRITERS = 8
+READERS = 8
+COMMENTS_PER_WRITER = 5
+
+
+def test_sqlite_pragmas_applied(db):
+    with connection.cursor() as cursor:
+        cursor.execute("PRAGMA journal_mode")
+        assert cursor.fetchone()[0] == "wal", (
+            "Убедитесь, что SQLite работает в режиме журнала WAL."
+        )
+        cursor.execute("PRAGMA busy_timeout")
+        assert cursor.fetchone()[0] == 5000, (
+            "Убедитесь, что к соединению с SQLite применяется busy_timeout."
+        )
+
+
+def test_retry_on_locked_repeats_transaction(db):
+    from blog.database import retry_on_locked
+
+    calls = []
+
+    def flaky():
+        calls.append(True)
+        if len(calls) < 3:
+            raise OperationalError("database is locked")
+        return "ok"
+
+    assert retry_on_locked(flaky) == "ok"
+    assert len(calls) == 3, (
+        "Убедитесь, что запись повторяется при блокировке базы."
+    )
+
+
+@pytest.mark.django_db(transaction=True)
+def test_concurrent_comments_and_reads(
+        user, user_client, post_with_published_location):
+    post = post_with_published_location
+    session = user_client.cookies
+
+    def in_thread(request):
+        def run(_):
+            client = Client()
+            client.cookies = session
+            try:
+                return [
+                    request(client).status_code
+                    for _ in range(COMMENTS_PER_WRITER)
+                ]
+            finally:
+                connection.close()
+        return run
+
+    write = in_thread(lambda client: client.post(
+        f"/posts/{post.id}/comment/", {"text": "Комментарий"}))
+    read = in_thread(lambda client: client.get(f"/posts/{post.id}/"))
+
+    with ThreadPoolExecutor(WRITERS + READERS) as executor:
+        writes = executor.map(write, range(WRITERS))
+        reads = executor.map(read, range(READERS))
+        write_codes = [code for codes in writes for code in codes]
+        read_codes = [code for codes in reads for code in codes]
+
+    assert set(write_codes) == {HTTPStatus.FOUND}, (
+        "Убедитесь, что параллельные комментарии сохраняются без ошибок."
+    )
+    assert set(read_codes) == {HTTPStatus.OK}, (
+        "Убедитесь, что страница поста открывается во время записи."
+    )
+    assert post.comments.count() == WRITERS * COMMENTS_PER_WRITER, (
+        "Убедитесь, что ни один комментарий не потерялся."
+    )
+
+
+@pytest.mark.django_db
+def test_retried_comment_saved_once(user_client, post_with_published_location):
+    from django.db.models.signals import post_save
+
+    from blog.date_counts import TRACKED_FIELDS, get_scope
+    from blog.models import Comment, MonthlyCount
+
+    post = post_with_published_location
+    created_flags = []
+
+    def lock_first_save(sender, created, **kwargs):
+        created_flags.append(created)
+        if len(created_flags) == 1:
+            raise OperationalError("database is locked")
+
+    post_save.connect(lock_first_save, sender=Comment)
+    try:
+        response = user_client.post(
+            f"/posts/{post.id}/comment/", {"text": "Комментарий"})
+    finally:
+        post_save.disconnect(lock_first_save, sender=Comment)
+
+    assert response.status_code == HTTPStatus.FOUND
+    assert created_flags == [True, True], (
+        "Убедитесь, что повтор после блокировки снова создаёт запись, "
+        "а не обновляет её, и что форма сохраняется один раз."
+    )
+    assert post.comments.count() == 1
+    scope = get_scope(Comment, TRACKED_FIELDS[Comment])
+    assert sum(MonthlyCount.objects.filter(scope=scope).values_list(
+        "count", flat=True)) == 1, (
+        "Убедитесь, что побочные эффекты создания учтены ровно один раз."
+    )
@@ -0,0 +1,33 @@
+import pytest
+
+pytestmark = [pytest.mark.django_db]
+
+
+def _content(response):
+    return b"".join(response.streaming_content).decode("utf-8")
+
+
+def test_streamed_pages(
+        settings, mixer, user, user_client, post_with_published_location):
+    settings.STREAMING_PAGES = True
+    post = post_with_published_location
+    comments = mixer.cycle(3).blend(
+        "blog.Comment", post=post, author=user)
+
+    response = user_client.get(f"/posts/{post.id}/")
+    assert response.streaming, (
+        "Убедитесь, что при STREAMING_PAGES страница поста "
+        "отдаётся потоком."
+    )
+    content = _content(response)
+    assert post.title in content and "</html>" in content
+    assert all(f"comment_{comment.id}" in content for comment in comments), (
+        "Убедитесь, что в потоковой странице поста выводятся "
+        "все комментарии."
+    )
+    assert "blog:stream" not in content
+
+    content = _content(user_client.get(f"/profile/{user.username}/"))
+    assert post.title in content and "</html>" in content, (
+        "Убедитесь, что в потоковой странице профиля выводятся посты."
+    )
@@ -0,0 +1,125 @@
+from datetime import timedelta
+from http import HTTPStatus
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.utils import timezone
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def publish(mixer, another_user, published_category,
+            django_capture_on_commit_callbacks):
+    def publish(**kwargs):
+        with django_capture_on_commit_callbacks(execute=True):
+            kwargs.setdefault("pub_date", timezone.now() - timedelta(hours=1))
+            kwargs.setdefault("author", another_user)
+            post = mixer.blend(
+                "blog.Post", is_published=True,
+                category=published_category, **kwargs,
+            )
+        return post
+    return publish
+
+
+def feed_ids(client):
+    response = client.get("/subscriptions/")
+    assert response.status_code == HTTPStatus.OK
+    return [post.id for post in response.context["page_obj"]]
+
+
+def test_follow_fans_out_new_posts(user_client, another_user, publish):
+    response = user_client.post(f"/profile/{another_user.username}/follow/")
+    assert response.status_code == HTTPStatus.FOUND
+    post = publish()
+    assert post.timeline_entries.count() == 1, (
+        "Убедитесь, что новый пост раскладывается в ленты подписчиков."
+    )
+    assert feed_ids(user_client) == [post.id], (
+        "Убедитесь, что пост автора появляется в ленте подписок."
+    )
+
+
+def test_scheduled_post_appears_when_live(
+        user_client, user, another_user, publish,
+        django_capture_on_commit_callbacks):
+    from blog.scheduler import publish_due
+    from blog.timelines import follow
+
+    follow(user, another_user)
+    post = publish(pub_date=timezone.now() + timedelta(days=1))
+    assert post.id not in feed_ids(user_client), (
+        "Убедитесь, что отложенный пост не виден в ленте до даты публикации."
+    )
+    with django_capture_on_commit_callbacks(execute=True):
+        publish_due(post.pub_date + timedelta(seconds=1))
+    assert feed_ids(user_client) == [post.id], (
+        "Убедитесь, что отложенный пост появляется в ленте, "
+        "когда наступает дата публикации."
+    )
+
+
+def test_unfollow_clears_timeline(user_client, another_user, publish):
+    user_client.post(f"/profile/{another_user.username}/follow/")
+    publish()
+    user_client.post(f"/profile/{another_user.username}/unfollow/")
+    assert feed_ids(user_client) == [], (
+        "Убедитесь, что после отписки посты автора пропадают из ленты."
+    )
+
+
+def test_popular_author_read_on_demand(
+        monkeypatch, user_client, user, another_user, publish):
+    from blog import timelines
+
+    monkeypatch.setattr(timelines, "TIMELINE_FANOUT_MAX_FOLLOWERS", 0)
+    timelines.follow(user, another_user)
+    post = publish()
+    assert not post.timeline_state.fanned_out, (
+        "Убедитесь, что посты популярных авторов "
+        "помечаются как не разосланные."
+    )
+    assert not post.timeline_entries.exists(), (
+        "Убедитесь, что посты популярных авторов не раскладываются по лентам."
+    )
+    assert feed_ids(user_client) == [post.id], (
+        "Убедитесь, что посты популярных авторов подмешиваются в ленту."
+    )
+
+
+def test_timeline_pages_merge_fanned_out_and_pulled_posts(
+        monkeypatch, mixer, user_client, user, another_user, publish):
+    from blog import timelines
+    from blog.pagination import KeysetPage
+
+    timelines.follow(user, another_user)
+    popular = mixer.blend(get_user_model())
+    timelines.follow(user, popular)
+    start = timezone.now() - timedelta(days=1)
+    expected = []
+    for i in range(12):
+        if i % 3 == 0:
+            monkeypatch.setattr(
+                timelines, "TIMELINE_FANOUT_MAX_FOLLOWERS", 0)
+            post = publish(author=popular,
+                           pub_date=start + timedelta(minutes=i))
+            monkeypatch.undo()
+        else:
+            post = publish(pub_date=start + timedelta(minutes=i))
+        expected.insert(0, post.id)
+
+    first = user_client.get("/subscriptions/").context["page_obj"]
+    assert isinstance(first, KeysetPage)
+    assert [post.id for post in first] == expected[:10], (
+        "Убедитесь, что лента подписок сливает разосланные и "
+        "неразосланные посты по дате публикации."
+    )
+    assert first.has_next
+    second = user_client.get(
+        "/subscriptions/", {"after": first.next_cursor}
+    ).context["page_obj"]
+    assert [post.id for post in second] == expected[10:], (
+        "Убедитесь, что лента подписок листается курсором ?after=."
+    )
+    assert not second.has_next